@@ -0,0 +1,94 @@
+"""
+Throughput of yt2spotify title normalization on a synthetic playlist.
+
+Usage: python benchmarks/bench_normalize.py [--titles 100000] [--seed 0]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from yt2spotify import normalize  # noqa: E402
+
+ARTISTS = [
+    "Daft Punk",
+    "Beyoncé",
+    "Sigur Rós",
+    "AC/DC",
+    "The Weeknd",
+    "Röyksopp",
+    "BTS (방탄소년단)",
+    "Kendrick Lamar",
+]
+TRACKS = [
+    "One More Time",
+    "Halo",
+    "Hoppípolla",
+    "Back In Black",
+    "Blinding Lights",
+    "Eple",
+    "Dynamite",
+    "HUMBLE.",
+]
+SEPARATORS = [" - ", " – ", " — ", " | ", " / ", ": "]
+SUFFIXES = [
+    "",
+    " (Official Video)",
+    " [HD]",
+    " (Lyrics)",
+    " (feat. Someone)",
+    " [Official Audio]",
+    " (Live 2019)",
+    " (Remastered 2011)",
+    " ft. Guest",
+]
+
+
+def make_corpus(count: int, seed: int) -> List[str]:
+    """
+    Builds ``count`` mostly unique titles in the shapes seen on YouTube.
+    """
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(ARTISTS)}{rng.choice(SEPARATORS)}{rng.choice(TRACKS)} "
+        f"{i}{rng.choice(SUFFIXES)}"
+        for i in range(count)
+    ]
+
+
+def rate(func: Callable[[str], object], titles: List[str]) -> float:
+    start = time.perf_counter()
+    for title in titles:
+        func(title)
+    return len(titles) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--titles", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    titles = make_corpus(args.titles, args.seed)
+    print(f"{len(titles)} synthetic titles")
+    for name in ("clean_title", "parse_artist_track"):
+        func = getattr(normalize, name)
+        normalize.clear_memo()
+        uncached = rate(func.__wrapped__, titles)
+        cold = rate(func, titles)
+        # Repeat syncs of a playlist that fits in the memo
+        hot = titles[: normalize.MEMO_SIZE]
+        rate(func, hot)
+        warm = rate(func, hot)
+        print(
+            f"{name:>20}: {uncached:>10,.0f} titles/s uncached, "
+            f"{cold:>10,.0f} cold memo, {warm:>12,.0f} warm memo"
+        )
+
+
+if __name__ == "__main__":
+    main()
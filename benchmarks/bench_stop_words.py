@@ -0,0 +1,67 @@
+"""
+Per-title cost of stop word removal as the stop word list grows.
+
+Compares the compiled trie regex used by build_search_query with the old
+str.replace loop over every word.
+
+Usage: python benchmarks/bench_stop_words.py [--titles 20000] [--seed 0]
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from yt2spotify.normalize import compile_stop_words, strip_stop_words  # noqa: E402
+
+from bench_normalize import make_corpus  # noqa: E402
+
+LIST_SIZES = (10, 100, 1000, 10000)
+
+
+def random_words(count: int, rng: random.Random) -> List[str]:
+    return [
+        "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+        for _ in range(count)
+    ]
+
+
+def per_title_us(func: Callable[[str], str], titles: List[str]) -> float:
+    start = time.perf_counter()
+    for title in titles:
+        func(title)
+    return (time.perf_counter() - start) / len(titles) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--titles", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    titles = [title.lower() for title in make_corpus(args.titles, args.seed)]
+    print(f"{len(titles)} synthetic titles, microseconds per title")
+    print(f"{'words':>8} {'compile ms':>11} {'regex':>8} {'replace loop':>13}")
+    for size in LIST_SIZES:
+        words = random_words(size, rng)
+        start = time.perf_counter()
+        pattern = compile_stop_words(words)
+        compile_ms = (time.perf_counter() - start) * 1e3
+
+        def replace_loop(title: str) -> str:
+            for word in words:
+                title = title.replace(word, "")
+            return title
+
+        regex = per_title_us(lambda title: strip_stop_words(title, pattern), titles)
+        loop = per_title_us(replace_loop, titles)
+        print(f"{size:>8} {compile_ms:>11.1f} {regex:>8.2f} {loop:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
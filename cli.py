@@ -6,7 +6,11 @@ from rich.console import Console
 from yt2spotify.core import get_spotify_client, async_search_with_cache
 from yt2spotify.yt_utils import get_yt_playlist_titles_yt_dlp
 from yt2spotify.youtube import get_yt_playlist_titles_api as yt_api_fetch
-from yt2spotify.utils import clean_title, parse_artist_track
+from yt2spotify.utils import (
+    build_search_query,
+    compile_stop_words,
+    parse_artist_track,
+)
 from yt2spotify.cache import TrackCache
 from tqdm import tqdm
 import argparse
@@ -74,14 +78,12 @@ def sync_command(
     sp = get_spotify_client()
     cache = TrackCache()
     queries = []
-    stop_words = set(config.get("stop_words", []))
+    # Whole-word stop word removal with a single precompiled regex
+    stop_words = compile_stop_words(config.get("stop_words", []))
     for title in titles:
         artist, track = parse_artist_track(title)
-        # Remove stop words from query
-        query = f"artist:{artist} track:{track}" if artist else clean_title(title)
-        for word in stop_words:
-            query = query.replace(word, "")
-        queries.append((artist or "", track or "", query.strip()))
+        query = build_search_query(title, artist, track, stop_words)
+        queries.append((artist or "", track or "", query))
     # Async search with cache
     loop = asyncio.get_event_loop()
     # Pass thresholds and backoff to async_search_with_cache via config if needed
@@ -1,4 +1,10 @@
 import pytest
+from yt2spotify.rate_limit import (
+    DEFAULT_BURST,
+    DEFAULT_RATE_PER_SECOND,
+    spotify_limiter,
+)
+from yt2spotify.spotify_session import clear_clients
 
 
 @pytest.fixture(autouse=True)
@@ -8,6 +14,25 @@ def set_spotify_env(monkeypatch):
     monkeypatch.setenv("SPOTIPY_REDIRECT_URI", "dummy_uri")
 
 
+@pytest.fixture(autouse=True)
+def reset_spotify_limiter():
+    # The limiter is process-wide; keep 429 pauses from leaking between tests
+    # and don't throttle fake clients
+    spotify_limiter.configure(1000.0, 1000.0)
+    spotify_limiter.reset()
+    yield
+    spotify_limiter.configure(DEFAULT_RATE_PER_SECOND, DEFAULT_BURST)
+    spotify_limiter.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_spotify_clients():
+    # Clients are shared per process; each test builds its own (patched) one
+    clear_clients()
+    yield
+    clear_clients()
+
+
 @pytest.fixture
 def sample_fixture():
     return "sample data"
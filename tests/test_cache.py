@@ -1,6 +1,8 @@
 import os
 import sys
 
+import pytest
+
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from yt2spotify import cache
@@ -33,3 +35,351 @@ def test_track_cache_clear(tmp_path):
         conn.execute("DELETE FROM track_cache")
         conn.commit()
     assert c.get("a", "b") is None
+
+
+def test_track_cache_miss_expiry_grows(tmp_path):
+    c = cache.TrackCache(
+        str(tmp_path / "test_cache.sqlite"),
+        miss_ttl=100,
+        miss_backoff=2,
+        miss_ttl_max=300,
+    )
+    assert not c.is_fresh_miss("a", "b")
+    assert c.set_miss("a", "b", now=1000) == 1100
+    assert c.is_fresh_miss("A", "B", now=1099)
+    assert not c.is_fresh_miss("a", "b", now=1100)
+    # Repeated misses back off: 200s, then capped at 300s
+    assert c.set_miss("a", "b", now=2000) == 2200
+    assert c.set_miss("a", "b", now=3000) == 3300
+    # A later hit clears the miss
+    c.set("a", "b", "id")
+    assert not c.is_fresh_miss("a", "b", now=3001)
+    assert c.set_miss("a", "b", now=4000) == 4100
+
+
+def test_track_cache_from_config(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    c = cache.track_cache_from_config({"miss_ttl": 5, "miss_backoff": 3})
+    assert c.miss_ttl == 5.0 and c.miss_backoff == 3.0
+    assert c.miss_ttl_max == cache.MISS_TTL_MAX
+
+
+def test_track_cache_uses_wal_and_batches_writes(tmp_path):
+    import sqlite3
+
+    db_path = str(tmp_path / "test_cache.sqlite")
+
+    def committed_rows():
+        with sqlite3.connect(db_path) as conn:
+            return conn.execute("SELECT COUNT(*) FROM track_cache").fetchone()[0]
+
+    with cache.TrackCache(db_path, write_batch=3) as c:
+        assert c.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        c.set("a", "1", "id1")
+        c.set("a", "2", "id2")
+        # Buffered writes are visible to this cache but not yet committed
+        assert c.get("a", "2") == "id2"
+        assert committed_rows() == 0
+        c.set("a", "3", "id3")
+        assert committed_rows() == 3
+        c.set("a", "4", "id4")
+        c.flush()
+        assert committed_rows() == 4
+        c.set("a", "5", "id5")
+    # Leaving the context flushes and closes
+    assert committed_rows() == 5
+    c.close()
+    with pytest.raises(RuntimeError):
+        c.get("a", "1")
+
+
+def test_track_cache_concurrent_writers(tmp_path):
+    import threading
+
+    c = cache.TrackCache(str(tmp_path / "test_cache.sqlite"), write_batch=50)
+
+    def writer(n):
+        for i in range(100):
+            c.set(f"artist{n}", f"title{i}", f"id{n}-{i}")
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    c.close()
+    reopened = cache.TrackCache(str(tmp_path / "test_cache.sqlite"))
+    assert reopened.get("artist3", "title99") == "id3-99"
+
+
+def test_track_cache_batching_does_not_lock_out_other_connections(tmp_path):
+    import time
+
+    db_path = str(tmp_path / "test_cache.sqlite")
+    a = cache.TrackCache(db_path, write_batch=500)
+    b = cache.TrackCache(db_path, write_batch=1)
+    a.set("a", "1", "id1")
+    a.set_miss("a", "2")
+    start = time.monotonic()
+    b.set("b", "1", "id2")
+    b.set_miss("b", "2")
+    assert time.monotonic() - start < 1.0
+    # a's writes are still buffered, but a sees them
+    assert a.get("a", "1") == "id1"
+    assert a.is_fresh_miss("a", "2")
+    assert a.fresh_misses([("A", "2"), ("b", "2")]) == {("A", "2"), ("b", "2")}
+    assert b.get("a", "1") is None
+    a.set("a", "2", "id3")
+    assert not a.is_fresh_miss("a", "2")
+    assert a.get_many([("a", "1"), ("a", "2")]) == {
+        ("a", "1"): "id1",
+        ("a", "2"): "id3",
+    }
+    a.close()
+    assert b.get("a", "2") == "id3"
+    assert not b.is_fresh_miss("a", "2")
+    b.close()
+
+
+def test_track_cache_get_many(tmp_path):
+    c = cache.TrackCache(str(tmp_path / "cache.sqlite"))
+    c.set("Artist", "Song", "id1")
+    c.set("Other", "Tune", "id2")
+    assert c.get_many([("artist", "SONG"), ("Other", "Tune"), ("x", "y")]) == {
+        ("artist", "SONG"): "id1",
+        ("Other", "Tune"): "id2",
+    }
+    assert c.get_many([]) == {}
+
+
+def test_track_cache_get_many_chunks_large_inputs(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "LOOKUP_CHUNK", 3)
+    c = cache.TrackCache(str(tmp_path / "cache.sqlite"), write_batch=100)
+    for i in range(10):
+        c.set(f"a{i}", "t", f"id{i}")
+    keys = [(f"a{i}", "t") for i in range(12)]
+    assert c.get_many(keys) == {(f"a{i}", "t"): f"id{i}" for i in range(10)}
+
+
+def test_track_cache_fresh_misses(tmp_path):
+    c = cache.TrackCache(str(tmp_path / "cache.sqlite"), miss_ttl=100)
+    c.set_miss("a", "b", now=1000)
+    c.set_miss("c", "d", now=0)
+    assert c.fresh_misses([("A", "b"), ("c", "d"), ("e", "f")], now=1050) == {
+        ("A", "b")
+    }
+
+
+def test_lru_cache_evicts_least_recently_used():
+    lru = cache.LRUCache(2)
+    lru.put(("a", "1"), "x")
+    lru.put(("b", "2"), "y")
+    assert lru.get(("a", "1")) == "x"
+    lru.put(("c", "3"), "z")
+    assert lru.get(("b", "2")) is None
+    assert len(lru) == 2
+    assert (lru.hits, lru.misses) == (1, 1)
+
+
+def test_track_cache_memory_tier_serves_hot_keys(tmp_path):
+    import sqlite3
+
+    db_path = str(tmp_path / "test_cache.sqlite")
+    c = cache.TrackCache(db_path, memory_size=10)
+    c.set("Artist", "Song", "id1")
+    # Deleting the row on disk shows the hit is served from memory
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM track_cache")
+    conn.commit()
+    conn.close()
+    assert c.get("artist", "song") == "id1"
+    assert c.get_many([("ARTIST", "SONG")]) == {("ARTIST", "SONG"): "id1"}
+    assert c.memory is not None and c.memory.hits == 2
+    # The tier is shared with later caches on the same file
+    other = cache.TrackCache(db_path, memory_size=10)
+    assert other.memory is c.memory
+    assert other.get("Artist", "Song") == "id1"
+
+
+def test_track_cache_memory_tier_fills_from_disk(tmp_path):
+    db_path = str(tmp_path / "test_cache.sqlite")
+    cache.TrackCache(db_path).set("a", "b", "id1")
+    c = cache.TrackCache(db_path, memory_size=10)
+    assert c.get_many([("a", "b"), ("x", "y")]) == {("a", "b"): "id1"}
+    assert c.memory is not None and c.memory.misses == 2
+    assert c.get("a", "b") == "id1"
+    assert c.memory.hits == 1
+
+
+def test_track_cache_migrates_old_schema(tmp_path):
+    import sqlite3
+
+    db_path = str(tmp_path / "test_cache.sqlite")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE track_cache (artist TEXT NOT NULL, title TEXT NOT NULL, "
+            "track_id TEXT NOT NULL, PRIMARY KEY (artist, title))"
+        )
+        conn.execute("INSERT INTO track_cache VALUES ('a', 'b', 'id1')")
+    c = cache.TrackCache(db_path, ttl=100)
+    created_at, hits = c.conn.execute(
+        "SELECT created_at, hits FROM track_cache"
+    ).fetchone()
+    assert created_at > 0 and hits == 0
+    assert c.get("a", "b") == "id1"
+
+
+def test_track_cache_ttl_marks_entries_for_revalidation(tmp_path):
+    c = cache.TrackCache(str(tmp_path / "test_cache.sqlite"), ttl=100, memory_size=5)
+    c.set("a", "b", "id1", now=1000)
+    assert c.get("a", "b", now=1099) == "id1"
+    assert c.get("a", "b", now=1101) is None
+    assert c.get_many([("a", "b")], now=1101) == {}
+    # Storing the entry again revalidates it
+    c.set("a", "b", "id2", now=1200)
+    assert c.get_many([("a", "b")], now=1250) == {("a", "b"): "id2"}
+
+
+def test_track_cache_records_hits_on_commit(tmp_path):
+    c = cache.TrackCache(str(tmp_path / "test_cache.sqlite"))
+    c.set("a", "b", "id1", now=1000)
+    c.get("a", "b", now=1500)
+    c.get_many([("A", "B")], now=2000)
+    c.flush()
+    assert c.conn.execute(
+        "SELECT created_at, last_hit_at, hits FROM track_cache"
+    ).fetchone() == (1000, 2000, 2)
+
+
+@pytest.mark.parametrize(
+    "policy, survivors", [("lru", {"k1", "k2"}), ("lfu", {"k0", "k2"})]
+)
+def test_track_cache_evicts_to_max_rows(tmp_path, policy, survivors):
+    c = cache.TrackCache(
+        str(tmp_path / "test_cache.sqlite"), max_rows=2, eviction=policy
+    )
+    for i in range(3):
+        c.set(f"k{i}", "t", f"id{i}", now=100 + i)
+    # k0 is popular but was hit longest ago
+    for _ in range(3):
+        c.get("k0", "t", now=110)
+    c.get("k1", "t", now=120)
+    c.get("k2", "t", now=130)
+    assert c.evict(now=200) == 1
+    rows = {r[0] for r in c.conn.execute("SELECT artist FROM track_cache")}
+    assert rows == survivors
+
+
+def test_track_cache_eviction_invalidates_memory_tier(tmp_path):
+    c = cache.TrackCache(
+        str(tmp_path / "test_cache.sqlite"), max_rows=1, memory_size=10
+    )
+    c.set("old", "t", "id0", now=100)
+    c.set("new", "t", "id1", now=200)
+    assert c.evict(now=300) == 1
+    assert c.get("old", "t") is None
+    assert c.get("new", "t") == "id1"
+    c.close()
+
+
+def test_track_cache_evicts_to_byte_budget_on_close(tmp_path):
+    import sqlite3
+
+    db_path = str(tmp_path / "test_cache.sqlite")
+    c = cache.TrackCache(db_path, write_batch=1000, max_bytes=64 * 1024)
+    for i in range(5000):
+        c.set(f"artist {i}", f"a fairly long song title {i}", f"id{i}")
+    c.close()
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT COUNT(*) FROM track_cache").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    assert 0 < rows < 5000
+    assert (pages - free) * page_size <= 64 * 1024
+
+
+def test_track_cache_rejects_unknown_eviction(tmp_path):
+    with pytest.raises(ValueError):
+        cache.TrackCache(str(tmp_path / "test_cache.sqlite"), eviction="fifo")
+
+
+SPOTIFY_TRACK = {
+    "id": "id1",
+    "name": "One More Time",
+    "artists": [{"name": "Daft Punk"}, {"name": "Romanthony"}],
+    "duration_ms": 320357,
+    "external_ids": {"isrc": "GBDUW0000053"},
+    "album": {"name": "Discovery"},
+}
+
+
+def test_track_record_round_trip(tmp_path):
+    db_path = str(tmp_path / "test_cache.sqlite")
+    record = cache.TrackRecord.from_spotify(SPOTIFY_TRACK)
+    assert record.artist == "Daft Punk, Romanthony"
+    c = cache.TrackCache(db_path)
+    c.set_record("Daft Punk", "One More Time", record)
+    c.close()
+    reopened = cache.TrackCache(db_path, memory_size=5)
+    assert reopened.get_record("daft punk", "one more time") == record
+    assert reopened.get_many_records([("Daft Punk", "One More Time")]) == {
+        ("Daft Punk", "One More Time"): record
+    }
+    assert reopened.get("Daft Punk", "One More Time") == "id1"
+    # A plain set() keeps working and stores no metadata
+    reopened.set("a", "b", "id2")
+    assert reopened.get_record("a", "b") == cache.TrackRecord("id2")
+
+
+def test_track_cache_migrates_metadata_columns(tmp_path):
+    import sqlite3
+
+    db_path = str(tmp_path / "test_cache.sqlite")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE track_cache (artist TEXT NOT NULL, title TEXT NOT NULL, "
+            "track_id TEXT NOT NULL, created_at REAL NOT NULL DEFAULT 0, "
+            "last_hit_at REAL NOT NULL DEFAULT 0, hits INTEGER NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (artist, title))"
+        )
+        conn.execute("INSERT INTO track_cache VALUES ('a', 'b', 'id1', 5, 5, 2)")
+    c = cache.TrackCache(db_path)
+    assert c.get_record("a", "b") == cache.TrackRecord("id1")
+    assert c.conn.execute("SELECT created_at FROM track_cache").fetchone()[0] == 5
+
+
+def test_track_cache_replace_and_drop_track(tmp_path):
+    c = cache.TrackCache(str(tmp_path / "test_cache.sqlite"), memory_size=10)
+    c.set("A", "One", "old")
+    c.set("A", "One (Live)", "old")
+    c.set("B", "Two", "other")
+    assert c.keys_by_track_id() == {
+        "old": [("a", "one"), ("a", "one (live)")],
+        "other": [("b", "two")],
+    }
+    assert c.keys_by_track_id(["other", "unknown"]) == {"other": [("b", "two")]}
+    record = cache.TrackRecord("new", name="One", artists=("A",))
+    assert c.replace_track("old", record) == 2
+    assert c.get_record("a", "one (live)") == record
+    assert c.drop_track("other") == 1
+    assert c.get("B", "Two") is None
+    assert c.drop_track("missing") == 0
+    c.close()
+
+
+def test_track_cache_drop_track_is_buffered(tmp_path):
+    db_path = str(tmp_path / "test_cache.sqlite")
+    c = cache.TrackCache(db_path, write_batch=1000)
+    c.set("a", "one", "x")
+    c.set("a", "two", "x")
+    c.flush()
+    assert c.drop_track("x") == 2
+    assert c.get_many([("a", "one"), ("a", "two")]) == {}
+    c.set("a", "two", "x")
+    assert c.keys_by_track_id() == {"x": [("a", "two")]}
+    c.close()
+    reopened = cache.TrackCache(db_path)
+    assert reopened.get("a", "one") is None
+    assert reopened.get("a", "two") == "x"
+    reopened.close()
@@ -0,0 +1,153 @@
+from unittest import mock
+from yt2spotify import catalog, cli
+from yt2spotify.cache import TrackRecord
+
+
+class CatalogSpotify:
+    """
+    One artist with two albums; album B's tracks span two pages.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def search(self, q, type, limit):
+        self.calls.append(("search", q, type))
+        if type == "artist":
+            items = [{"id": "other", "name": "Artist Tribute"}]
+            if "artist" in q and "unknown" not in q:
+                items.append({"id": "art1", "name": "Artist"})
+            return {"artists": {"items": items}}
+        return {"tracks": {"items": []}}
+
+    def artist_albums(self, artist_id, include_groups=None, limit=20):
+        self.calls.append(("artist_albums", artist_id))
+        return {"items": [{"id": "albA"}], "next": "page2", "page": 1}
+
+    def albums(self, album_ids):
+        self.calls.append(("albums", tuple(album_ids)))
+        artists = [{"name": "Artist"}]
+        return {
+            "albums": [
+                {
+                    "name": "Album A",
+                    "tracks": {
+                        "items": [{"id": "t1", "name": "One", "artists": artists}],
+                        "next": None,
+                    },
+                },
+                {
+                    "name": "Album B",
+                    "tracks": {
+                        "items": [{"id": "t2", "name": "Two", "artists": artists}],
+                        "next": "tracks2",
+                    },
+                },
+            ]
+        }
+
+    def next(self, page):
+        self.calls.append(("next", page["next"]))
+        if page["next"] == "page2":
+            return {"items": [{"id": "albB"}], "next": None}
+        artists = [{"name": "Artist"}]
+        return {
+            "items": [{"id": "t3", "name": "Three (Remastered)", "artists": artists}],
+            "next": None,
+        }
+
+
+def test_fetch_artist_catalog_pages_albums_and_tracks():
+    sp = CatalogSpotify()
+    tracks = catalog.fetch_artist_catalog(sp, "art1")
+    assert [(t.track_id, t.album) for t in tracks] == [
+        ("t1", "Album A"),
+        ("t2", "Album B"),
+        ("t3", "Album B"),
+    ]
+    assert ("albums", ("albA", "albB")) in sp.calls
+
+
+def test_catalog_cache_round_trip_and_ttl(tmp_path):
+    record = TrackRecord("t1", name="One", artists=("Artist",), album="A")
+    with catalog.CatalogCache(str(tmp_path / "c.sqlite"), ttl=100) as store:
+        assert store.get("Artist") is None
+        store.set("ARTIST", "art1", [record], now=1000)
+        assert store.get("artist", now=1050) == [record]
+        assert store.get("artist", now=1200) is None
+
+
+def test_catalogs_do_not_count_against_track_cache_budget(tmp_path, monkeypatch):
+    from yt2spotify.cache import TrackCache
+
+    monkeypatch.chdir(tmp_path)
+    records = [
+        TrackRecord(f"t{i}", name=f"song {i}", artists=("Artist",), album="A")
+        for i in range(5000)
+    ]
+    with catalog.CatalogCache() as store:
+        store.set("Artist", "art1", records)
+    with TrackCache(write_batch=1000, max_bytes=384 * 1024) as c:
+        for i in range(2000):
+            c.set(f"artist {i}", f"title {i}", f"id{i}")
+    with TrackCache() as c:
+        assert c.get("artist 0", "title 0") == "id0"
+        assert c.get("artist 1999", "title 1999") == "id1999"
+    with catalog.CatalogCache() as store:
+        assert len(store.get("artist") or []) == 5000
+
+
+def test_resolve_from_catalogs_groups_by_artist(tmp_path):
+    sp = CatalogSpotify()
+    queries = [
+        ("artist", "one", "q1"),
+        ("Artist", "three", "q2"),
+        ("artist", "not on any album", "q3"),
+        ("loner", "single title", "q4"),
+        ("unknown", "a", "q5"),
+        ("unknown", "b", "q6"),
+    ]
+    config = {"catalog_min_titles": 2}
+    with catalog.CatalogCache(str(tmp_path / "c.sqlite")) as store:
+        resolved = catalog.resolve_from_catalogs(sp, queries, store, config)
+        assert {i: r.track_id for i, r in resolved.items()} == {0: "t1", 1: "t3"}
+        # Both catalogs (including the empty one) are stored and reused
+        calls = len(sp.calls)
+        assert catalog.resolve_from_catalogs(sp, queries, store, config).keys() == {
+            0,
+            1,
+        }
+        assert len(sp.calls) == calls
+    artist_searches = [c for c in sp.calls if c[0] == "search"]
+    assert [c[1] for c in artist_searches] == ["artist:artist", "artist:unknown"]
+    assert catalog.resolve_from_catalogs(sp, queries, store, {}) == {}
+
+
+def test_sync_command_resolves_artist_catalogs(tmp_path, monkeypatch):
+    class FakeSpotify(CatalogSpotify):
+        def __init__(self):
+            super().__init__()
+            self.added = []
+
+        def playlist_tracks(self, playlist_id, **kwargs):
+            return {"items": [], "next": None}
+
+        def playlist_add_items(self, playlist_id, batch):
+            self.added.extend(batch)
+
+    # Catalogs and the track cache live in the working directory
+    monkeypatch.chdir(tmp_path)
+    sp = FakeSpotify()
+    with mock.patch("yt2spotify.cli.get_spotify_client", return_value=sp), mock.patch(
+        "yt2spotify.cli.get_yt_playlist_titles_yt_dlp",
+        return_value=["Artist - One", "Artist - Three", "Artist - Missing"],
+    ), mock.patch.object(cli, "OUTPUT_DIR", str(tmp_path)):
+        cli.sync_command(
+            yt_url="fake_url",
+            playlist_id="pl",
+            no_progress=True,
+            config={"catalog_min_titles": 2, "membership_cache": False},
+        )
+    assert sp.added == ["t1", "t3"]
+    track_searches = [c[1] for c in sp.calls if c[0] == "search" and c[2] == "track"]
+    assert track_searches == ["artist:artist track:missing"]
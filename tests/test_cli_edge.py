@@ -18,7 +18,7 @@ def test_load_config_invalid_toml(tmp_path):
 
 def test_sync_command_dry_run(tmp_path):
     class DummySpotify:
-        def playlist_tracks(self, playlist_id):
+        def playlist_tracks(self, playlist_id, **kwargs):
             return {"items": [], "next": None}
 
         def playlist_add_items(self, playlist_id, batch):
@@ -33,7 +33,14 @@ def test_sync_command_dry_run(tmp_path):
         "yt2spotify.cli.get_yt_playlist_titles_yt_dlp", return_value=["Artist - Track"]
     ), mock.patch(
         "yt2spotify.cache.TrackCache",
-        lambda: mock.Mock(get=lambda a, t: None, set=lambda a, t, i: None),
+        lambda **kwargs: mock.Mock(
+            get=lambda a, t: None,
+            set=lambda a, t, i: None,
+            is_fresh_miss=lambda a, t: False,
+            get_many=lambda keys: {},
+            fresh_misses=lambda keys: set(),
+            set_miss=lambda a, t: None,
+        ),
     ), mock.patch.object(
         cli, "OUTPUT_DIR", str(tmp_path)
     ):
@@ -59,7 +66,7 @@ def test_sync_command_dry_run(tmp_path):
 
 def test_sync_command_private_deleted_titles(tmp_path):
     class DummySpotify:
-        def playlist_tracks(self, playlist_id):
+        def playlist_tracks(self, playlist_id, **kwargs):
             return {"items": [], "next": None}
 
         def playlist_add_items(self, playlist_id, batch):
@@ -75,7 +82,14 @@ def test_sync_command_private_deleted_titles(tmp_path):
         "yt2spotify.cli.get_yt_playlist_titles_yt_dlp", return_value=titles
     ), mock.patch(
         "yt2spotify.cache.TrackCache",
-        lambda: mock.Mock(get=lambda a, t: None, set=lambda a, t, i: None),
+        lambda **kwargs: mock.Mock(
+            get=lambda a, t: None,
+            set=lambda a, t, i: None,
+            is_fresh_miss=lambda a, t: False,
+            get_many=lambda keys: {},
+            fresh_misses=lambda keys: set(),
+            set_miss=lambda a, t: None,
+        ),
     ), mock.patch.object(
         cli, "OUTPUT_DIR", str(tmp_path)
     ):
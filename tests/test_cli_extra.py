@@ -2,6 +2,7 @@
 import json
 import logging
 from unittest import mock
+import pytest
 from yt2spotify import cli
 
 logger = logging.getLogger("yt2spotify.tests")
@@ -17,6 +18,21 @@ class DummyTrackCache:
     def set(self, artist, title, track_id):
         self._cache[(artist, title)] = track_id
 
+    def set_record(self, artist, title, record):
+        self.set(artist, title, record.track_id)
+
+    def is_fresh_miss(self, artist, title):
+        return False
+
+    def get_many(self, keys):
+        return {k: self._cache[k] for k in keys if k in self._cache}
+
+    def fresh_misses(self, keys):
+        return set()
+
+    def set_miss(self, artist, title):
+        pass
+
     def close(self):
         pass
 
@@ -32,7 +48,7 @@ def test_sync_command_spotify_429_retry(tmp_path):
         def __init__(self):
             self.calls = 0
 
-        def playlist_tracks(self, playlist_id):
+        def playlist_tracks(self, playlist_id, **kwargs):
             return {"items": [], "next": None}
 
         def playlist_add_items(self, playlist_id, batch):
@@ -97,7 +113,7 @@ def test_sync_command_output_file_merging(tmp_path):
         def __init__(self):
             self.calls = 0
 
-        def playlist_tracks(self, playlist_id):
+        def playlist_tracks(self, playlist_id, **kwargs):
             return {"items": [], "next": None}
 
         def playlist_add_items(self, playlist_id, batch):
@@ -155,7 +171,7 @@ def test_sync_command_output_file_merging(tmp_path):
 
 def test_sync_command_empty_youtube_playlist(tmp_path):
     class FakeSpotify:
-        def playlist_tracks(self, playlist_id):
+        def playlist_tracks(self, playlist_id, **kwargs):
             return {"items": [], "next": None}
 
         def playlist_add_items(self, playlist_id, batch):
@@ -200,7 +216,7 @@ def test_sync_command_empty_youtube_playlist(tmp_path):
 
 def test_sync_command_summary_log(tmp_path, caplog):
     class FakeSpotify:
-        def playlist_tracks(self, playlist_id):
+        def playlist_tracks(self, playlist_id, **kwargs):
             return {"items": [], "next": None}
 
         def playlist_add_items(self, playlist_id, batch):
@@ -211,3 +227,384 @@ def test_sync_command_summary_log(tmp_path, caplog):
             if "Unknown" in q:
                 return {"tracks": {"items": []}}
             return {"tracks": {"items": [{"id": "SPOTIFY_TRACK_ID"}]}}
+
+
+def test_sync_command_incremental_only_processes_new_videos(tmp_path, monkeypatch):
+    class FakeSpotify:
+        def __init__(self):
+            self.searches = []
+            self.added = []
+
+        def playlist_tracks(self, playlist_id, **kwargs):
+            return {"items": [], "next": None}
+
+        def playlist_add_items(self, playlist_id, batch):
+            self.added.extend(batch)
+
+        def search(self, q, type, limit):
+            self.searches.append(q)
+            if "unknown" in q:
+                return {"tracks": {"items": []}}
+            return {"tracks": {"items": [{"id": "ID_" + q.split(":")[-1]}]}}
+
+    # SyncState lives in the working directory
+    monkeypatch.chdir(tmp_path)
+    entries = [("v1", "Artist - One"), ("v2", "Unknown - Nothing")]
+    sp = FakeSpotify()
+    config = {"incremental": True, "batch_delay": 0.01, "max_retries": 1}
+    for pipeline in (False, True):
+        with mock.patch(
+            "yt2spotify.cli.get_spotify_client", return_value=sp
+        ), mock.patch(
+            "yt2spotify.cli.iter_yt_playlist_entries_yt_dlp",
+            lambda url: iter(list(entries)),
+        ), mock.patch(
+            "yt2spotify.cache.TrackCache", DummyTrackCache
+        ), mock.patch.object(
+            cli, "OUTPUT_DIR", str(tmp_path)
+        ):
+            cli.sync_command(
+                yt_url="https://youtube.com/playlist?list=PL1",
+                playlist_id="fake_playlist",
+                no_progress=True,
+                config=dict(config, pipeline=pipeline),
+            )
+        entries.insert(0, ("v3", "Artist - Three"))
+    # The first video is done after run one; the miss is retried every run
+    assert sp.searches == [
+        "artist:artist track:one",
+        "artist:unknown track:nothing",
+        "artist:artist track:three",
+        "artist:unknown track:nothing",
+    ]
+    assert sp.added == ["ID_one", "ID_three"]
+    from yt2spotify.sync_state import SyncState
+
+    with SyncState() as state:
+        assert state.known_ids("PL1", "fake_playlist") == {"v1", "v3"}
+
+
+def test_sync_command_closes_sync_state_on_failure(tmp_path, monkeypatch):
+    from yt2spotify.sync_state import SyncState
+
+    closed = []
+
+    class RecordingSyncState(SyncState):
+        def close(self):
+            closed.append(self._conn is not None)
+            super().close()
+
+    def broken_entries(url):
+        raise RuntimeError("youtube down")
+        yield
+
+    sp = mock.Mock()
+    sp.playlist_tracks.return_value = {"items": [], "next": None}
+    monkeypatch.chdir(tmp_path)
+    with mock.patch("yt2spotify.cli.get_spotify_client", return_value=sp), mock.patch(
+        "yt2spotify.cli.iter_yt_playlist_entries_yt_dlp", broken_entries
+    ), mock.patch("yt2spotify.cli.SyncState", RecordingSyncState), mock.patch(
+        "yt2spotify.cache.TrackCache", DummyTrackCache
+    ), mock.patch.object(
+        cli, "OUTPUT_DIR", str(tmp_path)
+    ):
+        with pytest.raises(RuntimeError):
+            cli.sync_command(
+                yt_url="https://youtube.com/playlist?list=PL1",
+                playlist_id="fake_playlist",
+                no_progress=True,
+                config={"incremental": True, "membership_cache": False},
+            )
+    assert closed == [True]
+
+
+def test_sync_command_reuses_stored_membership(tmp_path, monkeypatch):
+    class FakeSpotify:
+        def __init__(self):
+            self.snapshot_id = "s1"
+            self.track_ids = ["one"]
+            self.page_calls = 0
+
+        def playlist(self, playlist_id, fields=None):
+            return {"snapshot_id": self.snapshot_id}
+
+        def playlist_tracks(self, playlist_id, **kwargs):
+            self.page_calls += 1
+            items = [{"track": {"id": tid}} for tid in self.track_ids]
+            return {"items": items, "next": None}
+
+        def playlist_add_items(self, playlist_id, batch):
+            self.track_ids.extend(batch)
+            self.snapshot_id += "+"
+            return {"snapshot_id": self.snapshot_id}
+
+        def search(self, q, type, limit):
+            return {"tracks": {"items": [{"id": q.split(":")[-1]}]}}
+
+    # The membership store lives next to the track cache in the working directory
+    monkeypatch.chdir(tmp_path)
+    sp = FakeSpotify()
+    titles = ["Artist - One", "Artist - Two"]
+    for _ in range(2):
+        with mock.patch(
+            "yt2spotify.cli.get_spotify_client", return_value=sp
+        ), mock.patch(
+            "yt2spotify.cli.get_yt_playlist_titles_yt_dlp", return_value=titles
+        ), mock.patch(
+            "yt2spotify.cache.TrackCache", DummyTrackCache
+        ), mock.patch.object(
+            cli, "OUTPUT_DIR", str(tmp_path)
+        ):
+            cli.sync_command(
+                yt_url="fake_url",
+                playlist_id="fake_playlist",
+                no_progress=True,
+                config={"batch_delay": 0.01},
+            )
+    # Only the first run paged through the playlist; our own add was recorded
+    assert sp.page_calls == 1
+    assert sp.track_ids == ["one", "two"]
+
+
+def test_sync_command_pipeline_stores_membership_with_real_stores(
+    tmp_path, monkeypatch
+):
+    import threading
+    import time
+
+    class FakeSpotify:
+        def __init__(self):
+            self.snapshot_id = "s1"
+            self.track_ids = ["one"]
+            self.page_calls = 0
+            self.searched = threading.Event()
+
+        def playlist(self, playlist_id, fields=None):
+            return {"snapshot_id": self.snapshot_id}
+
+        def playlist_tracks(self, playlist_id, **kwargs):
+            # A slow membership fetch that ends after search results are cached
+            self.searched.wait(timeout=0.5)
+            time.sleep(0.1)
+            self.page_calls += 1
+            items = [{"track": {"id": tid}} for tid in self.track_ids]
+            return {"items": items, "next": None}
+
+        def playlist_add_items(self, playlist_id, batch):
+            self.track_ids.extend(batch)
+            self.snapshot_id += "+"
+            return {"snapshot_id": self.snapshot_id}
+
+        def search(self, q, type, limit):
+            self.searched.set()
+            return {"tracks": {"items": [{"id": q.split(":")[-1]}]}}
+
+    # Real TrackCache and SyncState in their default files in the working directory
+    monkeypatch.chdir(tmp_path)
+    sp = FakeSpotify()
+    titles = ["Artist - One", "Artist - Two", "Artist - Three"]
+    for _ in range(2):
+        with mock.patch(
+            "yt2spotify.cli.get_spotify_client", return_value=sp
+        ), mock.patch(
+            "yt2spotify.cli.iter_yt_playlist_titles_yt_dlp",
+            lambda url: iter(list(titles)),
+        ), mock.patch.object(
+            cli, "OUTPUT_DIR", str(tmp_path)
+        ):
+            cli.sync_command(
+                yt_url="fake_url",
+                playlist_id="fake_playlist",
+                no_progress=True,
+                config={"pipeline": True, "batch_delay": 0.01},
+            )
+    assert sp.page_calls == 1
+    assert sorted(sp.track_ids) == ["one", "three", "two"]
+    from yt2spotify.cache import TrackCache
+
+    with TrackCache() as cache:
+        assert cache.get("artist", "three") == "three"
+
+
+def test_sync_command_snapshot_and_membership_share_one_fetch(tmp_path):
+    class FakeSpotify:
+        def __init__(self):
+            self.fields = []
+
+        def playlist_tracks(self, playlist_id, **kwargs):
+            self.fields.append(kwargs.get("fields"))
+            return {"items": [{"track": {"id": "t1", "name": "Song"}}], "next": None}
+
+        def playlist_add_items(self, playlist_id, batch):
+            return None
+
+        def search(self, q, type, limit):
+            return {"tracks": {"items": [{"id": "t1"}]}}
+
+    sp = FakeSpotify()
+    with mock.patch("yt2spotify.cli.get_spotify_client", return_value=sp), mock.patch(
+        "yt2spotify.cli.get_yt_playlist_titles_yt_dlp", return_value=["A - Song"]
+    ), mock.patch("yt2spotify.cache.TrackCache", DummyTrackCache), mock.patch.object(
+        cli, "OUTPUT_DIR", str(tmp_path)
+    ):
+        cli.sync_command(
+            yt_url="fake_url",
+            playlist_id="pl",
+            no_progress=True,
+            config={"snapshot": True},
+        )
+    from yt2spotify.playlist import PLAYLIST_ITEM_FIELDS
+
+    assert sp.fields == [PLAYLIST_ITEM_FIELDS]
+    with open(tmp_path / "playlist_pl_snapshot.json", encoding="utf-8") as f:
+        assert json.load(f) == [{"track": {"id": "t1", "name": "Song"}}]
+    with open(tmp_path / "added_songs.json", encoding="utf-8") as f:
+        assert json.load(f)[0]["status"] == "already_in_playlist"
+
+
+def test_sync_command_runs_inside_an_event_loop(tmp_path):
+    import asyncio
+
+    class FakeSpotify:
+        def __init__(self):
+            self.added = []
+
+        def playlist_tracks(self, playlist_id, **kwargs):
+            return {"items": [], "next": None}
+
+        def playlist_add_items(self, playlist_id, batch):
+            self.added.extend(batch)
+
+        def search(self, q, type, limit):
+            return {"tracks": {"items": [{"id": "t1"}]}}
+
+    async def handler():
+        cli.sync_command(
+            yt_url="fake_url",
+            playlist_id="pl",
+            no_progress=True,
+            config={"membership_cache": False},
+        )
+
+    sp = FakeSpotify()
+    with mock.patch("yt2spotify.cli.get_spotify_client", return_value=sp), mock.patch(
+        "yt2spotify.cli.get_yt_playlist_titles_yt_dlp", return_value=["A - Song"]
+    ), mock.patch("yt2spotify.cache.TrackCache", DummyTrackCache), mock.patch.object(
+        cli, "OUTPUT_DIR", str(tmp_path)
+    ):
+        asyncio.run(handler())
+    assert sp.added == ["t1"]
+
+
+def test_sync_command_searches_with_async_client(tmp_path):
+    class FakeSpotify:
+        def playlist_tracks(self, playlist_id, **kwargs):
+            return {"items": [], "next": None}
+
+        def playlist_add_items(self, playlist_id, batch):
+            self.added = list(batch)
+
+        def search(self, q, type, limit):
+            raise AssertionError("searched with the spotipy client")
+
+    class FakeAsyncSpotify:
+        closed = False
+
+        async def search(self, q, type, limit):
+            return {"tracks": {"items": [{"id": q.split(":")[-1]}]}}
+
+        async def aclose(self):
+            self.closed = True
+
+    sp = FakeSpotify()
+    async_sp = FakeAsyncSpotify()
+    with mock.patch("yt2spotify.cli.get_spotify_client", return_value=sp), mock.patch(
+        "yt2spotify.cli.get_async_spotify_client", return_value=async_sp
+    ), mock.patch(
+        "yt2spotify.cli.get_yt_playlist_titles_yt_dlp", return_value=["A - Song"]
+    ), mock.patch(
+        "yt2spotify.cache.TrackCache", DummyTrackCache
+    ), mock.patch.object(
+        cli, "OUTPUT_DIR", str(tmp_path)
+    ):
+        cli.sync_command(
+            yt_url="fake_url",
+            playlist_id="pl",
+            no_progress=True,
+            config={"async_http": True, "membership_cache": False},
+        )
+    assert sp.added == ["song"]
+    assert async_sp.closed
+
+
+def test_sync_command_async_http_without_httpx_uses_threads(tmp_path, caplog):
+    class FakeSpotify:
+        def playlist_tracks(self, playlist_id, **kwargs):
+            return {"items": [], "next": None}
+
+        def playlist_add_items(self, playlist_id, batch):
+            self.added = list(batch)
+
+        def search(self, q, type, limit):
+            return {"tracks": {"items": [{"id": q.split(":")[-1]}]}}
+
+    def no_httpx(**kwargs):
+        raise ImportError("AsyncSpotify needs httpx")
+
+    sp = FakeSpotify()
+    with mock.patch("yt2spotify.cli.get_spotify_client", return_value=sp), mock.patch(
+        "yt2spotify.cli.get_async_spotify_client", no_httpx
+    ), mock.patch(
+        "yt2spotify.cli.get_yt_playlist_titles_yt_dlp", return_value=["A - Song"]
+    ), mock.patch(
+        "yt2spotify.cache.TrackCache", DummyTrackCache
+    ), mock.patch.object(
+        cli, "OUTPUT_DIR", str(tmp_path)
+    ):
+        cli.sync_command(
+            yt_url="fake_url",
+            playlist_id="pl",
+            no_progress=True,
+            config={"async_http": True, "membership_cache": False},
+        )
+    assert sp.added == ["song"]
+    assert "searching on threads instead" in caplog.text
+
+
+def test_sync_command_revalidates_before_adding(tmp_path, monkeypatch):
+    class FakeSpotify:
+        def __init__(self):
+            self.added = []
+
+        def playlist_tracks(self, playlist_id, **kwargs):
+            return {"items": [], "next": None}
+
+        def playlist_add_items(self, playlist_id, batch):
+            self.added.extend(batch)
+
+        def search(self, q, type, limit):
+            return {"tracks": {"items": [{"id": q.split(":")[-1]}]}}
+
+        def tracks(self, ids, market=None):
+            known = {"one": {"id": "one_relinked"}}
+            return {"tracks": [known.get(tid) for tid in ids]}
+
+    # Uses the real track cache in the working directory
+    monkeypatch.chdir(tmp_path)
+    sp = FakeSpotify()
+    with mock.patch("yt2spotify.cli.get_spotify_client", return_value=sp), mock.patch(
+        "yt2spotify.cli.get_yt_playlist_titles_yt_dlp",
+        return_value=["Artist - One", "Artist - Two"],
+    ), mock.patch.object(cli, "OUTPUT_DIR", str(tmp_path)):
+        cli.sync_command(
+            yt_url="fake_url",
+            playlist_id="pl",
+            no_progress=True,
+            config={"revalidate_before_add": True, "membership_cache": False},
+        )
+    assert sp.added == ["one_relinked"]
+    from yt2spotify.cache import TrackCache
+
+    with TrackCache() as c:
+        assert c.get("artist", "one") == "one_relinked"
+        assert c.get("artist", "two") is None
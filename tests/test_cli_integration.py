@@ -12,7 +12,7 @@ def test_sync_command_not_found(monkeypatch, tmp_path):
     from yt2spotify import cli
 
     class FakeSpotify:
-        def playlist_tracks(self, playlist_id):
+        def playlist_tracks(self, playlist_id, **kwargs):
             return {"items": [], "next": None}
 
         def search(self, q, type, limit):
@@ -61,7 +61,7 @@ def test_sync_command_skipped_private_deleted(monkeypatch, tmp_path):
     from yt2spotify import cli
 
     class FakeSpotify:
-        def playlist_tracks(self, playlist_id):
+        def playlist_tracks(self, playlist_id, **kwargs):
             return {"items": [], "next": None}
 
         def search(self, q, type, limit):
@@ -14,7 +14,7 @@ def test_sync_command_already_in_playlist(monkeypatch, tmp_path):
     from yt2spotify import cli
 
     class FakeSpotify:
-        def playlist_tracks(self, playlist_id):
+        def playlist_tracks(self, playlist_id, **kwargs):
             return {"items": [{"track": {"id": "TRACK_ID_1"}}], "next": None}
 
         def search(self, q, type, limit):
@@ -45,3 +45,13 @@ def test_main_with_config_file(mock_sync_command, monkeypatch, tmp_path):
     )
     cli.main()
     mock_sync_command.assert_called_once()
+
+
+@mock.patch("yt2spotify.cli.revalidate_track_ids")
+@mock.patch("yt2spotify.cli.get_spotify_client")
+def test_main_cache_revalidate(mock_client, mock_revalidate, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["prog", "cache", "revalidate", "--market", "SE"])
+    cli.main()
+    _, kwargs = mock_revalidate.call_args
+    assert kwargs["config"]["revalidate_market"] == "SE"
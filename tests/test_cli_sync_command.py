@@ -8,7 +8,7 @@ import json
 def test_sync_command_dry_run(tmp_path):
     # Mock dependencies
     class FakeSpotify:
-        def playlist_tracks(self, playlist_id):
+        def playlist_tracks(self, playlist_id, **kwargs):
             return {"items": [], "next": None}
 
         def playlist_add_items(self, playlist_id, batch):
@@ -49,3 +49,39 @@ def test_sync_command_dry_run(tmp_path):
                 assert isinstance(data, list)
             else:
                 assert True
+
+
+def test_sync_command_fetches_youtube_and_membership_concurrently(tmp_path):
+    import threading
+
+    membership_started = threading.Event()
+
+    class FakeSpotify:
+        def playlist_tracks(self, playlist_id, **kwargs):
+            membership_started.set()
+            return {"items": [], "next": None}
+
+        def playlist_add_items(self, playlist_id, batch):
+            return None
+
+        def search(self, q, type, limit):
+            return {"tracks": {"items": []}}
+
+    def slow_titles(url):
+        # Only returns once the membership fetch is already running
+        assert membership_started.wait(timeout=5)
+        return ["Artist - Track"]
+
+    with mock.patch(
+        "yt2spotify.cli.get_spotify_client", return_value=FakeSpotify()
+    ), mock.patch(
+        "yt2spotify.cli.get_yt_playlist_titles_yt_dlp", side_effect=slow_titles
+    ), mock.patch(
+        "yt2spotify.cache.TrackCache"
+    ), mock.patch.object(
+        cli, "OUTPUT_DIR", str(tmp_path)
+    ):
+        cli.sync_command(
+            yt_url="fake_url", playlist_id="fake_playlist", dry_run=True, config={}
+        )
+    assert membership_started.is_set()
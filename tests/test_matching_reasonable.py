@@ -45,3 +45,34 @@ def test_is_reasonable_match_empty_title():
 
 def test_is_reasonable_match_none_values():
     assert matching.is_reasonable_match(None, None, None, None)
+
+
+def test_best_match_prefers_highest_scoring_candidate():
+    from yt2spotify.cache import TrackRecord
+
+    candidates = [
+        TrackRecord("cover", name="One More Time", artists=("Karaoke Band",)),
+        TrackRecord("remix", name="One More Time (Remix)", artists=("Daft Punk",)),
+        TrackRecord("orig", name="One More Time", artists=("Daft Punk",)),
+    ]
+    best = matching.best_match("Daft Punk", "One More Time", candidates)
+    assert best is not None and best.track_id == "orig"
+
+
+def test_best_match_returns_none_below_threshold():
+    from yt2spotify.cache import TrackRecord
+
+    candidates = [TrackRecord("x", name="Digital Love", artists=("Daft Punk",))]
+    assert matching.best_match("Daft Punk", "One More Time", candidates) is None
+    assert matching.best_match("Daft Punk", "One More Time", []) is None
+
+
+def test_is_reasonable_match_custom_thresholds():
+    assert not matching.is_reasonable_match(
+        "Daft Punk",
+        "One More Time",
+        "Daft Punk",
+        "One More Time (Radio Edit)",
+        jw_threshold=1.0,
+        token_set_threshold=101,
+    )
@@ -1,5 +1,6 @@
 import sys
 import os
+import pytest
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
@@ -38,3 +39,87 @@ def test_is_reasonable_match_jw_and_token_set(monkeypatch):
     monkeypatch.setattr(matching, "JaroWinkler", DummyJWBad)
     monkeypatch.setattr(matching, "token_set_ratio", None)
     assert not matching.is_reasonable_match("A", "B", "A", "ZZZ")
+
+
+def test_is_reasonable_record_uses_cached_metadata():
+    from yt2spotify.cache import TrackRecord
+
+    record = TrackRecord("id1", name="One More Time", artists=("Daft Punk",))
+    assert matching.is_reasonable_record("Daft Punk", "One More Time", record)
+    assert not matching.is_reasonable_record("Daft Punk", "Around the World", record)
+    # Entries cached before metadata was stored cannot be re-scored
+    assert not matching.is_reasonable_record(
+        "Daft Punk", "One More Time", TrackRecord("id1")
+    )
+
+
+def test_match_many_picks_best_candidate_per_row():
+    indices, scores = matching.match_many(
+        ["Daft Punk", "Justice", "Nobody"],
+        ["One More Time", "D.A.N.C.E.", "Unknown Song"],
+        ["Daft Punk", "Daft Punk", "Justice"],
+        ["One More Time (Remix)", "One More Time", "D.A.N.C.E."],
+    )
+    assert indices == [1, 2, -1]
+    assert scores[0] == scores[1] == 2.0 and scores[2] == 0.0
+
+
+def test_match_many_uses_cdist_when_available(monkeypatch):
+    np = pytest.importorskip("numpy")
+    calls = []
+
+    def fake_cdist(queries, choices, scorer, workers, dtype):
+        calls.append((len(queries), len(choices), workers))
+        return np.array([[scorer(q, c) for c in choices] for q in queries], dtype)
+
+    monkeypatch.setattr(matching, "cdist", fake_cdist)
+    monkeypatch.setattr(matching, "MATCH_CHUNK", 2)
+    indices, _ = matching.match_many(
+        ["a", "b", "c"], ["x", "y", "z"], ["c", "b", "a"], ["z", "y", "x"], workers=4
+    )
+    assert indices == [2, 1, 0]
+    # Two chunks, one JaroWinkler and one token set matrix each
+    assert calls == [(2, 3, 4), (2, 3, 4), (1, 3, 4), (1, 3, 4)]
+
+
+def test_match_many_without_rapidfuzz(monkeypatch):
+    monkeypatch.setattr(matching, "JaroWinkler", None)
+    monkeypatch.setattr(matching, "token_set_ratio", None)
+    indices, _ = matching.match_many(["A"], ["Song"], ["B", "A"], ["Song", "Song"])
+    assert indices == [1]
+
+
+def test_match_many_real_cdist_agrees_with_python_path(monkeypatch):
+    pytest.importorskip("numpy")
+    pytest.importorskip("rapidfuzz")
+    assert matching.cdist is not None
+    searched_artists = ["Daft Punk", "Justice", "Nobody", "Air", "Daft Punk"]
+    searched_titles = [
+        "One More Time",
+        "D.A.N.C.E.",
+        "Unknown Song",
+        "Sexy Boy",
+        "Around the World",
+    ]
+    candidate_artists = ["Air", "Daft Punk", "Daft Punk", "Justice", "Daft Punk"]
+    candidate_titles = [
+        "One More Time",
+        "One More Time (Remix)",
+        "One More Time",
+        "D.A.N.C.E.",
+        "Around The World",
+    ]
+    monkeypatch.setattr(matching, "MATCH_CHUNK", 2)
+    vectorized = matching.match_many(
+        searched_artists, searched_titles, candidate_artists, candidate_titles
+    )
+    # The best title match belongs to another artist, so the next one wins
+    assert vectorized[0] == [2, 3, -1, -1, 4]
+    monkeypatch.setattr(matching, "cdist", None)
+    assert (
+        matching.match_many(
+            searched_artists, searched_titles, candidate_artists, candidate_titles
+        )
+        == vectorized
+    )
+    assert matching.match_many(["a"], ["b"], [], []) == ([-1], [0.0])
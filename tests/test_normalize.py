@@ -0,0 +1,61 @@
+from yt2spotify import normalize, utils
+
+
+def test_utils_reexports_normalizer():
+    assert utils.clean_title is normalize.clean_title
+    assert utils.parse_artist_track is normalize.parse_artist_track
+
+
+def test_fold_ascii_fast_path_matches_unicode_path():
+    assert normalize.fold("Daft Punk - ONE More Time") == "daft punk - one more time"
+    assert normalize.fold("ＤＡＦＴ Straße") == "daft strasse"
+
+
+def test_parse_artist_track_unicode_and_ascii_separators():
+    assert normalize.parse_artist_track("AC | DC / Song") == ("ac", "dc - song")
+    assert normalize.parse_artist_track("Sigur Rós — Hoppípolla") == (
+        "sigur rós",
+        "hoppípolla",
+    )
+
+
+def test_memo_caches_and_clears():
+    normalize.clear_memo()
+    normalize.parse_artist_track("Artist - Track (Official Video)")
+    normalize.parse_artist_track("Artist - Track (Official Video)")
+    assert normalize.parse_artist_track.cache_info().hits == 1
+    normalize.clear_memo()
+    assert normalize.parse_artist_track.cache_info().currsize == 0
+
+
+def test_compile_stop_words_matches_whole_words_only():
+    pattern = normalize.compile_stop_words(["official", "HD", "ft.", "of"])
+    assert normalize.strip_stop_words("Official song HD offline ft. x", pattern) == (
+        "song offline x"
+    )
+    # Substrings inside real words are kept
+    assert normalize.strip_stop_words("unofficial hdtv", pattern) == "unofficial hdtv"
+    assert normalize.compile_stop_words([]) is None
+    assert normalize.strip_stop_words("a  b", None) == "a  b"
+
+
+def test_compile_stop_words_handles_large_lists():
+    words = [f"word{i}" for i in range(5000)]
+    pattern = normalize.compile_stop_words(words)
+    assert normalize.strip_stop_words("keep word42 word4999 word5000", pattern) == (
+        "keep word5000"
+    )
+
+
+def test_build_search_query_applies_stop_words():
+    pattern = utils.compile_stop_words(["remix", "official", "by"])
+    assert (
+        utils.build_search_query("x", "by the sea", "song remix", pattern)
+        == "artist:by the sea track:song"
+    )
+    # Never strips a query down to nothing
+    assert (
+        utils.build_search_query("x", "artist", "remix", pattern)
+        == "artist:artist track:remix"
+    )
+    assert utils.build_search_query("Stand By Me", None, "", pattern) == "stand me"
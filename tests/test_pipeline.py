@@ -0,0 +1,161 @@
+import threading
+from unittest import mock
+from yt2spotify import cli, pipeline
+
+
+class DictCache:
+    def __init__(self, initial=None, **kwargs):
+        self.data = dict(initial or {})
+        self.misses = set()
+
+    def get(self, artist, title):
+        return self.data.get((artist, title))
+
+    def set(self, artist, title, track_id):
+        self.data[(artist, title)] = track_id
+
+    def set_record(self, artist, title, record):
+        self.set(artist, title, record.track_id)
+
+    def is_fresh_miss(self, artist, title):
+        return (artist, title) in self.misses
+
+    def get_many(self, keys):
+        return {k: self.data[k] for k in keys if k in self.data}
+
+    def fresh_misses(self, keys):
+        return {k for k in keys if k in self.misses}
+
+    def set_miss(self, artist, title):
+        self.misses.add((artist, title))
+
+    def close(self):
+        pass
+
+
+class FakeSpotify:
+    def __init__(self, existing=()):
+        self.existing = list(existing)
+        self.added = []
+        self.searches = []
+        self.lock = threading.Lock()
+
+    def playlist_tracks(self, playlist_id, **kwargs):
+        return {"items": [{"track": {"id": i}} for i in self.existing], "next": None}
+
+    def search(self, q, type, limit):
+        with self.lock:
+            self.searches.append(q)
+        if "missing" in q:
+            return {"tracks": {"items": []}}
+        return {"tracks": {"items": [{"id": "ID:" + q.split("track:")[-1]}]}}
+
+    def playlist_add_items(self, playlist_id, batch):
+        with self.lock:
+            self.added.extend(batch)
+
+
+def test_run_pipeline_streams_in_order():
+    titles = [f"Artist - Song {i}" for i in range(30)]
+    titles[3] = "[Deleted video]"
+    titles[7] = "Artist - missing"
+    sp = FakeSpotify(existing=["ID:song 5"])
+    cache = DictCache({("artist", "song 9"): "CACHED"})
+    result = pipeline.run_pipeline(
+        sp,
+        "pl",
+        iter(titles),
+        cache,
+        {"search_concurrency": 4, "pipeline_queue_size": 2, "batch_size": 7},
+    )
+    assert result.titles == titles
+    assert [s["title"] for s in result.skipped] == ["[Deleted video]"]
+    assert [q[3] for q in result.queries] == [t for t in titles if t != titles[3]]
+    ids = [r[2] for r in result.search_results]
+    assert ids[0] == "ID:song 0"
+    assert ids[6] is None  # "missing" is the 7th query after the skip
+    assert "CACHED" in ids
+    assert "artist:artist track:song 9" not in sp.searches
+    # Already-present tracks are not re-added; everything else is, once
+    expected = [i for i in ids if i and i != "ID:song 5"]
+    assert sorted(sp.added) == sorted(expected)
+    assert result.playlist_tracks == {"ID:song 5"}
+    assert result.add_stats.added == len(expected)
+    assert result.add_stats.batches == 4
+
+
+def test_run_pipeline_dry_run_adds_nothing():
+    sp = FakeSpotify()
+    result = pipeline.run_pipeline(
+        sp, "pl", iter(["A - B"]), DictCache(), {}, dry_run=True
+    )
+    assert sp.added == []
+    assert result.search_results == [("a", "b", "ID:b")]
+
+
+def test_sync_command_pipeline_mode(tmp_path):
+    sp = FakeSpotify()
+    with mock.patch("yt2spotify.cli.get_spotify_client", return_value=sp), mock.patch(
+        "yt2spotify.cli.iter_yt_playlist_titles_yt_dlp",
+        return_value=iter(["Artist - Track", "[Private video]"]),
+    ), mock.patch("yt2spotify.cache.TrackCache", DictCache), mock.patch.object(
+        cli, "OUTPUT_DIR", str(tmp_path)
+    ):
+        cli.sync_command(
+            yt_url="fake_url",
+            playlist_id="fake_playlist",
+            no_progress=True,
+            config={"pipeline": True},
+        )
+    assert sp.added == ["ID:track"]
+    import json
+
+    with open(tmp_path / "added_songs.json", encoding="utf-8") as f:
+        added = json.load(f)
+    assert [s["status"] for s in added] == ["added"]
+
+
+def test_run_pipeline_collapses_duplicate_queries():
+    sp = FakeSpotify()
+    titles = ["Artist - Song", "ARTIST - Song (Lyrics)", "Artist - Song"]
+    result = pipeline.run_pipeline(sp, "pl", iter(titles), DictCache(), {})
+    assert sp.searches == ["artist:artist track:song"]
+    assert result.duplicate_queries == 2
+    assert [r[2] for r in result.search_results] == ["ID:song"] * 3
+    assert sp.added == ["ID:song"]
+
+
+def test_run_pipeline_adds_each_track_once():
+    class SameTrackSpotify(FakeSpotify):
+        def search(self, q, type, limit):
+            return {"tracks": {"items": [{"id": "SAME"}]}}
+
+    sp = SameTrackSpotify()
+    titles = [
+        "Artist - Song (Official Video)",
+        "Artist - Song lyric video",
+        "Artist - Song reupload",
+    ]
+    result = pipeline.run_pipeline(sp, "pl", iter(titles), DictCache(), {})
+    assert [r[2] for r in result.search_results] == ["SAME"] * 3
+    assert sp.added == ["SAME"]
+    assert result.add_stats.added == 1
+
+
+def test_sync_command_reports_collapsed_duplicates(tmp_path, caplog):
+    sp = FakeSpotify()
+    titles = ["Artist - Song", "Artist - Song (Lyrics)", "Other - Tune"]
+    with mock.patch("yt2spotify.cli.get_spotify_client", return_value=sp), mock.patch(
+        "yt2spotify.cli.get_yt_playlist_titles_yt_dlp", return_value=titles
+    ), mock.patch("yt2spotify.cache.TrackCache", DictCache), mock.patch.object(
+        cli, "OUTPUT_DIR", str(tmp_path)
+    ), caplog.at_level(
+        "INFO", logger="yt2spotify"
+    ):
+        cli.sync_command(yt_url="fake_url", playlist_id="pl", config={})
+    assert sorted(sp.searches) == [
+        "artist:artist track:song",
+        "artist:other track:tune",
+    ]
+    assert sp.added == ["ID:song", "ID:tune"]
+    assert "1 duplicate queries were collapsed (2 unique searches)" in caplog.text
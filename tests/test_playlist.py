@@ -0,0 +1,181 @@
+from unittest import mock
+from yt2spotify import playlist
+
+
+class Fake429(Exception):
+    def __init__(self, retry_after="1"):
+        self.http_status = 429
+        self.headers = {"Retry-After": retry_after} if retry_after else {}
+
+
+class RecordingSpotify:
+    def __init__(self, fail_calls=()):
+        self.batches = []
+        self.calls = 0
+        self.fail_calls = set(fail_calls)
+
+    def playlist_add_items(self, playlist_id, batch):
+        self.calls += 1
+        if self.calls in self.fail_calls:
+            raise Fake429()
+        self.batches.append(list(batch))
+
+
+def test_add_tracks_uses_api_maximum():
+    sp = RecordingSpotify()
+    ids = [f"id{i}" for i in range(250)]
+    stats = playlist.add_tracks_adaptive(sp, "pl", ids, {})
+    assert [len(b) for b in sp.batches] == [100, 100, 50]
+    assert [i for b in sp.batches for i in b] == ids
+    assert stats.batches == 3 and stats.added == 250 and stats.failed == 0
+
+
+def test_add_tracks_shrinks_on_429_and_grows_back():
+    sp = RecordingSpotify(fail_calls={1})
+    ids = [f"id{i}" for i in range(400)]
+    with mock.patch("time.sleep"):
+        stats = playlist.add_tracks_adaptive(sp, "pl", ids, {"max_retries": 3})
+    assert [len(b) for b in sp.batches] == [50, 50, 100, 100, 100]
+    assert [i for b in sp.batches for i in b] == ids
+    assert stats.rate_limited == 1 and stats.batches == 5
+    assert stats.final_batch_size == 100
+
+
+def test_add_tracks_gives_up_after_max_retries():
+    sp = RecordingSpotify(fail_calls={1, 2})
+    with mock.patch("time.sleep"):
+        stats = playlist.add_tracks_adaptive(
+            sp, "pl", ["a", "b", "c"], {"batch_size": 2, "max_retries": 2}
+        )
+    assert sp.batches == [["c"]]
+    assert stats.failed == 2 and stats.added == 1
+
+
+def test_add_tracks_skips_batch_on_other_errors():
+    class Broken:
+        def playlist_add_items(self, playlist_id, batch):
+            raise RuntimeError("boom")
+
+    stats = playlist.add_tracks_adaptive(Broken(), "pl", ["a", "b"], {})
+    assert stats.failed == 2 and stats.batches == 0
+
+
+def test_get_retry_after():
+    assert playlist.get_retry_after(Fake429("3")) == 3.0
+    assert playlist.get_retry_after(Fake429("soon")) is None
+    assert playlist.get_retry_after(Fake429(None)) is None
+    assert playlist.get_retry_after(Exception()) is None
+
+
+def test_adaptive_batcher_spacing_follows_retry_after():
+    b = playlist.AdaptiveBatcher(max_size=100, min_size=10, base_delay=1.0)
+    b.on_rate_limited(5.0)
+    assert b.size == 50 and b.spacing == 5.0
+    b.on_rate_limited(None)
+    assert b.size == 25 and b.spacing == 10.0
+    b.on_success()
+    assert b.spacing == 5.0
+
+
+class MembershipSpotify:
+    def __init__(self, snapshot_id="s1", track_ids=("a", "b")):
+        self.snapshot_id = snapshot_id
+        self.track_ids = list(track_ids)
+        self.page_calls = 0
+
+    def playlist(self, playlist_id, fields=None):
+        assert fields == "snapshot_id"
+        return {"snapshot_id": self.snapshot_id}
+
+    def playlist_tracks(self, playlist_id, **kwargs):
+        self.page_calls += 1
+        items = [{"track": {"id": tid}} for tid in self.track_ids]
+        return {"items": items, "next": None}
+
+    def playlist_add_items(self, playlist_id, batch):
+        self.track_ids.extend(batch)
+        self.snapshot_id += "+"
+        return {"snapshot_id": self.snapshot_id}
+
+
+def test_get_snapshot_id_without_playlist_endpoint():
+    assert playlist.get_snapshot_id(RecordingSpotify(), "pl") is None
+    assert playlist.get_snapshot_id(MembershipSpotify(), "pl") == "s1"
+
+
+def test_load_playlist_track_ids_skips_pagination_when_unchanged(tmp_path):
+    sp = MembershipSpotify()
+    with playlist.SyncState(str(tmp_path / "state.sqlite")) as state:
+        assert playlist.load_playlist_track_ids(sp, "pl", state, "s1") == {"a", "b"}
+        assert playlist.load_playlist_track_ids(sp, "pl", state, "s1") == {"a", "b"}
+        assert sp.page_calls == 1
+        # A changed playlist is fetched again
+        sp.track_ids = ["c"]
+        assert playlist.load_playlist_track_ids(sp, "pl", state, "s2") == {"c"}
+        assert sp.page_calls == 2
+
+
+def test_add_tracks_records_snapshot_id_and_added_ids():
+    sp = MembershipSpotify()
+    stats = playlist.add_tracks_adaptive(sp, "pl", ["x", "y"], {"batch_size": 1})
+    assert stats.added_ids == ["x", "y"]
+    assert stats.snapshot_id == "s1++"
+    assert (
+        playlist.add_tracks_adaptive(RecordingSpotify(), "pl", ["x"]).snapshot_id
+        is None
+    )
+
+
+class PagedSpotify:
+    def __init__(self, count, limit=100, total=True):
+        self.ids = [f"id{i}" for i in range(count)]
+        self.limit = limit
+        self.total = total
+        self.offsets = []
+
+    def _page(self, offset):
+        self.offsets.append(offset)
+        end = offset + self.limit
+        page = {
+            "items": [{"track": {"id": tid}} for tid in self.ids[offset:end]],
+            "limit": self.limit,
+            "next": f"offset={end}" if end < len(self.ids) else None,
+            "offset": offset,
+        }
+        if self.total:
+            page["total"] = len(self.ids)
+        return page
+
+    def playlist_tracks(self, playlist_id, fields=None, limit=100, offset=0):
+        self.fields = fields
+        return self._page(offset)
+
+    def next(self, results):
+        return self._page(results["offset"] + self.limit)
+
+
+def test_fetch_playlist_items_by_offset_in_order():
+    sp = PagedSpotify(950)
+    items = playlist.fetch_playlist_items(sp, "pl", workers=4)
+    assert [item["track"]["id"] for item in items] == sp.ids
+    assert sorted(sp.offsets) == list(range(0, 950, 100))
+    assert sp.fields == playlist.PLAYLIST_ITEM_FIELDS
+    assert playlist.fetch_playlist_track_ids(sp, "pl") == set(sp.ids)
+
+
+def test_fetch_playlist_items_serial_without_total():
+    for sp, workers in ((PagedSpotify(250, total=False), 4), (PagedSpotify(250), 1)):
+        items = playlist.fetch_playlist_items(sp, "pl", workers=workers)
+        assert [item["track"]["id"] for item in items] == sp.ids
+        assert sp.offsets == [0, 100, 200]
+
+
+def test_fetch_playlist_items_serial_when_total_is_stale():
+    sp = PagedSpotify(250)
+    sp.playlist_tracks = lambda playlist_id, fields=None, limit=100, offset=0: {
+        **sp._page(offset),
+        "total": 100,
+    }
+    items = playlist.fetch_playlist_items(sp, "pl", workers=4)
+    assert [item["track"]["id"] for item in items] == sp.ids
+    assert sp.offsets == [0, 100, 200]
@@ -0,0 +1,86 @@
+import pytest
+from yt2spotify import rate_limit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", c.monotonic)
+    return c
+
+
+def test_token_bucket_burst_then_throttle(clock):
+    bucket = rate_limit.TokenBucket(rate=2.0, capacity=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Bucket is empty: each further caller queues behind the previous one
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+    clock.now += 10
+    # Refill is capped at capacity
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve() > 0
+
+
+def test_token_bucket_pause_holds_all_callers(clock):
+    bucket = rate_limit.TokenBucket(rate=100.0, capacity=10)
+    bucket.pause(5.0)
+    # The pause empties the bucket, so the first caller also waits one slot
+    assert bucket.reserve() == pytest.approx(5.01)
+    clock.now += 2
+    assert bucket.reserve() == pytest.approx(3.02)
+    clock.now += 10
+    assert bucket.reserve() == 0.0
+
+
+def test_token_bucket_releases_steadily_after_pause(clock):
+    bucket = rate_limit.TokenBucket(rate=5.0, capacity=20)
+    for _ in range(20):
+        bucket.reserve()
+    bucket.pause(10.0)
+    # No tokens refill during the pause: queued callers leave at 5 per second
+    releases = [bucket.reserve() for _ in range(60)]
+    assert releases[0] == pytest.approx(10.2)
+    assert releases[-1] == pytest.approx(22.0)
+    gaps = [b - a for a, b in zip(releases, releases[1:])]
+    assert all(gap == pytest.approx(0.2) for gap in gaps)
+    clock.now += 5
+    # A later, shorter pause does not cut the current one short
+    bucket.pause(1.0)
+    assert bucket.reserve() == pytest.approx(17.2)
+
+
+def test_token_bucket_acquire_sleeps_for_deficit(clock, monkeypatch):
+    slept = []
+    monkeypatch.setattr(rate_limit.time, "sleep", slept.append)
+    bucket = rate_limit.TokenBucket(rate=1.0, capacity=1)
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(1.0)
+    assert slept == [pytest.approx(1.0)]
+
+
+def test_configure_spotify_limiter():
+    limiter = rate_limit.configure_spotify_limiter(
+        {"rate_limit_per_second": 7, "rate_limit_burst": 3}
+    )
+    assert limiter is rate_limit.spotify_limiter
+    assert limiter.rate == 7.0 and limiter.capacity == 3.0
+    with pytest.raises(ValueError):
+        limiter.configure(0, 1)
+    rate_limit.configure_spotify_limiter({})
+    assert limiter.rate == rate_limit.DEFAULT_RATE_PER_SECOND
+
+
+def test_token_bucket_reset(clock):
+    bucket = rate_limit.TokenBucket(rate=1.0, capacity=1)
+    bucket.reserve()
+    bucket.pause(30)
+    bucket.reset()
+    assert bucket.reserve() == 0.0
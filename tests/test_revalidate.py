@@ -0,0 +1,81 @@
+from yt2spotify import cache, revalidate
+
+
+class FakeSpotify:
+    def __init__(self, tracks, fail_first=0):
+        self.known = tracks
+        self.calls = []
+        self.fail_first = fail_first
+
+    def tracks(self, ids, market=None):
+        self.calls.append((list(ids), market))
+        if self.fail_first:
+            self.fail_first -= 1
+            error = Exception("rate limited")
+            error.http_status = 429
+            error.headers = {"Retry-After": "0"}
+            raise error
+        return {"tracks": [self.known.get(tid) for tid in ids]}
+
+
+def test_revalidate_drops_relinks_and_refreshes(tmp_path):
+    with cache.TrackCache(str(tmp_path / "c.sqlite")) as c:
+        c.set("a", "gone", "dead")
+        c.set("a", "moved", "old")
+        c.set("a", "fine", "ok")
+        c.set("a", "blocked", "unplayable")
+        sp = FakeSpotify(
+            {
+                "old": {"id": "new", "name": "Moved", "linked_from": {"id": "old"}},
+                "ok": {"id": "ok", "name": "Fine", "artists": [{"name": "A"}]},
+                "unplayable": {"id": "unplayable", "is_playable": False},
+            }
+        )
+        result = revalidate.revalidate_track_ids(sp, c)
+        assert result == {"dead": None, "old": "new", "ok": "ok", "unplayable": None}
+        assert c.get("a", "gone") is None and c.get("a", "blocked") is None
+        assert c.get("a", "moved") == "new"
+        assert c.get_record("a", "fine").artists == ("A",)
+    assert sp.calls == [(["dead", "old", "ok", "unplayable"], "from_token")]
+
+
+def test_revalidate_batches_of_50_and_retries_429(tmp_path):
+    ids = [f"id{i}" for i in range(120)]
+    sp = FakeSpotify({tid: {"id": tid} for tid in ids}, fail_first=1)
+    with cache.TrackCache(str(tmp_path / "c.sqlite")) as c:
+        config = {"min_retry_after": 0, "revalidate_market": ""}
+        result = revalidate.revalidate_track_ids(sp, c, ids, config)
+    assert result == {tid: tid for tid in ids}
+    assert [len(batch) for batch, _ in sp.calls] == [50, 50, 50, 20]
+    assert {market for _, market in sp.calls} == {None}
+
+
+def test_revalidate_skips_batches_that_keep_failing(tmp_path):
+    sp = FakeSpotify({}, fail_first=5)
+    with cache.TrackCache(str(tmp_path / "c.sqlite")) as c:
+        c.set("a", "b", "x")
+        config = {"min_retry_after": 0, "max_retries": 1}
+        assert revalidate.revalidate_track_ids(sp, c, config=config) == {}
+        assert c.get("a", "b") == "x"
+    assert len(sp.calls) == 2
+
+
+def test_revalidate_keeps_writes_buffered_until_close(tmp_path):
+    db_path = str(tmp_path / "c.sqlite")
+    with cache.TrackCache(db_path, write_batch=1000) as c:
+        for i in range(200):
+            c.set("a", f"t{i}", f"id{i}")
+        c.flush()
+        known = {f"id{i}": {"id": f"id{i}"} for i in range(100)}
+        known["id0"] = {"id": "new0", "linked_from": {"id": "id0"}}
+        commits = []
+        commit = c._commit
+        c._commit = lambda: commits.append(1) or commit()
+        result = revalidate.revalidate_track_ids(FakeSpotify(known), c)
+        assert commits == []
+        assert result["id0"] == "new0" and result["id150"] is None
+        assert c.get("a", "t0") == "new0" and c.get("a", "t150") is None
+        assert c.keys_by_track_id(["new0", "id150"]) == {"new0": [("a", "t0")]}
+    with cache.TrackCache(db_path) as c:
+        assert c.get("a", "t0") == "new0" and c.get("a", "t150") is None
+        assert c.get("a", "t99") == "id99"
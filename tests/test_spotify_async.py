@@ -0,0 +1,191 @@
+import asyncio
+import json
+import pytest
+from spotipy.exceptions import SpotifyException
+from yt2spotify import spotify_async
+from yt2spotify.playlist import get_retry_after, is_rate_limited
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = b"" if body is None else json.dumps(body).encode()
+        self.text = self.content.decode()
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeHTTP:
+    def __init__(self, responses=()):
+        self.responses = list(responses)
+        self.requests = []
+        self.closed = False
+
+    async def request(self, method, url, params=None, json=None, headers=None):
+        self.requests.append((method, url, params, json, headers))
+        if self.responses:
+            return self.responses.pop(0)
+        if url.endswith("/tracks") and params and "ids" in params:
+            ids = params["ids"].split(",")
+            return FakeResponse(body={"tracks": [{"id": i} for i in ids]})
+        return FakeResponse(body={"snapshot_id": "s1"})
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeAuth:
+    def __init__(self):
+        self.refreshed = []
+        self.token = {"access_token": "tok1", "refresh_token": "r1"}
+
+        class Cache:
+            def get_cached_token(inner):
+                return self.token
+
+        self.cache_handler = Cache()
+
+    def validate_token(self, token_info):
+        # Like SpotifyOAuth: a token that has not expired is returned as is
+        return token_info
+
+    def is_token_expired(self, token_info):
+        return False
+
+    def refresh_access_token(self, refresh_token):
+        self.refreshed.append(refresh_token)
+        self.token = {"access_token": f"tok{len(self.refreshed) + 1}"}
+        self.token["refresh_token"] = refresh_token
+        return self.token
+
+
+@pytest.mark.asyncio
+async def test_async_spotify_endpoints():
+    http = FakeHTTP([FakeResponse(body={"tracks": {"items": []}})])
+    async with spotify_async.AsyncSpotify(FakeAuth(), http_client=http) as sp:
+        assert await sp.search("artist:a track:b", limit=5) == {"tracks": {"items": []}}
+        await sp.playlist_items("pl", fields="items", offset=100)
+        await sp.playlist_add_items("pl", ["id1", "spotify:track:id2"])
+        await sp.playlist_remove_all_occurrences_of_items("pl", ["id1"])
+        await sp.playlist_replace_items("pl", [])
+    assert http.closed
+    method, url, params, _, headers = http.requests[0]
+    assert (method, url) == ("GET", "https://api.spotify.com/v1/search")
+    assert params == {"q": "artist:a track:b", "type": "track", "limit": 5}
+    assert headers == {"Authorization": "Bearer tok1"}
+    assert http.requests[1][2] == {"limit": 100, "offset": 100, "fields": "items"}
+    assert http.requests[2][3] == {"uris": ["spotify:track:id1", "spotify:track:id2"]}
+    assert http.requests[3][0] == "DELETE"
+    assert http.requests[3][3] == {"tracks": [{"uri": "spotify:track:id1"}]}
+    assert http.requests[4][:2] == (
+        "PUT",
+        "https://api.spotify.com/v1/playlists/pl/tracks",
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_spotify_tracks_batches_of_50():
+    http = FakeHTTP()
+    sp = spotify_async.AsyncSpotify(FakeAuth(), http_client=http)
+    ids = [f"id{i}" for i in range(120)]
+    tracks = await sp.tracks(ids)
+    assert [t["id"] for t in tracks] == ids
+    assert [len(r[2]["ids"].split(",")) for r in http.requests] == [50, 50, 20]
+
+
+@pytest.mark.asyncio
+async def test_async_spotify_retries_429_and_refreshes_token(monkeypatch):
+    paused = []
+    monkeypatch.setattr(spotify_async.spotify_limiter, "pause", paused.append)
+    http = FakeHTTP(
+        [
+            FakeResponse(401),
+            FakeResponse(429, headers={"Retry-After": "0"}),
+            FakeResponse(body={"ok": True}),
+        ]
+    )
+    auth = FakeAuth()
+    sp = spotify_async.AsyncSpotify(auth, http_client=http)
+    assert await sp.search("q") == {"ok": True}
+    assert paused == [0.0]
+    # The rejected token is refreshed, not re-read from the cache
+    assert auth.refreshed == ["r1"]
+    assert [r[4]["Authorization"] for r in http.requests] == [
+        "Bearer tok1",
+        "Bearer tok2",
+        "Bearer tok2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_async_spotify_refreshes_once_for_concurrent_401s():
+    http = FakeHTTP([FakeResponse(401), FakeResponse(401)])
+    auth = FakeAuth()
+    sp = spotify_async.AsyncSpotify(auth, http_client=http)
+    await asyncio.gather(sp.search("a"), sp.search("b"))
+    assert auth.refreshed == ["r1"]
+    assert [r[4]["Authorization"] for r in http.requests[2:]] == ["Bearer tok2"] * 2
+
+
+@pytest.mark.asyncio
+async def test_async_spotify_401_without_refresh_token():
+    http = FakeHTTP([FakeResponse(401)])
+    auth = FakeAuth()
+    del auth.token["refresh_token"]
+    sp = spotify_async.AsyncSpotify(auth, http_client=http)
+    with pytest.raises(SpotifyException) as excinfo:
+        await sp.search("q")
+    assert excinfo.value.http_status == 401
+
+
+@pytest.mark.asyncio
+async def test_async_spotify_raises_spotify_exception():
+    http = FakeHTTP([FakeResponse(429, headers={"Retry-After": "3"})])
+    sp = spotify_async.AsyncSpotify(FakeAuth(), http_client=http, max_retries=0)
+    with pytest.raises(SpotifyException) as excinfo:
+        await sp.search("q")
+    assert is_rate_limited(excinfo.value)
+    assert get_retry_after(excinfo.value) == 3.0
+
+
+@pytest.mark.asyncio
+async def test_async_search_with_cache_uses_async_client(tmp_path):
+    import threading
+    from yt2spotify import core
+    from yt2spotify.cache import TrackCache
+
+    class SearchHTTP(FakeHTTP):
+        async def request(self, method, url, params=None, json=None, headers=None):
+            self.requests.append((method, url, params, threading.current_thread()))
+            title = params["q"].split("track:")[-1]
+            items = [] if title == "missing" else [{"id": "ID_" + title}]
+            return FakeResponse(body={"tracks": {"items": items}})
+
+    http = SearchHTTP()
+    queries = [
+        ("a", "one", "artist:a track:one"),
+        ("a", "missing", "artist:a track:missing"),
+    ]
+    with TrackCache(str(tmp_path / "cache.sqlite")) as cache:
+        async with spotify_async.AsyncSpotify(FakeAuth(), http_client=http) as sp:
+            # No spotipy client: every search goes through the async client
+            results = await core.async_search_with_cache(
+                None, queries, cache, concurrency=2, async_sp=sp
+            )
+        assert results == [("a", "one", "ID_one"), ("a", "missing", None)]
+        assert cache.get("a", "one") == "ID_one"
+        assert cache.is_fresh_miss("a", "missing")
+    # Searches ran on the event loop's thread, not on a pool
+    assert {r[3] for r in http.requests} == {threading.current_thread()}
+
+
+def test_async_spotify_without_httpx(monkeypatch):
+    monkeypatch.setattr(spotify_async, "httpx", None)
+    with pytest.raises(ImportError):
+        spotify_async.AsyncSpotify(FakeAuth())
+
+
+def test_acquire_async_shares_the_limiter():
+    assert asyncio.run(spotify_async.spotify_limiter.acquire_async()) == 0.0
@@ -0,0 +1,87 @@
+import json
+from yt2spotify import core, spotify_session
+
+
+def test_get_spotify_client_is_shared(monkeypatch):
+    built = []
+
+    def fake_spotify(auth_manager, requests_session):
+        built.append((auth_manager, requests_session))
+        return object()
+
+    monkeypatch.setattr(core.spotipy, "Spotify", fake_spotify)
+    sp = core.get_spotify_client()
+    assert core.get_spotify_client() is sp
+    assert len(built) == 1
+    auth_manager, session = built[0]
+    # The OAuth manager talks through the same pooled session
+    assert auth_manager._session is session
+    assert isinstance(auth_manager.cache_handler, spotify_session.MemoryTokenCache)
+
+
+def test_configure_spotify_pool_grows_existing_sessions():
+    session = spotify_session.pooled_session()
+    adapter = session.get_adapter("https://api.spotify.com")
+    assert adapter._pool_maxsize == spotify_session.POOL_SIZE
+    spotify_session.configure_spotify_pool({"search_concurrency": 30})
+    assert session.get_adapter("https://api.spotify.com")._pool_maxsize == 32
+    # Pools never shrink
+    spotify_session.configure_spotify_pool({"search_concurrency": 1})
+    assert spotify_session.pooled_session().get_adapter("https://x")._pool_maxsize == 32
+
+
+def test_pooled_session_retries_like_spotipy(monkeypatch):
+    import threading
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    statuses = [503, 429, 200]
+    seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            seen.append(self.path)
+            status = statuses.pop(0) if statuses else 200
+            self.send_response(status)
+            if status == 429:
+                self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    # Keep the test fast; the retry count and statuses are what matter
+    monkeypatch.setattr(spotify_session, "RETRY_BACKOFF", 0)
+    try:
+        session = spotify_session.pooled_session()
+        # Talk to the local server directly, whatever proxy the host sets
+        session.trust_env = False
+        retry = session.get_adapter("https://api.spotify.com").max_retries
+        assert retry.total == retry.status == 3
+        assert {429, 500, 502, 503, 504} <= set(retry.status_forcelist)
+        response = session.get(f"http://127.0.0.1:{server.server_port}/v1/search")
+        # The 503 and the 429 were retried by the adapter
+        assert response.status_code == 200
+        assert len(seen) == 3
+        # Growing the pool keeps the retry policy
+        spotify_session.configure_spotify_pool({"search_concurrency": 30})
+        assert session.get_adapter("https://x").max_retries.total == 3
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_memory_token_cache_reads_file_once(tmp_path):
+    path = tmp_path / ".cache"
+    path.write_text(json.dumps({"access_token": "a"}), encoding="utf-8")
+    cache = spotify_session.MemoryTokenCache(str(path))
+    assert cache.get_cached_token() == {"access_token": "a"}
+    path.write_text(json.dumps({"access_token": "stale"}), encoding="utf-8")
+    assert cache.get_cached_token() == {"access_token": "a"}
+    cache.save_token_to_cache({"access_token": "b"})
+    assert cache.get_cached_token() == {"access_token": "b"}
+    assert json.loads(path.read_text(encoding="utf-8")) == {"access_token": "b"}
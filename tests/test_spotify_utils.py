@@ -1,4 +1,4 @@
-from yt2spotify import spotify_utils
+from yt2spotify import spotify_session, spotify_utils
 
 
 def test_spotify_search_returns_dict():
@@ -34,9 +34,9 @@ def test_get_spotify_client(monkeypatch):
         def __init__(self, **kwargs):
             pass
 
-    monkeypatch.setattr(spotify_utils, "SpotifyOAuth", DummyOAuth)
+    monkeypatch.setattr(spotify_session, "SpotifyOAuth", DummyOAuth)
     monkeypatch.setattr(
-        spotify_utils.spotipy, "Spotify", lambda auth_manager: DummySpotify()
+        spotify_utils.spotipy, "Spotify", lambda auth_manager, **kwargs: DummySpotify()
     )
     sp = spotify_utils.get_spotify_client()
     assert isinstance(sp, DummySpotify)
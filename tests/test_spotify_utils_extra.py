@@ -1,5 +1,5 @@
 import pytest
-from yt2spotify import spotify_utils
+from yt2spotify import spotify_session, spotify_utils
 import typing
 
 
@@ -16,9 +16,9 @@ def test_get_spotify_client_success(monkeypatch):
         def __init__(self, **kwargs):
             self.kwargs = kwargs
 
-    monkeypatch.setattr(spotify_utils, "SpotifyOAuth", DummyOAuth)
+    monkeypatch.setattr(spotify_session, "SpotifyOAuth", DummyOAuth)
     monkeypatch.setattr(
-        spotify_utils.spotipy, "Spotify", lambda auth_manager: DummySpotify()
+        spotify_utils.spotipy, "Spotify", lambda auth_manager, **kwargs: DummySpotify()
     )
     sp = spotify_utils.get_spotify_client()
     assert isinstance(sp, DummySpotify)
@@ -156,9 +156,9 @@ def test_get_spotify_client_oauth_params(monkeypatch):
     class DummySpotify:
         pass
 
-    monkeypatch.setattr(spotify_utils, "SpotifyOAuth", DummyOAuth)
+    monkeypatch.setattr(spotify_session, "SpotifyOAuth", DummyOAuth)
     monkeypatch.setattr(
-        spotify_utils.spotipy, "Spotify", lambda auth_manager: DummySpotify()
+        spotify_utils.spotipy, "Spotify", lambda auth_manager, **kwargs: DummySpotify()
     )
     spotify_utils.get_spotify_client()
     assert params["client_id"] == "id"
@@ -0,0 +1,54 @@
+from yt2spotify.sync_state import SyncState, take_new_entries
+
+
+def test_sync_state_round_trip(tmp_path):
+    db = str(tmp_path / "state.sqlite")
+    with SyncState(db) as state:
+        assert state.known_ids("yt", "sp") == set()
+        state.mark_processed("yt", "sp", ["a", "b"])
+        state.mark_processed("yt", "other", ["c"])
+    with SyncState(db) as state:
+        assert state.known_ids("yt", "sp") == {"a", "b"}
+        assert state.known_ids("yt", "other") == {"c"}
+        state.forget("yt", "sp")
+        assert state.known_ids("yt", "sp") == set()
+        assert state.known_ids("yt", "other") == {"c"}
+
+
+def test_sync_state_close_twice(tmp_path):
+    state = SyncState(str(tmp_path / "state.sqlite"))
+    state.close()
+    state.close()
+
+
+def test_take_new_entries_filters_known():
+    entries = [("a", "A"), ("b", "B"), (None, "No ID"), ("c", "C")]
+    assert list(take_new_entries(entries, {"a", "c"})) == [("b", "B"), (None, "No ID")]
+
+
+def test_take_new_entries_stops_after_known_run():
+    pulled = []
+
+    def entries():
+        for video_id in ["new1", "old1", "new2", "old2", "old3", "old4"]:
+            pulled.append(video_id)
+            yield video_id, video_id.upper()
+
+    known = {"old1", "old2", "old3", "old4"}
+    new = list(take_new_entries(entries(), known, stop_after=2))
+    assert new == [("new1", "NEW1"), ("new2", "NEW2")]
+    # The rest of the playlist is never fetched
+    assert pulled == ["new1", "old1", "new2", "old2", "old3"]
+
+
+def test_sync_state_membership(tmp_path):
+    with SyncState(str(tmp_path / "state.sqlite")) as state:
+        assert state.membership("pl", "s1") is None
+        state.save_membership("pl", "s1", ["a", "b"])
+        assert state.membership("pl", "s1") == {"a", "b"}
+        assert state.membership("pl", "s0") is None
+        state.save_membership("pl", "s2", ["c"], replace=False)
+        assert state.membership("pl", "s1") is None
+        assert state.membership("pl", "s2") == {"a", "b", "c"}
+        state.save_membership("pl", "s3", ["d"])
+        assert state.membership("pl", "s3") == {"d"}
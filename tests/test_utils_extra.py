@@ -107,3 +107,29 @@ def test_validate_no_duplicates_detects_duplicates(tmp_path):
         json.dump(data, f)
     with pytest.raises(AssertionError):
         utils.validate_no_duplicates(str(file_path), {"title", "artist", "track"})
+
+
+def test_parse_many_in_process_keeps_order():
+    titles = ["A - One", "B - Two", "A - One", "Just A Title"]
+    assert utils.parse_many(titles) == [
+        utils.parse_artist_track(title) for title in titles
+    ]
+
+
+def test_parse_many_process_pool():
+    titles = [f"Artist {i % 7} - Song {i} (Official Video)" for i in range(50)]
+    expected = [utils.parse_artist_track(title) for title in titles]
+    assert utils.parse_many(titles, workers=2, min_pool_size=1) == expected
+
+
+def test_parse_many_falls_back_without_processes(monkeypatch):
+    class NoPool:
+        def __init__(self, *args, **kwargs):
+            raise OSError("no processes here")
+
+    monkeypatch.setattr(utils, "ProcessPoolExecutor", NoPool)
+    titles = ["A - One", "B - Two"]
+    assert utils.parse_many(titles, workers=4, min_pool_size=1) == [
+        ("a", "one"),
+        ("b", "two"),
+    ]
@@ -1,4 +1,5 @@
 from yt2spotify import youtube
+from yt2spotify.sync_state import take_new_entries
 
 
 def test_get_yt_playlist_titles_api_success(monkeypatch):
@@ -58,3 +59,78 @@ def test_get_yt_playlist_titles_api_url_extract(monkeypatch):
     url = "https://youtube.com/playlist?list=PL123"
     titles = youtube.get_yt_playlist_titles_api("fake_key", url)
     assert titles == ["SongX"]
+
+
+def test_iter_yt_playlist_titles_api_pages(monkeypatch):
+    pages = [
+        {"items": [{"snippet": {"title": "Song1"}}], "nextPageToken": "p2"},
+        {"items": [{"snippet": {"title": "Song2"}}], "nextPageToken": None},
+    ]
+
+    class DummyYouTube:
+        def playlistItems(self):
+            return self
+
+        def list(self, **kwargs):
+            return self
+
+        def execute(self):
+            return pages.pop(0)
+
+    monkeypatch.setattr(youtube, "build", lambda *a, **kw: DummyYouTube())
+    stream = youtube.iter_yt_playlist_titles_api("key", "list=x")
+    assert next(stream) == "Song1"
+    # The second page is only requested once the first is consumed
+    assert len(pages) == 1
+    assert list(stream) == ["Song2"]
+
+
+def test_iter_yt_playlist_titles_api_falls_back(monkeypatch):
+    def broken_build(*a, **kw):
+        raise RuntimeError("no api")
+
+    monkeypatch.setattr(youtube, "build", broken_build)
+    monkeypatch.setattr(
+        youtube,
+        "iter_yt_playlist_entries_yt_dlp",
+        lambda pid: iter([("v1", "fallback")]),
+    )
+    assert list(youtube.iter_yt_playlist_titles_api("key", "pl")) == ["fallback"]
+    assert list(youtube.iter_yt_playlist_titles_api("", "pl")) == ["fallback"]
+
+
+def test_iter_yt_playlist_entries_api_incremental_stops_paging(monkeypatch):
+    def item(video_id, title):
+        return {"snippet": {"title": title, "resourceId": {"videoId": video_id}}}
+
+    pages = [
+        {"items": [item("v3", "Song3"), item("v2", "Song2")], "nextPageToken": "p2"},
+        {"items": [item("v1", "Song1")], "nextPageToken": None},
+    ]
+
+    class DummyYouTube:
+        def playlistItems(self):
+            return self
+
+        def list(self, **kwargs):
+            return self
+
+        def execute(self):
+            return pages.pop(0)
+
+    monkeypatch.setattr(youtube, "build", lambda *a, **kw: DummyYouTube())
+    entries = youtube.iter_yt_playlist_entries_api("key", "list=x")
+    assert list(take_new_entries(entries, {"v1", "v2"}, stop_after=1)) == [
+        ("v3", "Song3")
+    ]
+    # Everything after the first known video was skipped unfetched
+    assert len(pages) == 1
+
+
+def test_iter_yt_playlist_entries_api_falls_back(monkeypatch):
+    monkeypatch.setattr(
+        youtube,
+        "iter_yt_playlist_entries_yt_dlp",
+        lambda pid: iter([("v1", "fallback")]),
+    )
+    assert list(youtube.iter_yt_playlist_entries_api("", "pl")) == [("v1", "fallback")]
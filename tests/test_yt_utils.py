@@ -1,5 +1,6 @@
 import pytest
 from yt2spotify import yt_utils
+from yt2spotify.sync_state import take_new_entries
 
 
 def test_get_yt_playlist_titles_yt_dlp(monkeypatch):
@@ -106,3 +107,90 @@ def test_get_yt_playlist_titles_yt_dlp_extract_info_exception(monkeypatch):
     monkeypatch.setattr("yt2spotify.yt_utils.yt_dlp.YoutubeDL", DummyYDL)
     with pytest.raises(RuntimeError):
         yt_utils.get_yt_playlist_titles_yt_dlp("fake_url")
+
+
+def test_iter_yt_playlist_titles_yt_dlp_is_lazy(monkeypatch):
+    seen = []
+
+    def entries():
+        for title in ["Song 1", None, "Song 2"]:
+            seen.append(title)
+            yield {"title": title}
+
+    class DummyYDL:
+        def __init__(self, opts):
+            assert opts["lazy_playlist"] is True
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            pass
+
+        def extract_info(self, playlist_url, download=False, process=True):
+            assert process is False
+            return {"entries": entries()}
+
+    monkeypatch.setattr("yt2spotify.yt_utils.yt_dlp.YoutubeDL", DummyYDL)
+    stream = yt_utils.iter_yt_playlist_titles_yt_dlp("fake_url")
+    assert next(stream) == "Song 1"
+    assert seen == ["Song 1"]
+    assert list(stream) == ["Song 2"]
+
+
+def test_iter_yt_playlist_titles_yt_dlp_without_entries(monkeypatch):
+    class DummyYDL:
+        def __init__(self, opts):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            pass
+
+        def extract_info(self, playlist_url, download=False, process=True):
+            if process:
+                return {"entries": [{"id": "v1", "title": "resolved"}]}
+            return {"_type": "url", "url": "x"}
+
+    monkeypatch.setattr("yt2spotify.yt_utils.yt_dlp.YoutubeDL", DummyYDL)
+    assert list(yt_utils.iter_yt_playlist_titles_yt_dlp("fake_url")) == ["resolved"]
+
+
+def test_iter_yt_playlist_entries_yt_dlp_incremental(monkeypatch):
+    class DummyYDL:
+        def __init__(self, opts):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            pass
+
+        def extract_info(self, playlist_url, download=False, process=True):
+            return {
+                "entries": iter(
+                    [
+                        {"id": "v1", "title": "New Song"},
+                        {"id": "v2", "title": "Old Song"},
+                        {"id": "v3", "title": None},
+                        {"id": "v4", "title": "Older Song"},
+                    ]
+                )
+            }
+
+    monkeypatch.setattr("yt2spotify.yt_utils.yt_dlp.YoutubeDL", DummyYDL)
+    assert list(yt_utils.iter_yt_playlist_entries_yt_dlp("fake_url")) == [
+        ("v1", "New Song"),
+        ("v2", "Old Song"),
+        ("v4", "Older Song"),
+    ]
+    entries = yt_utils.iter_yt_playlist_entries_yt_dlp("fake_url")
+    assert [title for _, title in take_new_entries(entries, {"v2"})] == [
+        "New Song",
+        "Older Song",
+    ]
+    entries = yt_utils.iter_yt_playlist_entries_yt_dlp("fake_url")
+    assert list(take_new_entries(entries, {"v2"}, stop_after=1)) == [("v1", "New Song")]
@@ -1,53 +1,833 @@
+import json
+import os
 import sqlite3
-from contextlib import closing
 import threading
-from typing import Optional
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import TracebackType
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+)
 
 DB_PATH = "cache.sqlite"
 
+# Negative-cache defaults: a miss is trusted for one day, doubling with every
+# repeat up to 30 days
+MISS_TTL = 24 * 3600.0
+MISS_TTL_MAX = 30 * 24 * 3600.0
+MISS_BACKOFF = 2.0
+
+# Writes per commit when created from config; 1 commits every write
+WRITE_BATCH = 500
+
+# Track IDs older than this (seconds) need revalidation and are reported as
+# uncached, so they are searched again; 0 keeps them forever
+TRACK_TTL = 90 * 24 * 3600.0
+
+# Eviction policies for the row/byte budget: least recently or least
+# frequently hit entries go first
+EVICTION_POLICIES = ("lru", "lfu")
+
+# Passes made to get under max_bytes before giving up until the next run
+EVICT_ROUNDS = 5
+
+# Size bounds used when created from config; 0 is unbounded
+MAX_ROWS = 0
+MAX_BYTES = 256 * 1024 * 1024
+
+# When trimming to a byte budget, aim this far below it so the next run does
+# not have to evict again straight away
+EVICT_HEADROOM = 0.9
+
+# Entries kept in the in-process LRU tier when created from config; 0 disables it
+MEMORY_SIZE = 10000
+
+# (artist, title) pairs per bulk lookup query; keeps the bound parameter
+# count under SQLite's historical limit of 999
+LOOKUP_CHUNK = 400
+
+# WAL lets readers run alongside the writer; NORMAL sync is safe under WAL
+# and avoids an fsync per commit. Other processes and stores share the file,
+# so a writer waits up to 30 s for a competing write instead of failing.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA busy_timeout=30000",
+)
+
 CREATE_TABLE_SQL = """
 CREATE TABLE IF NOT EXISTS track_cache (
     artist TEXT NOT NULL,
     title TEXT NOT NULL,
     track_id TEXT NOT NULL,
+    created_at REAL NOT NULL DEFAULT 0,
+    last_hit_at REAL NOT NULL DEFAULT 0,
+    hits INTEGER NOT NULL DEFAULT 0,
+    name TEXT,
+    artists TEXT,
+    duration_ms INTEGER,
+    isrc TEXT,
+    album TEXT,
     PRIMARY KEY (artist, title)
 );
 """
 
+# Columns added after the first release; older databases are migrated in place
+TRACK_CACHE_MIGRATIONS = (
+    ("created_at", "created_at REAL NOT NULL DEFAULT 0"),
+    ("last_hit_at", "last_hit_at REAL NOT NULL DEFAULT 0"),
+    ("hits", "hits INTEGER NOT NULL DEFAULT 0"),
+    ("name", "name TEXT"),
+    ("artists", "artists TEXT"),
+    ("duration_ms", "duration_ms INTEGER"),
+    ("isrc", "isrc TEXT"),
+    ("album", "album TEXT"),
+)
+
+# Columns read back into a TrackRecord, in field order
+RECORD_COLUMNS = "track_id, name, artists, duration_ms, isrc, album"
+
+UPSERT_TRACK_SQL = (
+    "INSERT INTO track_cache "
+    f"(artist, title, {RECORD_COLUMNS}, created_at, last_hit_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (artist, title) DO UPDATE SET "
+    "track_id=excluded.track_id, name=excluded.name, "
+    "artists=excluded.artists, duration_ms=excluded.duration_ms, "
+    "isrc=excluded.isrc, album=excluded.album, "
+    "created_at=excluded.created_at"
+)
+
+CREATE_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS track_cache_last_hit ON track_cache (last_hit_at);
+"""
+
+# Revalidation updates and drops entries by the track they resolve to
+CREATE_TRACK_ID_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS track_cache_track_id ON track_cache (track_id);
+"""
+
+CREATE_MISS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS miss_cache (
+    artist TEXT NOT NULL,
+    title TEXT NOT NULL,
+    misses INTEGER NOT NULL,
+    checked_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (artist, title)
+);
+"""
+
+
+@dataclass(frozen=True)
+class TrackRecord:
+    """
+    A cached Spotify track: its ID plus the metadata needed to re-score the
+    match or render it without another API call. Metadata is empty for
+    entries cached before it was stored.
+    """
+
+    track_id: str
+    name: str = ""
+    artists: Tuple[str, ...] = ()
+    duration_ms: Optional[int] = None
+    isrc: Optional[str] = None
+    album: Optional[str] = None
+
+    @property
+    def artist(self) -> str:
+        """
+        All artist names joined for display and matching.
+        """
+        return ", ".join(self.artists)
+
+    @classmethod
+    def from_spotify(cls, item: Mapping[str, Any]) -> "TrackRecord":
+        """
+        Builds a record from a Spotify track object.
+        """
+        album = item.get("album") or {}
+        external_ids = item.get("external_ids") or {}
+        return cls(
+            track_id=str(item["id"]),
+            name=item.get("name") or "",
+            artists=tuple(a.get("name") or "" for a in item.get("artists") or [] if a),
+            duration_ms=item.get("duration_ms"),
+            isrc=external_ids.get("isrc"),
+            album=album.get("name"),
+        )
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> "TrackRecord":
+        """
+        Builds a record from a row selected with RECORD_COLUMNS.
+        """
+        track_id, name, artists, duration_ms, isrc, album = row
+        return cls(
+            track_id=str(track_id),
+            name=name or "",
+            artists=tuple(json.loads(artists)) if artists else (),
+            duration_ms=duration_ms,
+            isrc=isrc,
+            album=album,
+        )
+
+
+def _record_params(record: TrackRecord) -> Tuple[Any, ...]:
+    """
+    Column values of record in RECORD_COLUMNS order.
+    """
+    return (
+        record.track_id,
+        record.name or None,
+        json.dumps(list(record.artists)) if record.artists else None,
+        record.duration_ms,
+        record.isrc,
+        record.album,
+    )
+
+
+class LRUCache:
+    """
+    Bounded, thread-safe in-memory LRU map with hit/miss counters.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = max(1, capacity)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Tuple[str, str]) -> Any:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Tuple[str, str], value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.capacity:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Tuple[str, str]) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# One LRU tier per database file, shared by every TrackCache in the process so
+# hot keys survive across jobs in a long-running worker
+_memory_tiers: Dict[str, LRUCache] = {}
+_memory_tiers_lock = threading.Lock()
+
+
+def memory_tier(db_path: str, capacity: int) -> LRUCache:
+    """
+    Returns the process-wide LRU tier for a database file, creating it (or
+    growing it to ``capacity``) as needed.
+    """
+    key = os.path.abspath(db_path)
+    with _memory_tiers_lock:
+        tier = _memory_tiers.get(key)
+        if tier is None:
+            tier = _memory_tiers[key] = LRUCache(capacity)
+        elif capacity > tier.capacity:
+            tier.capacity = capacity
+        return tier
+
 
 class TrackCache:
     """
-    SQLite-backed cache for (artist, title) -> track_id lookups.
-    Thread-safe for concurrent access.
+    SQLite-backed cache for (artist, title) -> track_id lookups. Entries can
+    carry track metadata (see TrackRecord; get_record()/set_record()).
+    Also remembers searches that found nothing, so they are not repeated
+    until the miss expires. Thread-safe for concurrent access.
+
+    Keeps one connection open in WAL mode. Writes are buffered in memory and
+    written in one short transaction every ``write_batch`` writes and on
+    flush()/close(), so other connections to the file are never locked out
+    for long; use the cache as a context manager to flush on exit. Buffered
+    writes are visible to lookups through this instance.
+
+    Entries record when they were written and last hit. Entries older than
+    ``ttl`` are treated as needing revalidation and reported as uncached.
+    ``max_rows`` and ``max_bytes`` bound the database; evict() (run on close)
+    drops the least recently (``eviction="lru"``) or least frequently
+    (``"lfu"``) hit entries to stay within them. Hits are counted in memory
+    and written with the next commit, so lookups stay read-only.
+
+    With ``memory_size`` > 0, hits are also kept in a process-wide LRU tier
+    (see memory_tier) that is written through on set(), so hot keys are
+    served without touching SQLite.
     """
 
-    def __init__(self, db_path: str = DB_PATH) -> None:
+    def __init__(
+        self,
+        db_path: str = DB_PATH,
+        miss_ttl: float = MISS_TTL,
+        miss_ttl_max: float = MISS_TTL_MAX,
+        miss_backoff: float = MISS_BACKOFF,
+        write_batch: int = 1,
+        memory_size: int = 0,
+        ttl: float = 0.0,
+        max_rows: int = 0,
+        max_bytes: int = 0,
+        eviction: str = "lru",
+    ) -> None:
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy: {eviction}")
         self.db_path = db_path
+        self.miss_ttl = miss_ttl
+        self.miss_ttl_max = miss_ttl_max
+        self.miss_backoff = miss_backoff
+        self.write_batch = max(1, write_batch)
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.eviction = eviction
+        self.memory = memory_tier(db_path, memory_size) if memory_size > 0 else None
         self._lock = threading.Lock()
-        with closing(sqlite3.connect(self.db_path)) as conn:
-            conn.execute(CREATE_TABLE_SQL)
-            conn.commit()
+        self._uncommitted = 0
+        self._pending_hits: Dict[Tuple[str, str], Tuple[int, float]] = {}
+        # Buffered writes by key: (record, written_at) and
+        # (misses, checked_at, expires_at)
+        self._pending_records: Dict[Tuple[str, str], Tuple[TrackRecord, float]] = {}
+        self._pending_misses: Dict[Tuple[str, str], Tuple[int, float, float]] = {}
+        # Keys whose entry drop_track() deleted
+        self._pending_drops: Set[Tuple[str, str]] = set()
+        self._conn: Optional[sqlite3.Connection] = sqlite3.connect(
+            self.db_path, check_same_thread=False
+        )
+        for pragma in PRAGMAS:
+            self._conn.execute(pragma)
+        self._conn.execute(CREATE_TABLE_SQL)
+        self._conn.execute(CREATE_MISS_TABLE_SQL)
+        self._migrate()
+        self._conn.execute(CREATE_INDEX_SQL)
+        self._conn.execute(CREATE_TRACK_ID_INDEX_SQL)
+        self._conn.commit()
 
-    def get(self, artist: str, title: str) -> Optional[str]:
+    def _migrate(self) -> None:
+        """
+        Adds missing track_cache columns. Existing rows count as written now.
+        """
+        columns = {
+            row[1] for row in self.conn.execute("PRAGMA table_info(track_cache)")
+        }
+        missing = [ddl for name, ddl in TRACK_CACHE_MIGRATIONS if name not in columns]
+        for ddl in missing:
+            self.conn.execute(f"ALTER TABLE track_cache ADD COLUMN {ddl}")
+        if missing:
+            now = time.time()
+            self.conn.execute(
+                "UPDATE track_cache SET created_at=?, last_hit_at=? WHERE created_at=0",
+                (now, now),
+            )
+
+    def __enter__(self) -> "TrackCache":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            raise RuntimeError("TrackCache is closed")
+        return self._conn
+
+    def _wrote(self) -> None:
+        # Caller holds the lock
+        self._uncommitted += 1
+        if self._uncommitted >= self.write_batch:
+            self._commit()
+
+    def _commit(self) -> None:
+        # Caller holds the lock. Buffered rows go out in one short transaction;
+        # they stay buffered if it fails, so the next flush retries them.
+        try:
+            if self._pending_drops:
+                self.conn.executemany(
+                    "DELETE FROM track_cache WHERE artist=? AND title=?",
+                    list(self._pending_drops),
+                )
+            if self._pending_records:
+                self.conn.executemany(
+                    UPSERT_TRACK_SQL,
+                    [
+                        (*key, *_record_params(record), at, at)
+                        for key, (record, at) in self._pending_records.items()
+                    ],
+                )
+                self.conn.executemany(
+                    "DELETE FROM miss_cache WHERE artist=? AND title=?",
+                    list(self._pending_records),
+                )
+            if self._pending_misses:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO miss_cache "
+                    "(artist, title, misses, checked_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(*key, *miss) for key, miss in self._pending_misses.items()],
+                )
+            if self._pending_hits:
+                self.conn.executemany(
+                    "UPDATE track_cache SET hits=hits+?, "
+                    "last_hit_at=MAX(last_hit_at, ?) WHERE artist=? AND title=?",
+                    [(n, at, *key) for key, (n, at) in self._pending_hits.items()],
+                )
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        self._pending_records.clear()
+        self._pending_misses.clear()
+        self._pending_drops.clear()
+        self._pending_hits.clear()
+        self._uncommitted = 0
+
+    def _hit(self, key: Tuple[str, str], now: float) -> None:
+        # Caller holds the lock
+        count, _ = self._pending_hits.get(key, (0, now))
+        self._pending_hits[key] = (count + 1, now)
+
+    def _is_stale(self, created_at: float, now: float) -> bool:
+        return self.ttl > 0 and created_at < now - self.ttl
+
+    def flush(self) -> None:
+        """
+        Commit any buffered writes and hit counters.
+        """
+        with self._lock:
+            if self._uncommitted or self._pending_hits:
+                self._commit()
+
+    def _flush_locked(self) -> None:
+        # Caller holds the lock. Run before statements that read or change
+        # rows by something other than their key.
+        if self._uncommitted:
+            self._commit()
+
+    def close(self) -> None:
+        """
+        Flush buffered writes and close the connection. Safe to call twice.
+        """
+        if self._conn is None:
+            return
+        if self.max_rows > 0 or self.max_bytes > 0:
+            self.evict()
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get(
+        self, artist: str, title: str, now: Optional[float] = None
+    ) -> Optional[str]:
         """
         Look up a track_id for the given artist and title.
-        Returns the track_id if found, else None.
+        Returns the track_id if found and not due for revalidation, else None.
+        """
+        record = self.get_record(artist, title, now)
+        return record.track_id if record else None
+
+    def get_record(
+        self, artist: str, title: str, now: Optional[float] = None
+    ) -> Optional[TrackRecord]:
+        """
+        Like get(), but returns the full cached TrackRecord.
         """
-        with self._lock, closing(sqlite3.connect(self.db_path)) as conn:
-            cur = conn.execute(
-                "SELECT track_id FROM track_cache WHERE artist=? AND title=?",
-                (artist.casefold(), title.casefold()),
+        now = time.time() if now is None else now
+        key = (artist.casefold(), title.casefold())
+        if self.memory is not None:
+            entry = self.memory.get(key)
+            if entry is not None and not self._is_stale(entry[1], now):
+                with self._lock:
+                    self._hit(key, now)
+                record: TrackRecord = entry[0]
+                return record
+        with self._lock:
+            if key in self._pending_drops:
+                return None
+            pending = self._pending_records.get(key)
+            if pending is not None:
+                if self._is_stale(pending[1], now):
+                    return None
+                self._hit(key, now)
+                return pending[0]
+            row = self.conn.execute(
+                f"SELECT {RECORD_COLUMNS}, created_at FROM track_cache "
+                "WHERE artist=? AND title=?",
+                key,
+            ).fetchone()
+            if not row or self._is_stale(row[-1], now):
+                return None
+            self._hit(key, now)
+        record = TrackRecord.from_row(row[:-1])
+        if self.memory is not None:
+            self.memory.put(key, (record, row[-1]))
+        return record
+
+    def _lookup_many(
+        self, table: str, columns: str, keys: Iterable[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], Tuple[Any, ...]]:
+        """
+        Fetches ``columns`` for many (artist, title) keys with chunked row-value
+        IN lists. Returns a dict of row tuples keyed by the caller's original keys.
+        """
+        by_norm: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+        for artist, title in keys:
+            by_norm.setdefault((artist.casefold(), title.casefold()), []).append(
+                (artist, title)
             )
-            row = cur.fetchone()
-            return row[0] if row else None
+        norm_keys = list(by_norm)
+        found: Dict[Tuple[str, str], Tuple[Any, ...]] = {}
+        with self._lock:
+            for start in range(0, len(norm_keys), LOOKUP_CHUNK):
+                chunk = norm_keys[start : start + LOOKUP_CHUNK]
+                values = ", ".join("(?, ?)" for _ in chunk)
+                params = [part for key in chunk for part in key]
+                rows = self.conn.execute(
+                    f"SELECT artist, title, {columns} FROM {table} "
+                    f"WHERE (artist, title) IN (VALUES {values})",
+                    params,
+                ).fetchall()
+                for artist, title, *values in rows:
+                    for original in by_norm[(artist, title)]:
+                        found[original] = tuple(values)
+        return found
 
-    def set(self, artist: str, title: str, track_id: str) -> None:
+    def get_many(
+        self, keys: Iterable[Tuple[str, str]], now: Optional[float] = None
+    ) -> Dict[Tuple[str, str], str]:
+        """
+        Look up track_ids for many (artist, title) keys at once.
+        Returns:
+            Dict of the given keys that are cached (and not due for
+            revalidation) to their track_id.
         """
-        Store a track_id for the given artist and title.
+        return {
+            key: record.track_id
+            for key, record in self.get_many_records(keys, now).items()
+        }
+
+    def get_many_records(
+        self, keys: Iterable[Tuple[str, str]], now: Optional[float] = None
+    ) -> Dict[Tuple[str, str], TrackRecord]:
+        """
+        Like get_many(), but returns the full cached TrackRecords.
+        """
+        now = time.time() if now is None else now
+        found: Dict[Tuple[str, str], TrackRecord] = {}
+        remaining: List[Tuple[str, str]] = []
+        hit_keys: List[Tuple[str, str]] = []
+        for artist, title in keys:
+            key = (artist.casefold(), title.casefold())
+            entry = self.memory.get(key) if self.memory is not None else None
+            if entry is None:
+                entry = self._pending_records.get(key)
+            if entry is not None and not self._is_stale(entry[1], now):
+                found[(artist, title)] = entry[0]
+                hit_keys.append(key)
+            elif key not in self._pending_drops:
+                remaining.append((artist, title))
+        for (artist, title), row in self._lookup_many(
+            "track_cache", f"{RECORD_COLUMNS}, created_at", remaining
+        ).items():
+            if self._is_stale(row[-1], now):
+                continue
+            key = (artist.casefold(), title.casefold())
+            record = TrackRecord.from_row(row[:-1])
+            if self.memory is not None:
+                self.memory.put(key, (record, row[-1]))
+            found[(artist, title)] = record
+            hit_keys.append(key)
+        with self._lock:
+            for key in hit_keys:
+                self._hit(key, now)
+        return found
+
+    def fresh_misses(
+        self, keys: Iterable[Tuple[str, str]], now: Optional[float] = None
+    ) -> Set[Tuple[str, str]]:
+        """
+        Returns the given (artist, title) keys whose recorded miss is still fresh.
+        """
+        now = time.time() if now is None else now
+        keys = list(keys)
+        expiries = {
+            key: expires_at
+            for key, (expires_at,) in self._lookup_many(
+                "miss_cache", "expires_at", keys
+            ).items()
+        }
+        with self._lock:
+            for artist, title in keys:
+                norm = (artist.casefold(), title.casefold())
+                if norm in self._pending_misses:
+                    expiries[(artist, title)] = self._pending_misses[norm][2]
+                elif norm in self._pending_records:
+                    expiries.pop((artist, title), None)
+        return {key for key, expires_at in expiries.items() if expires_at > now}
+
+    def set(
+        self, artist: str, title: str, track_id: str, now: Optional[float] = None
+    ) -> None:
         """
-        with self._lock, closing(sqlite3.connect(self.db_path)) as conn:
-            conn.execute(
-                "INSERT OR REPLACE INTO track_cache (artist, title, track_id) VALUES (?, ?, ?)",
-                (artist.casefold(), title.casefold(), track_id),
+        Store a track_id for the given artist and title (clears any miss).
+        Storing an existing key again counts as revalidating it.
+        """
+        self.set_record(artist, title, TrackRecord(track_id), now)
+
+    def set_record(
+        self,
+        artist: str,
+        title: str,
+        record: TrackRecord,
+        now: Optional[float] = None,
+    ) -> None:
+        """
+        Store a track and its metadata for the given artist and title.
+        """
+        now = time.time() if now is None else now
+        key = (artist.casefold(), title.casefold())
+        with self._lock:
+            self._pending_records[key] = (record, now)
+            self._pending_misses.pop(key, None)
+            self._pending_drops.discard(key)
+            self._wrote()
+        if self.memory is not None:
+            self.memory.put(key, (record, now))
+
+    def set_miss(self, artist: str, title: str, now: Optional[float] = None) -> float:
+        """
+        Record that a search for artist and title found nothing.
+        Each repeated miss multiplies the expiry by miss_backoff, capped at
+        miss_ttl_max.
+        Returns:
+            The timestamp at which the miss expires.
+        """
+        now = time.time() if now is None else now
+        key = (artist.casefold(), title.casefold())
+        with self._lock:
+            if key in self._pending_misses:
+                previous = self._pending_misses[key][0]
+            elif key in self._pending_records:
+                previous = 0
+            else:
+                row = self.conn.execute(
+                    "SELECT misses FROM miss_cache WHERE artist=? AND title=?", key
+                ).fetchone()
+                previous = row[0] if row else 0
+            misses = previous + 1
+            ttl = min(
+                self.miss_ttl * self.miss_backoff ** (misses - 1), self.miss_ttl_max
+            )
+            self._pending_misses[key] = (misses, now, now + ttl)
+            self._wrote()
+        return now + ttl
+
+    def is_fresh_miss(
+        self, artist: str, title: str, now: Optional[float] = None
+    ) -> bool:
+        """
+        True if a recorded miss for artist and title has not expired yet.
+        """
+        now = time.time() if now is None else now
+        key = (artist.casefold(), title.casefold())
+        with self._lock:
+            if key in self._pending_misses:
+                return self._pending_misses[key][2] > now
+            if key in self._pending_records:
+                return False
+            row = self.conn.execute(
+                "SELECT expires_at FROM miss_cache WHERE artist=? AND title=?", key
+            ).fetchone()
+        return bool(row) and row[0] > now
+
+    def keys_by_track_id(
+        self, track_ids: Optional[Iterable[str]] = None
+    ) -> Dict[str, List[Tuple[str, str]]]:
+        """
+        Groups cached (artist, title) keys by the track_id they resolve to.
+        Args:
+            track_ids: Only these track IDs (default: every cached track).
+        Returns:
+            Dict of track_id -> list of (artist, title) keys, casefolded.
+        """
+        wanted = None if track_ids is None else list(dict.fromkeys(track_ids))
+        with self._lock:
+            if wanted is None:
+                rows = self.conn.execute(
+                    "SELECT track_id, artist, title FROM track_cache"
+                ).fetchall()
+            else:
+                rows = []
+                for i in range(0, len(wanted), LOOKUP_CHUNK):
+                    chunk = wanted[i : i + LOOKUP_CHUNK]
+                    rows.extend(
+                        self.conn.execute(
+                            "SELECT track_id, artist, title FROM track_cache "
+                            f"WHERE track_id IN ({', '.join('?' * len(chunk))})",
+                            chunk,
+                        ).fetchall()
+                    )
+            # Buffered writes replace or delete their stored rows, so the
+            # lookup does not have to flush them first
+            shadowed = self._pending_drops | self._pending_records.keys()
+            rows = [row for row in rows if (row[1], row[2]) not in shadowed]
+            wanted_ids = None if wanted is None else set(wanted)
+            rows.extend(
+                (record.track_id, *key)
+                for key, (record, _) in self._pending_records.items()
+                if wanted_ids is None or record.track_id in wanted_ids
+            )
+        grouped: Dict[str, List[Tuple[str, str]]] = {}
+        for track_id, artist, title in rows:
+            grouped.setdefault(track_id, []).append((artist, title))
+        return grouped
+
+    def replace_track(
+        self, track_id: str, record: TrackRecord, now: Optional[float] = None
+    ) -> int:
+        """
+        Points every entry cached as track_id at record (e.g. a relinked track
+        with fresh metadata) and counts them as revalidated.
+        Returns:
+            Number of entries updated.
+        """
+        keys = self.keys_by_track_id([track_id]).get(track_id, [])
+        for artist, title in keys:
+            self.set_record(artist, title, record, now)
+        return len(keys)
+
+    def drop_track(self, track_id: str) -> int:
+        """
+        Deletes every entry cached as track_id (e.g. a delisted track), so the
+        next sync searches those titles again.
+        Returns:
+            Number of entries deleted.
+        """
+        keys = self.keys_by_track_id([track_id]).get(track_id, [])
+        with self._lock:
+            for key in keys:
+                self._pending_records.pop(key, None)
+                self._pending_hits.pop(key, None)
+                self._pending_drops.add(key)
+            self._wrote()
+        if self.memory is not None:
+            for key in keys:
+                self.memory.pop(key)
+        return len(keys)
+
+    def _used_bytes(self) -> int:
+        # Caller holds the lock
+        page_size = self.conn.execute("PRAGMA page_size").fetchone()[0]
+        pages = self.conn.execute("PRAGMA page_count").fetchone()[0]
+        free = self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return int((pages - free) * page_size)
+
+    def _evict_rows(self, count: int) -> None:
+        # Caller holds the lock
+        order = "hits, last_hit_at" if self.eviction == "lfu" else "last_hit_at"
+        rows = self.conn.execute(
+            f"SELECT rowid, artist, title FROM track_cache ORDER BY {order} LIMIT ?",
+            (count,),
+        ).fetchall()
+        self.conn.executemany(
+            "DELETE FROM track_cache WHERE rowid=?", [(row[0],) for row in rows]
+        )
+        self._commit()
+        # Evicted entries must not be served from the process-wide tier either
+        if self.memory is not None:
+            for _, artist, title in rows:
+                self.memory.pop((artist, title))
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """
+        Trim the cache to max_rows and max_bytes using the eviction policy,
+        and drop misses whose backoff history no longer matters.
+        Trimming to max_bytes also VACUUMs, so the file itself shrinks.
+        Returns:
+            Number of track entries removed.
+        """
+        now = time.time() if now is None else now
+        removed = 0
+        with self._lock:
+            self._flush_locked()
+            self.conn.execute(
+                "DELETE FROM miss_cache WHERE expires_at < ?",
+                (now - self.miss_ttl_max,),
             )
-            conn.commit()
+            self._commit()
+            rows = self.conn.execute("SELECT COUNT(*) FROM track_cache").fetchone()[0]
+            if self.max_rows > 0 and rows > self.max_rows:
+                self._evict_rows(rows - self.max_rows)
+                removed += rows - self.max_rows
+                rows = self.max_rows
+            if self.max_bytes <= 0:
+                return removed
+            # Row size is estimated from the current file, so repeat until
+            # the fixed overhead of schema and index pages is accounted for
+            for _ in range(EVICT_ROUNDS):
+                used = self._used_bytes()
+                if used <= self.max_bytes or not rows:
+                    break
+                keep = int(rows * self.max_bytes / used * EVICT_HEADROOM)
+                self._evict_rows(rows - keep)
+                removed += rows - keep
+                rows = keep
+                self.conn.execute("VACUUM")
+        return removed
+
+
+def track_cache_from_config(config: Mapping[str, Any]) -> TrackCache:
+    """
+    Creates a TrackCache using the cache options from config.
+    Args:
+        config: Configuration dictionary (see default_config.toml).
+    """
+    return TrackCache(
+        miss_ttl=float(config.get("miss_ttl", MISS_TTL)),
+        miss_ttl_max=float(config.get("miss_ttl_max", MISS_TTL_MAX)),
+        miss_backoff=float(config.get("miss_backoff", MISS_BACKOFF)),
+        write_batch=int(config.get("cache_write_batch", WRITE_BATCH)),
+        memory_size=int(config.get("cache_memory_size", MEMORY_SIZE)),
+        ttl=float(config.get("cache_ttl", TRACK_TTL)),
+        max_rows=int(config.get("cache_max_rows", MAX_ROWS)),
+        max_bytes=int(config.get("cache_max_bytes", MAX_BYTES)),
+        eviction=str(config.get("cache_eviction", "lru")),
+    )
@@ -0,0 +1,259 @@
+import json
+import sqlite3
+import threading
+import time
+from types import TracebackType
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Type
+from yt2spotify.cache import PRAGMAS, TrackRecord
+from yt2spotify.logging_config import logger
+from yt2spotify.matching import JW_THRESHOLD, TOKEN_SET_THRESHOLD, match_many
+from yt2spotify.normalize import fold
+from yt2spotify.rate_limit import spotify_limiter
+
+# Kept out of the track cache's file, whose size cache_max_bytes bounds
+CATALOG_DB_PATH = "catalog.sqlite"
+# Artists with fewer uncached titles are left to the regular search; 0 turns
+# catalog resolution off
+CATALOG_MIN_TITLES = 0
+# Seconds a fetched catalog is reused before it is fetched again (7 days)
+CATALOG_TTL = 7 * 24 * 3600.0
+# Album types fetched; "appears_on" would pull in other artists' catalogs
+CATALOG_GROUPS = "album,single"
+# Spotify accepts at most 20 IDs per several-albums request
+ALBUMS_BATCH = 20
+
+CREATE_CATALOG_SQL = """
+CREATE TABLE IF NOT EXISTS artist_catalog (
+    artist TEXT PRIMARY KEY,
+    artist_id TEXT,
+    fetched_at REAL NOT NULL,
+    tracks TEXT NOT NULL
+);
+"""
+
+
+def _record_to_json(record: TrackRecord) -> List[Any]:
+    return [
+        record.track_id,
+        record.name,
+        list(record.artists),
+        record.duration_ms,
+        record.album,
+    ]
+
+
+def _record_from_json(row: Sequence[Any]) -> TrackRecord:
+    track_id, name, artists, duration_ms, album = row
+    return TrackRecord(
+        track_id=track_id,
+        name=name,
+        artists=tuple(artists),
+        duration_ms=duration_ms,
+        album=album,
+    )
+
+
+class CatalogCache:
+    """
+    Stores fetched artist catalogs (every track of the artist's albums and
+    singles) on disk, in their own SQLite file by default.
+    Artists that could not be found are stored with an empty catalog, so
+    they are not looked up again until the entry expires.
+    """
+
+    def __init__(
+        self, db_path: str = CATALOG_DB_PATH, ttl: float = CATALOG_TTL
+    ) -> None:
+        self.db_path = db_path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = sqlite3.connect(
+            self.db_path, check_same_thread=False
+        )
+        for pragma in PRAGMAS:
+            self._conn.execute(pragma)
+        self._conn.execute(CREATE_CATALOG_SQL)
+        self._conn.commit()
+
+    def __enter__(self) -> "CatalogCache":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            raise RuntimeError("CatalogCache is closed")
+        return self._conn
+
+    def close(self) -> None:
+        """
+        Close the connection. Safe to call twice.
+        """
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get(
+        self, artist: str, now: Optional[float] = None
+    ) -> Optional[List[TrackRecord]]:
+        """
+        Returns the stored catalog of artist, or None if missing or expired.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT fetched_at, tracks FROM artist_catalog WHERE artist=?",
+                (fold(artist),),
+            ).fetchone()
+        if row is None or (self.ttl > 0 and row[0] < now - self.ttl):
+            return None
+        return [_record_from_json(track) for track in json.loads(row[1])]
+
+    def set(
+        self,
+        artist: str,
+        artist_id: Optional[str],
+        tracks: Sequence[TrackRecord],
+        now: Optional[float] = None,
+    ) -> None:
+        """
+        Stores the catalog of artist (empty if the artist was not found).
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO artist_catalog "
+                "(artist, artist_id, fetched_at, tracks) VALUES (?, ?, ?, ?)",
+                (
+                    fold(artist),
+                    artist_id,
+                    now,
+                    json.dumps([_record_to_json(track) for track in tracks]),
+                ),
+            )
+            self.conn.commit()
+
+
+def _find_artist_id(sp: Any, artist: str) -> Optional[str]:
+    """
+    Returns the Spotify ID of the artist whose name matches exactly
+    (case- and width-insensitive), or None.
+    """
+    spotify_limiter.acquire()
+    result = sp.search(q=f"artist:{artist}", type="artist", limit=5)
+    for item in ((result or {}).get("artists") or {}).get("items") or []:
+        if item and fold(item.get("name") or "") == fold(artist):
+            return str(item["id"])
+    return None
+
+
+def fetch_artist_catalog(sp: Any, artist_id: str) -> List[TrackRecord]:
+    """
+    Fetches every track on an artist's albums and singles.
+    API calls grow with the number of albums (20 albums per request), not
+    with the number of tracks.
+    Args:
+        sp: Spotipy client.
+        artist_id: Spotify artist ID.
+    Returns:
+        List of TrackRecord (without ISRCs, which album tracks do not carry).
+    """
+    album_ids: List[str] = []
+    spotify_limiter.acquire()
+    page = sp.artist_albums(artist_id, include_groups=CATALOG_GROUPS, limit=50)
+    while page:
+        album_ids.extend(a["id"] for a in page.get("items") or [] if a and a.get("id"))
+        if not page.get("next"):
+            break
+        spotify_limiter.acquire()
+        page = sp.next(page)
+    tracks: List[TrackRecord] = []
+    for i in range(0, len(album_ids), ALBUMS_BATCH):
+        spotify_limiter.acquire()
+        albums = sp.albums(album_ids[i : i + ALBUMS_BATCH]).get("albums") or []
+        for album in albums:
+            if not album:
+                continue
+            track_page = album.get("tracks") or {}
+            while track_page:
+                for item in track_page.get("items") or []:
+                    if item and item.get("id"):
+                        tracks.append(
+                            TrackRecord.from_spotify({**item, "album": album})
+                        )
+                if not track_page.get("next"):
+                    break
+                spotify_limiter.acquire()
+                track_page = sp.next(track_page)
+    return tracks
+
+
+def resolve_from_catalogs(
+    sp: Any,
+    queries: Sequence[Tuple[str, str, str]],
+    catalogs: CatalogCache,
+    config: Optional[Mapping[str, Any]] = None,
+) -> Dict[int, TrackRecord]:
+    """
+    Resolves artist-heavy queries against whole artist catalogs.
+
+    Queries are grouped by artist. For every artist with at least
+    ``catalog_min_titles`` queries, the catalog is loaded from ``catalogs``
+    (or fetched and stored) and all of the artist's titles are matched
+    locally with match_many. Queries without a match are left for search.
+    Args:
+        sp: Spotipy client.
+        queries: (artist, title, query_string) tuples, e.g. the uncached ones.
+        catalogs: CatalogCache for fetched catalogs.
+        config: Configuration dictionary (catalog_min_titles, jw_threshold,
+            token_set_threshold).
+    Returns:
+        Dict of query index -> matched TrackRecord.
+    """
+    config = config or {}
+    min_titles = int(config.get("catalog_min_titles", CATALOG_MIN_TITLES))
+    if min_titles <= 0:
+        return {}
+    by_artist: Dict[str, List[int]] = {}
+    for i, (artist, title, _) in enumerate(queries):
+        if artist and title:
+            by_artist.setdefault(fold(artist).strip(), []).append(i)
+    resolved: Dict[int, TrackRecord] = {}
+    for artist, indices in by_artist.items():
+        if len(indices) < min_titles:
+            continue
+        catalog = catalogs.get(artist)
+        if catalog is None:
+            try:
+                artist_id = _find_artist_id(sp, artist)
+                catalog = fetch_artist_catalog(sp, artist_id) if artist_id else []
+            except Exception as e:
+                logger.warning(f"Could not fetch the catalog of {artist}: {e}")
+                continue
+            catalogs.set(artist, artist_id, catalog)
+        if not catalog:
+            continue
+        best, _ = match_many(
+            [queries[i][0] for i in indices],
+            [queries[i][1] for i in indices],
+            [record.artist for record in catalog],
+            [record.name for record in catalog],
+            float(config.get("jw_threshold", JW_THRESHOLD)),
+            float(config.get("token_set_threshold", TOKEN_SET_THRESHOLD)),
+        )
+        for i, candidate in zip(indices, best):
+            if candidate >= 0:
+                resolved[i] = catalog[candidate]
+        logger.info(
+            f"Catalog of {artist}: {len(catalog)} tracks matched "
+            f"{sum(1 for c in best if c >= 0)} of {len(indices)} titles"
+        )
+    return resolved
@@ -1,14 +1,54 @@
 # mypy: disable-error-code=assignment
+import asyncio
 import logging
-from typing import Any, Optional
-from yt2spotify.core import get_spotify_client
-from yt2spotify.yt_utils import get_yt_playlist_titles_yt_dlp
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, Optional
+from yt2spotify.core import (
+    async_search_with_cache,
+    dedupe_queries,
+    fan_out_results,
+    get_spotify_client,
+    prefetch_cache,
+)
+from yt2spotify.catalog import CATALOG_TTL, CatalogCache, resolve_from_catalogs
+from yt2spotify.yt_utils import (
+    get_yt_playlist_titles_yt_dlp,
+    iter_yt_playlist_entries_yt_dlp,
+    iter_yt_playlist_titles_yt_dlp,
+)
 from yt2spotify.youtube import get_yt_playlist_titles_api as yt_api_fetch
-from yt2spotify.utils import clean_title, parse_artist_track
+from yt2spotify.youtube import (
+    extract_playlist_id,
+    iter_yt_playlist_entries_api,
+    iter_yt_playlist_titles_api,
+)
+from yt2spotify.spotify_async import get_async_spotify_client
+from yt2spotify.sync_state import SyncState, take_new_entries
+from yt2spotify.utils import (
+    PARSE_POOL_MIN,
+    build_search_query,
+    compile_stop_words,
+    is_unavailable_title,
+    parse_many,
+)
 import toml
 import os
 import json
 from yt2spotify.logging_config import logger
+from yt2spotify.playlist import (
+    PAGE_WORKERS,
+    add_tracks_adaptive,
+    fetch_playlist_items,
+    fetch_playlist_track_ids,
+    get_snapshot_id,
+    load_playlist_track_ids,
+    playlist_track_ids,
+)
+from yt2spotify.pipeline import PipelineResult, run_pipeline
+from yt2spotify.rate_limit import configure_spotify_limiter, spotify_limiter
+from yt2spotify.revalidate import revalidate_track_ids
+from yt2spotify.spotify_session import configure_spotify_pool
 
 
 def load_config(config_path: Optional[str] = None) -> dict[str, Any]:
@@ -38,6 +78,232 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 os.makedirs(LOG_DIR, exist_ok=True)
 
 
+def _write_playlist_snapshot(playlist_id: str, items: list[Any]) -> None:
+    """
+    Saves playlist items to OUTPUT_DIR so undo can restore them.
+    """
+    snapshot_path = os.path.join(OUTPUT_DIR, f"playlist_{playlist_id}_snapshot.json")
+    with open(snapshot_path, "w", encoding="utf-8") as f:
+        json.dump(items, f, ensure_ascii=False, indent=2)
+
+
+def _load_membership(
+    sp: Any,
+    playlist_id: str,
+    config: dict[str, Any],
+    state: Optional[SyncState] = None,
+    snapshot_id: Optional[str] = None,
+) -> set[str]:
+    """
+    Returns the track IDs in the target playlist. With snapshot enabled, one
+    fetch feeds both the undo snapshot and the IDs; otherwise the membership
+    stored in state is reused while snapshot_id is unchanged.
+    """
+    workers = int(config.get("playlist_page_workers", PAGE_WORKERS))
+    if config.get("snapshot"):
+        items = fetch_playlist_items(sp, playlist_id, workers)
+        _write_playlist_snapshot(playlist_id, items)
+        track_ids = playlist_track_ids(items)
+        if state is not None and snapshot_id:
+            state.save_membership(playlist_id, snapshot_id, track_ids)
+        return track_ids
+    if state is not None and snapshot_id:
+        return load_playlist_track_ids(sp, playlist_id, state, snapshot_id, workers)
+    return fetch_playlist_track_ids(sp, playlist_id, workers)
+
+
+def _iter_new_titles(
+    yt_url: str,
+    yt_api: Optional[str],
+    known_ids: set[str],
+    stop_after: int,
+    video_ids: list[Optional[str]],
+) -> Iterator[str]:
+    """
+    Yields the titles of videos not synced yet, appending each title's video
+    ID to video_ids as it goes so the two stay aligned.
+    """
+    entries = (
+        iter_yt_playlist_entries_api(yt_api, yt_url)
+        if yt_api
+        else iter_yt_playlist_entries_yt_dlp(yt_url)
+    )
+    for video_id, title in take_new_entries(entries, known_ids, stop_after):
+        video_ids.append(video_id)
+        yield title
+
+
+def _resolve_catalogs(
+    sp: Any,
+    queries: list[tuple[str, str, str]],
+    cache: Any,
+    config: dict[str, Any],
+) -> None:
+    """
+    Matches uncached queries of artist-heavy playlists against whole artist
+    catalogs and caches the matches, so the search phase only sees leftovers.
+    """
+    cached, _ = prefetch_cache(cache, queries, recheck_misses=True)
+    uncached = [q for q in queries if not cached.get((q[0], q[1]))]
+    with CatalogCache(ttl=float(config.get("catalog_ttl", CATALOG_TTL))) as catalogs:
+        resolved = resolve_from_catalogs(sp, uncached, catalogs, config)
+    for i, record in resolved.items():
+        artist, title, _ = uncached[i]
+        cache.set_record(artist, title, record)
+
+
+async def _search_uncached(
+    sp: Any,
+    queries: list[tuple[str, str, str]],
+    cache: Any,
+    config: dict[str, Any],
+) -> list[tuple[str, str, Optional[str]]]:
+    """
+    Runs async_search_with_cache, searching on the event loop with the
+    asyncio client when async_http is set (falls back to threads without
+    httpx).
+    """
+    concurrency = int(config.get("search_concurrency", 8))
+    async_sp = None
+    if config.get("async_http", False):
+        try:
+            async_sp = get_async_spotify_client(max_connections=concurrency)
+        except ImportError as e:
+            logger.warning(f"{e}; searching on threads instead")
+    try:
+        return await async_search_with_cache(
+            sp,
+            queries,
+            cache,
+            concurrency=concurrency,
+            recheck_misses=bool(config.get("recheck_misses", False)),
+            config=config,
+            async_sp=async_sp,
+        )
+    finally:
+        if async_sp is not None:
+            await async_sp.aclose()
+
+
+def _run_search(
+    sp: Any,
+    queries: list[tuple[str, str, str]],
+    cache: Any,
+    config: dict[str, Any],
+) -> list[tuple[str, str, Optional[str]]]:
+    """
+    Runs _search_uncached to completion. asyncio.run refuses to start inside
+    a running event loop (sync_command called from async code), so there the
+    search runs on its own loop in a worker thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_search_uncached(sp, queries, cache, config))
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(
+            asyncio.run, _search_uncached(sp, queries, cache, config)
+        ).result()
+
+
+def _run_phases(
+    sp: Any,
+    yt_url: str,
+    playlist_id: str,
+    yt_api: Optional[str],
+    config: dict[str, Any],
+    title_source: Optional[Iterable[str]] = None,
+    load_membership: Optional[Callable[[], set[str]]] = None,
+) -> PipelineResult:
+    """
+    Runs fetch, parse, membership and search as separate phases (the YouTube
+    and playlist membership fetches overlap). Adding is left to the caller.
+    title_source replaces the full YouTube fetch (used by incremental syncs)
+    and load_membership the default _load_membership (stored membership).
+    """
+
+    def fetch_membership() -> set[str]:
+        # Get all track IDs in the Spotify playlist (avoid duplicates),
+        # saving the undo snapshot on the way if requested
+        if load_membership is not None:
+            return load_membership()
+        return _load_membership(sp, playlist_id, config)
+
+    def fetch_titles() -> list[str]:
+        # 1. Gather all YouTube titles
+        logger.info("## Working on Youtube Titles ##")
+        if title_source is not None:
+            titles = list(title_source)
+        elif yt_api:
+            titles = yt_api_fetch(yt_api, yt_url)
+        else:
+            titles = get_yt_playlist_titles_yt_dlp(yt_url)
+        logger.info("## Compiled Youtube Titles ##")
+        return titles
+
+    # The YouTube fetch and the Spotify membership fetch are independent
+    # network-bound jobs, so start them together and join before searching
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        titles_future = pool.submit(fetch_titles)
+        membership_future = pool.submit(fetch_membership)
+        titles = titles_future.result()
+        playlist_tracks = membership_future.result()
+
+    # Parse and filter out private/deleted YouTube titles
+    parsed = []
+    query_rows = []
+    skipped_songs = []
+    parsed_titles = parse_many(
+        titles,
+        workers=int(config.get("parse_workers", 0)) or None,
+        min_pool_size=int(config.get("parse_pool_min", PARSE_POOL_MIN)),
+    )
+    for row, (title, (artist, track)) in enumerate(zip(titles, parsed_titles)):
+        if is_unavailable_title(title, artist, track):
+            skipped_songs.append(
+                {
+                    "title": title,
+                    "artist": artist,
+                    "track": track,
+                    "status": "private_or_deleted",
+                }
+            )
+        else:
+            parsed.append((title, artist, track))
+            query_rows.append(row)
+
+    # Prepare queries for only non-private/deleted
+    queries = []
+    stop_words = compile_stop_words(config.get("stop_words", []))
+    for title, artist, track in parsed:
+        query = build_search_query(title, artist, track, stop_words)
+        queries.append((artist or "", track or "", query, title))
+
+    # Sync search with cache (only for tracks not already in playlist)
+    from yt2spotify.cache import track_cache_from_config
+
+    # Reuploads, lyric videos etc. share a query: search each one only once
+    search_queries = [(artist, track, query) for artist, track, query, _ in queries]
+    unique_queries, positions = dedupe_queries(search_queries)
+    # Closing flushes the cache's buffered writes
+    with closing(track_cache_from_config(config)) as cache:
+        if int(config.get("catalog_min_titles", 0)) > 0:
+            _resolve_catalogs(sp, unique_queries, cache, config)
+        unique_results = _run_search(sp, unique_queries, cache, config)
+    search_results = fan_out_results(search_queries, unique_results, positions)
+
+    return PipelineResult(
+        titles=titles,
+        parsed_titles=parsed_titles,
+        skipped=skipped_songs,
+        queries=queries,
+        query_rows=query_rows,
+        search_results=search_results,
+        playlist_tracks=playlist_tracks,
+        duplicate_queries=len(queries) - len(unique_queries),
+    )
+
+
 def sync_command(
     yt_url: str,
     playlist_id: str,
@@ -63,223 +329,169 @@ def sync_command(
         logger.setLevel(logging.DEBUG)
     else:
         logger.setLevel(logging.INFO)
-    # 1. Gather all YouTube titles and filter out private/deleted
-    logger.info("## Working on Youtube Titles ##")
-    if yt_api:
-        titles = yt_api_fetch(yt_api, yt_url)
-    else:
-        titles = get_yt_playlist_titles_yt_dlp(yt_url)
-    logger.info("## Compiled Youtube Titles ##")
+    configure_spotify_limiter(config)
+    configure_spotify_pool(config)
+    # Imported here so tests can patch yt2spotify.cache.TrackCache
+    from yt2spotify.cache import track_cache_from_config
 
-    # Parse and filter YouTube titles
-    parsed = []
-    skipped_songs = []
-    for title in titles:
-        artist, track = parse_artist_track(title)
-        if (
-            not (artist or track)
-            or not title
-            or title.strip().lower().startswith("[private")
-            or title.strip().lower().startswith("[deleted")
-        ):
-            skipped_songs.append(
-                {
-                    "title": title,
-                    "artist": artist,
-                    "track": track,
-                    "status": "private_or_deleted",
-                }
-            )
-        else:
-            parsed.append((title, artist, track))
-    # Write skipped to output immediately (for private/deleted)
-    with open(NOT_FOUND_SONGS_PATH, "w", encoding="utf-8") as f:
-        json.dump([], f, ensure_ascii=False, indent=2)
     not_found_on_spotify: list[dict[str, str]] = (
         []
     )  # Ensure this is always defined for later code
-
-    # Get all track IDs in the Spotify playlist (avoid duplicates)
+    # Write skipped to output immediately (for private/deleted)
+    with open(NOT_FOUND_SONGS_PATH, "w", encoding="utf-8") as f:
+        json.dump([], f, ensure_ascii=False, indent=2)
     sp = get_spotify_client()
-    # Save snapshot of current playlist state if requested
-    if config.get("snapshot"):
-        snapshot_path = os.path.join(
-            OUTPUT_DIR, f"playlist_{playlist_id}_snapshot.json"
-        )
-        playlist_snapshot = sp.playlist_tracks(playlist_id)
-        items = playlist_snapshot.get("items", [])
-        while playlist_snapshot.get("next"):
-            playlist_snapshot = sp.next(playlist_snapshot)
-            items.extend(playlist_snapshot.get("items", []))
-        with open(snapshot_path, "w", encoding="utf-8") as f:
-            json.dump(items, f, ensure_ascii=False, indent=2)
-    playlist_tracks = set()
-    results = sp.playlist_tracks(playlist_id)
-    while results:
-        for item in results.get("items", []):
-            track = item.get("track")
-            if track and track.get("id"):
-                playlist_tracks.add(track["id"])
-        results = sp.next(results) if results.get("next") else None
-
-    # Prepare queries for only non-private/deleted
-    queries = []
-    for title, artist, track in parsed:
-        query = f"artist:{artist} track:{track}" if artist else clean_title(title)
-        queries.append((artist or "", track or "", query.strip(), title))
-
-    # Sync search with cache (only for tracks not already in playlist)
-    from yt2spotify.cache import TrackCache
-
-    cache = TrackCache()
-    search_results: list[tuple[str, str, Optional[str]]] = []
-    for artist, track, query, title in queries:
-        # Check cache first
-        cached_id = cache.get(artist, track)
-        if cached_id:
-            search_results.append((artist, track, cached_id))
-            continue
-        # Perform Spotify search (synchronous, single track)
-        result = sp.search(q=query, type="track", limit=1) or {}
-        items = result.get("tracks", {}).get("items", [])
-        if items:
-            track_id = items[0]["id"]
-            cache.set(artist, track, track_id)
-            search_results.append((artist, track, track_id))
-        else:
-            search_results.append((artist, track, None))
-
-    # Get batch size and delay from config or use defaults
-    batch_size = int(config.get("batch_size", 25))
-    # Set a high default batch_delay for safety
-    batch_delay = float(config.get("batch_delay", 10.0))
-    max_retries = int(config.get("max_retries", 5))
-    backoff_factor = float(config.get("backoff_factor", 2.0))
-    min_retry_after = (
-        10.0  # Always wait at least 10 seconds after a 429 if Retry-After is missing
+    incremental = bool(config.get("incremental", False))
+    # Stored playlist membership is reused while the snapshot_id is unchanged
+    snapshot_id = (
+        get_snapshot_id(sp, playlist_id)
+        if config.get("membership_cache", True)
+        else None
     )
-
-    # Build a set of track IDs already in the playlist for deduplication
-    added_count = 0
-    batch = []
-    added_songs = []
-    for (artist, track, query, title), (_, _, track_id) in zip(queries, search_results):
-        if track_id and track_id in playlist_tracks:
-            # Already in playlist, skip adding
-            added_songs.append(
-                {
-                    "title": title,
-                    "artist": artist,
-                    "track": track,
-                    "track_id": track_id,
-                    "status": "already_in_playlist",
-                }
-            )
-            continue
-        if track_id and not dry_run:
-            batch.append(track_id)
-            added_songs.append(
-                {
-                    "title": title,
-                    "artist": artist,
-                    "track": track,
-                    "track_id": track_id,
-                    "status": "added",
-                }
+    sync_state = SyncState() if incremental or snapshot_id else None
+
+    def load_membership() -> set[str]:
+        return _load_membership(sp, playlist_id, config, sync_state, snapshot_id)
+
+    # The state store is closed even if the sync fails part way
+    try:
+        # Incremental syncs only search and add videos not processed by earlier runs
+        yt_key = extract_playlist_id(yt_url)
+        video_ids: list[Optional[str]] = []
+        new_titles: Optional[Iterator[str]] = None
+        if sync_state is not None and incremental:
+            known_ids = sync_state.known_ids(yt_key, playlist_id)
+            logger.info(f"Incremental sync: {len(known_ids)} videos already processed")
+            new_titles = _iter_new_titles(
+                yt_url,
+                yt_api,
+                known_ids,
+                int(config.get("incremental_stop_after", 0)),
+                video_ids,
             )
-            if len(batch) == batch_size:
-                # Robust Spotify add with rate limit handling
-                retries = 0
-                while True:
-                    try:
-                        sp.playlist_add_items(playlist_id, batch)
-                        break
-                    except Exception as e:
-                        retry_after = None
-                        if hasattr(e, "headers") and hasattr(
-                            getattr(e, "headers"), "get"
-                        ):
-                            retry_after = getattr(e, "headers").get("Retry-After")
-                        if (
-                            hasattr(e, "http_status")
-                            and getattr(e, "http_status") == 429
-                        ):
-                            if retry_after is not None:
-                                try:
-                                    wait = max(float(retry_after), min_retry_after)
-                                except Exception:
-                                    wait = max(
-                                        batch_delay * (backoff_factor**retries),
-                                        min_retry_after,
-                                    )
-                            else:
-                                wait = max(
-                                    batch_delay * (backoff_factor**retries),
-                                    min_retry_after,
-                                )
-                            logger.warning(
-                                f"Spotify rate limit hit. Retrying after {wait:.1f}s (retry {retries+1}/{max_retries})..."
-                            )
-                            import time
-
-                            time.sleep(wait)
-                            retries += 1
-                            if retries >= max_retries:
-                                logger.error(
-                                    "Max retries reached for Spotify rate limit. Skipping batch."
-                                )
-                                break
-                        else:
-                            logger.error(f"Spotify API error: {e}")
-                            break
-                batch.clear()
-                import time
-
-                time.sleep(batch_delay)
-            added_count += 1
-    # Final batch add if there are remaining tracks
-    if batch and not dry_run:
-        retries = 0
-        while True:
-            try:
-                sp.playlist_add_items(playlist_id, batch)
-                break
-            except Exception as e:
-                retry_after = None
-                if hasattr(e, "headers") and hasattr(getattr(e, "headers"), "get"):
-                    retry_after = getattr(e, "headers").get("Retry-After")
-                if hasattr(e, "http_status") and getattr(e, "http_status") == 429:
-                    if retry_after is not None:
-                        try:
-                            wait = max(float(retry_after), min_retry_after)
-                        except Exception:
-                            wait = max(
-                                batch_delay * (backoff_factor**retries), min_retry_after
-                            )
-                    else:
-                        wait = max(
-                            batch_delay * (backoff_factor**retries), min_retry_after
-                        )
-                else:
-                    wait = max(batch_delay * (backoff_factor**retries), min_retry_after)
-                logger.warning(
-                    f"Spotify rate limit hit. Retrying after {wait:.1f}s (retry {retries+1}/{max_retries})..."
+        pipeline_mode = bool(config.get("pipeline", False))
+        if pipeline_mode:
+            # Stream YouTube pages into search and search hits into batched adds;
+            # the snapshot is saved with the membership, before the first add
+            logger.info("## Streaming Youtube Titles into Spotify search ##")
+            if new_titles is not None:
+                title_stream: Iterable[str] = new_titles
+            elif yt_api:
+                title_stream = iter_yt_playlist_titles_api(yt_api, yt_url)
+            else:
+                title_stream = iter_yt_playlist_titles_yt_dlp(yt_url)
+            with closing(track_cache_from_config(config)) as cache:
+                stages = run_pipeline(
+                    sp,
+                    playlist_id,
+                    title_stream,
+                    cache,
+                    config,
+                    dry_run=dry_run,
+                    load_membership=load_membership,
                 )
-                import time
-
-                time.sleep(wait)
-                retries += 1
-                if retries >= max_retries:
-                    logger.error(
-                        "Max retries reached for Spotify rate limit. Skipping batch."
+        else:
+            stages = _run_phases(
+                sp,
+                yt_url,
+                playlist_id,
+                yt_api,
+                config,
+                title_source=new_titles,
+                load_membership=load_membership,
+            )
+        titles = stages.titles
+        skipped_songs = stages.skipped
+        queries = stages.queries
+        search_results = stages.search_results
+        playlist_tracks = stages.playlist_tracks
+        add_stats = stages.add_stats
+
+        # Check the tracks about to be added, so delisted ones are searched again
+        # next time and relinked ones are added under their playable ID (the
+        # pipeline has already added its hits, so this only applies to phases)
+        if config.get("revalidate_before_add", False) and not pipeline_mode:
+            candidates = {
+                track_id
+                for _, _, track_id in search_results
+                if track_id and track_id not in playlist_tracks
+            }
+            if candidates:
+                with closing(track_cache_from_config(config)) as cache:
+                    playable = revalidate_track_ids(sp, cache, candidates, config)
+                search_results = [
+                    (
+                        artist,
+                        track,
+                        playable.get(track_id, track_id) if track_id else None,
                     )
-                    break
-            else:
-                batch.clear()
-                import time
+                    for artist, track, track_id in search_results
+                ]
+
+        # Build a set of track IDs already in the playlist for deduplication
+        added_count = 0
+        to_add: list[str] = []
+        added_songs = []
+        for (artist, track, query, title), (_, _, track_id) in zip(
+            queries, search_results
+        ):
+            if track_id and track_id in playlist_tracks:
+                # Already in playlist, skip adding
+                added_songs.append(
+                    {
+                        "title": title,
+                        "artist": artist,
+                        "track": track,
+                        "track_id": track_id,
+                        "status": "already_in_playlist",
+                    }
+                )
+                continue
+            if track_id and not dry_run:
+                to_add.append(track_id)
+                added_songs.append(
+                    {
+                        "title": title,
+                        "artist": artist,
+                        "track": track,
+                        "track_id": track_id,
+                        "status": "added",
+                    }
+                )
+                added_count += 1
+        # Add in adaptively sized batches (starts at the API maximum of 100);
+        # the pipeline has already added its hits while searching. Duplicate
+        # YouTube entries resolve to the same track, which is only added once.
+        if to_add and not dry_run and not pipeline_mode:
+            add_stats = add_tracks_adaptive(
+                sp, playlist_id, list(dict.fromkeys(to_add)), config
+            )
 
-                time.sleep(batch_delay)
-                break
+        if sync_state is not None:
+            # Our own adds move the snapshot_id; record them so the next run
+            # still finds the stored membership current
+            if snapshot_id and add_stats.snapshot_id and not add_stats.failed:
+                sync_state.save_membership(
+                    playlist_id,
+                    add_stats.snapshot_id,
+                    add_stats.added_ids,
+                    replace=False,
+                )
+            # Remember the videos whose track is now in the playlist; misses and
+            # private/deleted videos stay unprocessed so later runs retry them
+            if incremental and not dry_run:
+                done_ids = []
+                for row, (_, _, track_id) in zip(stages.query_rows, search_results):
+                    video_id = video_ids[row] if row < len(video_ids) else None
+                    if not track_id or not video_id:
+                        continue
+                    # A failed batch could hold any of the new tracks
+                    if track_id in playlist_tracks or not add_stats.failed:
+                        done_ids.append(video_id)
+                sync_state.mark_processed(yt_key, playlist_id, done_ids)
+    finally:
+        if sync_state is not None:
+            sync_state.close()
 
     # Helper to safely load a JSON list from file
     def safe_load_json_list(path: str) -> list[Any]:
@@ -301,8 +513,8 @@ def sync_command(
 
     # --- Collect all YouTube entries (with possible duplicates and their URLs) ---
     all_yt_entries = []
-    for idx, title in enumerate(titles):
-        artist, track = parse_artist_track(title)
+    # Titles were parsed once while building the queries
+    for title, (artist, track) in zip(titles, stages.parsed_titles):
         yt_url = ""
         # If title is a dict with 'url', use that; else, leave as empty string
         if isinstance(title, dict):
@@ -372,10 +584,13 @@ def sync_command(
     num_missing = len(not_found_on_spotify)
     logger.info(
         f"Finished.\n"
-        f"{num_added} tracks added to Spotify playlist {playlist_id}.\n"
+        f"{num_added} tracks added to Spotify playlist {playlist_id} "
+        f"in {add_stats.batches} batches.\n"
         f"{num_already} tracks were already in playlist.\n"
         f"{num_deleted_private} tracks were deleted/private on YouTube.\n"
-        f"{num_missing} tracks were missing on Spotify."
+        f"{num_missing} tracks were missing on Spotify.\n"
+        f"{stages.duplicate_queries} duplicate queries were collapsed "
+        f"({len(queries) - stages.duplicate_queries} unique searches)."
     )
 
 
@@ -417,9 +632,59 @@ def main() -> None:
     sync_parser.add_argument(
         "--config", help="Path to a TOML config file (overrides package default)"
     )
+    sync_parser.add_argument(
+        "--recheck-misses",
+        action="store_true",
+        help="Search again for titles that recently found no Spotify match",
+    )
+    sync_parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Stream YouTube titles into search and adds instead of running in phases",
+    )
+    sync_parser.add_argument(
+        "--search-candidates",
+        type=int,
+        help="Fetch this many results per search and pick the best local match",
+    )
+    sync_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only search and add videos not processed by earlier syncs of this playlist pair",
+    )
+    sync_parser.add_argument(
+        "--catalog-min-titles",
+        type=int,
+        help="Match artists with at least this many titles against their whole catalog",
+    )
+    cache_parser = subparsers.add_parser("cache", help="Maintain the track cache")
+    cache_subparsers = cache_parser.add_subparsers(dest="cache_command", required=True)
+    revalidate_parser = cache_subparsers.add_parser(
+        "revalidate",
+        help="Check cached track IDs with Spotify; drop dead ones, relink and refresh the rest",
+    )
+    revalidate_parser.add_argument(
+        "--config", help="Path to a TOML config file (overrides package default)"
+    )
+    revalidate_parser.add_argument(
+        "--market",
+        help="Market to check playability in (default: the account's market)",
+    )
     args = parser.parse_args()
     config = load_config(args.config)
-    if args.verbose:
+    if getattr(args, "catalog_min_titles", None):
+        config["catalog_min_titles"] = args.catalog_min_titles
+    if getattr(args, "market", None):
+        config["revalidate_market"] = args.market
+    if getattr(args, "incremental", False):
+        config["incremental"] = True
+    if getattr(args, "pipeline", False):
+        config["pipeline"] = True
+    if getattr(args, "recheck_misses", False):
+        config["recheck_misses"] = True
+    if getattr(args, "search_candidates", None):
+        config["search_candidates"] = args.search_candidates
+    if getattr(args, "verbose", False):
         logger.setLevel(logging.DEBUG)
     if args.command == "sync":
         sync_command(
@@ -437,6 +702,21 @@ def main() -> None:
             playlist_id=args.playlist_id,
             config=config,
         )
+    elif args.command == "cache" and args.cache_command == "revalidate":
+        cache_revalidate_command(config=config)
+
+
+def cache_revalidate_command(config: Optional[dict[str, Any]] = None) -> None:
+    """
+    Checks every cached track ID against Spotify (see revalidate_track_ids).
+    """
+    from yt2spotify.cache import track_cache_from_config
+
+    config = config or {}
+    configure_spotify_limiter(config)
+    sp = get_spotify_client()
+    with closing(track_cache_from_config(config)) as cache:
+        revalidate_track_ids(sp, cache, config=config)
 
 
 def undo_command(playlist_id: str, config: Optional[dict[str, Any]] = None) -> None:
@@ -460,5 +740,6 @@ def undo_command(playlist_id: str, config: Optional[dict[str, Any]] = None) -> N
         if "track" in item and "id" in item["track"]
     ]
     sp = get_spotify_client()
+    spotify_limiter.acquire()
     sp.playlist_replace_items(playlist_id, track_ids)
     logger.info(f"Restored playlist {playlist_id} from snapshot.")
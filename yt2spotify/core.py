@@ -1,10 +1,15 @@
+import asyncio
+import sqlite3
 import spotipy
-from typing import List, Tuple, Optional, Any
-from spotipy.oauth2 import SpotifyOAuth
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Mapping, Set, Tuple, Optional, Any, Sequence
 from yt2spotify.utils import get_spotify_credentials
-from yt2spotify.cache import TrackCache
+from yt2spotify.cache import TrackCache, TrackRecord
 from urllib.parse import quote
 from yt2spotify.logging_config import logger
+from yt2spotify.matching import JW_THRESHOLD, TOKEN_SET_THRESHOLD, best_match
+from yt2spotify.rate_limit import spotify_limiter
+from yt2spotify.spotify_session import spotify_client
 
 
 # --- YouTube helpers ---
@@ -34,18 +39,11 @@ def get_yt_playlist_titles(playlist_url: str) -> List[str]:
 def get_spotify_client() -> spotipy.Spotify:
     """
     Returns an authenticated Spotipy client for Spotify API access.
+    The client, its pooled HTTP session and its token are created once per
+    process and shared by every caller (see spotify_session).
     """
     client_id, client_secret, redirect_uri = get_spotify_credentials()
-    scope = "playlist-modify-public playlist-modify-private"
-    sp = spotipy.Spotify(
-        auth_manager=SpotifyOAuth(
-            client_id=client_id,
-            client_secret=client_secret,
-            redirect_uri=redirect_uri,
-            scope=scope,
-        )
-    )
-    return sp
+    return spotify_client(client_id, client_secret, redirect_uri)
 
 
 def sync_spotify_search(
@@ -69,6 +67,7 @@ def sync_spotify_search(
             continue
         logger.info(f"Searching for: {title} - {artist}")
         try:
+            spotify_limiter.acquire()
             response = sp.search(q=quote(query), type="track", limit=1)
             tracks = response.get("tracks") if response else None
             items = tracks.get("items", []) if tracks else []
@@ -81,14 +80,21 @@ def sync_spotify_search(
 
 
 def sync_search_with_cache(
-    sp: Any, queries: List[Tuple[str, str, str]], cache: TrackCache
+    sp: Any,
+    queries: List[Tuple[str, str, str]],
+    cache: TrackCache,
+    recheck_misses: bool = False,
+    config: Optional[Mapping[str, Any]] = None,
 ) -> List[Tuple[str, str, Optional[str]]]:
     """
     Performs Spotify search with local cache for (artist, title) to track_id.
+    Queries with a fresh cached miss are not searched again.
     Args:
         sp: Spotipy client.
         queries: List of (artist, title, query_string) tuples.
-        cache: TrackCache instance.
+        cache: TrackCache instance. Hits and misses are written back to it.
+        recheck_misses: If True, search again even if a miss is still fresh.
+        config: Configuration dictionary passed to search_track().
     Returns:
         List of (artist, title, track_id or None) tuples.
     """
@@ -97,20 +103,295 @@ def sync_search_with_cache(
     results: List[Tuple[str, str, Optional[str]]] = [
         (artist, title, None) for artist, title, _ in queries
     ]
+    cached, fresh_misses = prefetch_cache(cache, queries, recheck_misses)
     for i, (artist, title, query) in enumerate(queries):
         if not query.strip():
             logger.info(
                 f'Skipping: "{title}" - "{artist}" - in playlist - skipping (empty query)'
             )
             continue
-        cached_id = cache.get(artist, title)
+        cached_id = cached.get((artist, title))
         if cached_id:
             results[i] = (artist, title, cached_id)
-        else:
+        elif (artist, title) not in fresh_misses:
             uncached.append((artist, title, query))
             uncached_idx.append(i)
-    if uncached:
-        batch_results = sync_spotify_search(sp, uncached)
-        for (artist, title, track_id), idx in zip(batch_results, uncached_idx):
-            results[idx] = (artist, title, track_id)
+    for (artist, title, query), idx in zip(uncached, uncached_idx):
+        logger.info(f"Searching for: {title} - {artist}")
+        try:
+            record = search_track(sp, quote(query), artist, title, config)
+        except Exception as e:
+            logger.warning(f"Error searching for {title} - {artist}: {e}")
+            continue
+        results[idx] = (artist, title, record.track_id if record else None)
+        try:
+            record_search_result(cache, artist, title, record)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not cache {title} - {artist}: {e}")
+    return results
+
+
+def prefetch_cache(
+    cache: TrackCache,
+    queries: Sequence[Tuple[str, str, str]],
+    recheck_misses: bool = False,
+) -> Tuple[Dict[Tuple[str, str], str], Set[Tuple[str, str]]]:
+    """
+    Resolves the cache state of every non-empty query in bulk.
+    Args:
+        cache: TrackCache instance.
+        queries: List of (artist, title, query_string) tuples.
+        recheck_misses: If True, cached misses are ignored.
+    Returns:
+        Tuple of (cached hits keyed by (artist, title), keys with a fresh miss).
+    """
+    keys = [(artist, title) for artist, title, query in queries if query.strip()]
+    if not keys:
+        return {}, set()
+    cached = cache.get_many(keys)
+    if recheck_misses:
+        return cached, set()
+    return cached, cache.fresh_misses(key for key in keys if key not in cached)
+
+
+def record_search_result(
+    cache: TrackCache, artist: str, title: str, record: Optional[TrackRecord]
+) -> None:
+    """
+    Writes a completed search back to the cache as a hit (with the track's
+    metadata) or a miss.
+    """
+    if record:
+        cache.set_record(artist, title, record)
+    else:
+        cache.set_miss(artist, title)
+
+
+def query_key(artist: str, title: str, query: str) -> Tuple[str, str, str]:
+    """
+    Normalized key used to detect duplicate searches (case and whitespace
+    insensitive, matching how TrackCache keys entries).
+    """
+    return (
+        " ".join(artist.casefold().split()),
+        " ".join(title.casefold().split()),
+        " ".join(query.casefold().split()),
+    )
+
+
+def dedupe_queries(
+    queries: Sequence[Tuple[str, str, str]],
+) -> Tuple[List[Tuple[str, str, str]], List[int]]:
+    """
+    Collapses queries that share a normalized key.
+    Args:
+        queries: List of (artist, title, query_string) tuples.
+    Returns:
+        Tuple of (unique queries in first-seen order, and for every input
+        query the index of its unique query).
+    """
+    unique: List[Tuple[str, str, str]] = []
+    positions: List[int] = []
+    seen: dict[Tuple[str, str, str], int] = {}
+    for entry in queries:
+        key = query_key(*entry)
+        if key not in seen:
+            seen[key] = len(unique)
+            unique.append(entry)
+        positions.append(seen[key])
+    return unique, positions
+
+
+def fan_out_results(
+    queries: Sequence[Tuple[str, str, str]],
+    unique_results: Sequence[Tuple[str, str, Optional[str]]],
+    positions: Sequence[int],
+) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    Copies the results of deduplicated queries back to every occurrence.
+    Returns:
+        List of (artist, title, track_id or None) tuples aligned with queries.
+    """
+    return [
+        (artist, title, unique_results[pos][2])
+        for (artist, title, _), pos in zip(queries, positions)
+    ]
+
+
+def search_track(
+    sp: Any,
+    query: str,
+    artist: str = "",
+    title: str = "",
+    config: Optional[Mapping[str, Any]] = None,
+) -> Optional[TrackRecord]:
+    """
+    Runs a single Spotify track search.
+    With ``search_candidates`` > 1 in config, that many results are fetched in
+    the same request and ranked locally against artist/title; the best one
+    passing jw_threshold or token_set_threshold wins. Otherwise the first
+    result is taken as is.
+    Args:
+        sp: Spotipy client.
+        query: Search query string.
+        artist: Searched artist, used for ranking candidates.
+        title: Searched title, used for ranking candidates.
+        config: Configuration dictionary (search_candidates, jw_threshold,
+            token_set_threshold).
+    Returns:
+        TrackRecord of the chosen result, or None if nothing was found or no
+        candidate matched well enough.
+    """
+    candidates = _search_candidates(config)
+    spotify_limiter.acquire()
+    response = sp.search(q=query, type="track", limit=candidates)
+    return _pick_track(response, artist, title, candidates, config)
+
+
+async def search_track_async(
+    async_sp: Any,
+    query: str,
+    artist: str = "",
+    title: str = "",
+    config: Optional[Mapping[str, Any]] = None,
+) -> Optional[TrackRecord]:
+    """
+    Like search_track(), but searches with an AsyncSpotify client (see
+    spotify_async), which waits for the shared limiter without blocking.
+    """
+    candidates = _search_candidates(config)
+    response = await async_sp.search(q=query, type="track", limit=candidates)
+    return _pick_track(response, artist, title, candidates, config)
+
+
+def _search_candidates(config: Optional[Mapping[str, Any]]) -> int:
+    return max(1, min(50, int((config or {}).get("search_candidates", 1))))
+
+
+def _pick_track(
+    response: Optional[Mapping[str, Any]],
+    artist: str,
+    title: str,
+    candidates: int,
+    config: Optional[Mapping[str, Any]],
+) -> Optional[TrackRecord]:
+    """
+    Chooses the track a search response resolves to (see search_track()).
+    """
+    config = config or {}
+    tracks = (response or {}).get("tracks") or {}
+    items = [item for item in tracks.get("items") or [] if item and item.get("id")]
+    if not items:
+        return None
+    if candidates == 1:
+        return TrackRecord.from_spotify(items[0])
+    record = best_match(
+        artist,
+        title,
+        [TrackRecord.from_spotify(item) for item in items],
+        jw_threshold=float(config.get("jw_threshold", JW_THRESHOLD)),
+        token_set_threshold=float(
+            config.get("token_set_threshold", TOKEN_SET_THRESHOLD)
+        ),
+    )
+    if record is None:
+        logger.debug(
+            f"No reasonable match among {len(items)} candidates for {title} - {artist}"
+        )
+    return record
+
+
+def search_track_id(
+    sp: Any,
+    query: str,
+    artist: str = "",
+    title: str = "",
+    config: Optional[Mapping[str, Any]] = None,
+) -> Optional[str]:
+    """
+    Like search_track(), but returns only the track_id.
+    """
+    record = search_track(sp, query, artist, title, config)
+    return record.track_id if record else None
+
+
+async def async_search_with_cache(
+    sp: Any,
+    queries: Sequence[Tuple[str, str, str]],
+    cache: TrackCache,
+    concurrency: int = 8,
+    recheck_misses: bool = False,
+    config: Optional[Mapping[str, Any]] = None,
+    async_sp: Optional[Any] = None,
+) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    Performs concurrent Spotify searches with local cache for (artist, title) to track_id.
+    Cached hits and fresh cached misses are resolved without a request; the
+    remaining queries are searched with at most ``concurrency`` requests in
+    flight: on the event loop with async_sp if given, otherwise with the
+    spotipy client on a thread pool.
+    Args:
+        sp: Spotipy client.
+        queries: List of (artist, title, query_string) tuples.
+        cache: TrackCache instance. Hits and misses are written back to it.
+        concurrency: Maximum number of concurrent Spotify searches.
+        recheck_misses: If True, search again even if a miss is still fresh.
+        config: Configuration dictionary passed to search_track().
+        async_sp: AsyncSpotify client (see spotify_async); replaces sp and
+            the thread pool for searching.
+    Returns:
+        List of (artist, title, track_id or None) tuples, in input order.
+    """
+    results: List[Tuple[str, str, Optional[str]]] = [
+        (artist, title, None) for artist, title, _ in queries
+    ]
+    pending: List[Tuple[int, str, str, str]] = []
+    cached, fresh_misses = prefetch_cache(cache, queries, recheck_misses)
+    for i, (artist, title, query) in enumerate(queries):
+        if not query.strip():
+            logger.info(
+                f'Skipping: "{title}" - "{artist}" - in playlist - skipping (empty query)'
+            )
+            continue
+        cached_id = cached.get((artist, title))
+        if cached_id:
+            results[i] = (artist, title, cached_id)
+        elif (artist, title) not in fresh_misses:
+            pending.append((i, artist, title, query))
+    if not pending:
+        return results
+
+    loop = asyncio.get_running_loop()
+    executor: Optional[ThreadPoolExecutor] = None
+    in_flight = asyncio.Semaphore(max(1, concurrency))
+    if async_sp is None:
+        executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+
+    async def search(artist: str, title: str, query: str) -> Optional[TrackRecord]:
+        if executor is not None:
+            return await loop.run_in_executor(
+                executor, search_track, sp, query, artist, title, config
+            )
+        async with in_flight:
+            return await search_track_async(async_sp, query, artist, title, config)
+
+    async def resolve(i: int, artist: str, title: str, query: str) -> None:
+        logger.debug(f"Searching for: {title} - {artist}")
+        try:
+            record = await search(artist, title, query)
+        except Exception as e:
+            logger.warning(f"Error searching for {title} - {artist}: {e}")
+            return
+        results[i] = (artist, title, record.track_id if record else None)
+        try:
+            record_search_result(cache, artist, title, record)
+        except sqlite3.Error as e:
+            # A locked cache file only costs the cache entry, not the result
+            logger.warning(f"Could not cache {title} - {artist}: {e}")
+
+    try:
+        await asyncio.gather(*(resolve(*entry) for entry in pending))
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
     return results
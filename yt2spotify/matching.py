@@ -1,8 +1,11 @@
 from difflib import SequenceMatcher
-from typing import Optional, Callable, Any
+from typing import Optional, Callable, Any, List, Sequence, Tuple
+from yt2spotify.cache import TrackRecord
 
 token_set_ratio: Optional[Callable[[str, str], float]]
 JaroWinkler: Optional[Any]
+cdist: Optional[Callable[..., Any]]
+np: Optional[Any]
 
 try:
     from rapidfuzz.fuzz import token_set_ratio as _token_set_ratio
@@ -18,7 +21,83 @@ try:
 except ImportError:
     JaroWinkler = None
 
-__all__ = ["is_reasonable_match"]
+try:
+    # cdist returns numpy arrays, so it is only usable with numpy installed
+    import numpy as _np
+    from rapidfuzz.process import cdist as _cdist
+
+    np = _np
+    cdist = _cdist
+except ImportError:
+    np = None
+    cdist = None
+
+__all__ = [
+    "is_reasonable_match",
+    "is_reasonable_record",
+    "match_scores",
+    "best_match",
+    "match_many",
+]
+
+# Defaults for the jw_threshold and token_set_threshold config options
+JW_THRESHOLD = 0.90
+TOKEN_SET_THRESHOLD = 95.0
+
+# Searched rows scored per cdist call in match_many; bounds the score
+# matrices to MATCH_CHUNK x len(candidates)
+MATCH_CHUNK = 1024
+
+
+def _normalize(text: Optional[str]) -> str:
+    return (text or "").lower().strip()
+
+
+def _artist_matches(searched_artist: str, found_artist: str) -> bool:
+    return all(word in found_artist for word in searched_artist.split() if word)
+
+
+def _title_scores(searched_title: str, found_title: str) -> Tuple[float, float]:
+    jw_score = 0.0
+    tsr_score = 0.0
+    if JaroWinkler:
+        jw_score = JaroWinkler.normalized_similarity(searched_title, found_title)
+    else:
+        jw_score = SequenceMatcher(None, searched_title, found_title).ratio()
+    if token_set_ratio is not None:
+        tsr_score = token_set_ratio(searched_title, found_title)
+    else:
+        searched_set = set(searched_title.split())
+        found_set = set(found_title.split())
+        if searched_set:
+            tsr_score = 100 * len(searched_set & found_set) / len(searched_set)
+        else:
+            tsr_score = 0.0
+    return jw_score, tsr_score
+
+
+def match_scores(
+    searched_artist: Optional[str],
+    searched_title: Optional[str],
+    found_artist: Optional[str],
+    found_title: Optional[str],
+) -> Optional[Tuple[float, float]]:
+    """
+    Scores a found track against a searched artist/title.
+
+    Args:
+        searched_artist: The artist being searched for.
+        searched_title: The title being searched for.
+        found_artist: The artist found in the result.
+        found_title: The title found in the result.
+
+    Returns:
+        (JaroWinkler similarity 0-1, token set ratio 0-100), or None if the
+        artist does not match.
+    """
+    if not _artist_matches(_normalize(searched_artist), _normalize(found_artist)):
+        return None
+    return _title_scores(_normalize(searched_title), _normalize(found_title))
 
 
 def is_reasonable_match(
@@ -26,6 +105,8 @@ def is_reasonable_match(
     searched_title: Optional[str],
     found_artist: Optional[str],
     found_title: Optional[str],
+    jw_threshold: float = JW_THRESHOLD,
+    token_set_threshold: float = TOKEN_SET_THRESHOLD,
 ) -> bool:
     """
     Determines if a found track is a reasonable match for a searched artist/title.
@@ -35,30 +116,221 @@ def is_reasonable_match(
         searched_title: The title being searched for.
         found_artist: The artist found in the result.
         found_title: The title found in the result.
+        jw_threshold: Minimum JaroWinkler similarity (0-1).
+        token_set_threshold: Minimum token set ratio (0-100).
 
     Returns:
         True if the match is reasonable, False otherwise.
     """
-    searched_artist = (searched_artist or "").lower().strip()
-    searched_title = (searched_title or "").lower().strip()
-    found_artist = (found_artist or "").lower().strip()
-    found_title = (found_title or "").lower().strip()
-    artist_match = all(word in found_artist for word in searched_artist.split() if word)
-    if not artist_match:
+    scores = match_scores(searched_artist, searched_title, found_artist, found_title)
+    if scores is None:
         return False
-    jw_score = 0.0
-    tsr_score = 0.0
-    if JaroWinkler:
-        jw_score = JaroWinkler.normalized_similarity(searched_title, found_title)
-    else:
-        jw_score = SequenceMatcher(None, searched_title, found_title).ratio()
-    if token_set_ratio is not None:
-        tsr_score = token_set_ratio(searched_title, found_title)
-    else:
-        searched_set = set(searched_title.split())
-        found_set = set(found_title.split())
-        if searched_set:
-            tsr_score = 100 * len(searched_set & found_set) / len(searched_set)
+    jw_score, tsr_score = scores
+    return (jw_score >= jw_threshold) or (tsr_score >= token_set_threshold)
+
+
+def best_match(
+    searched_artist: Optional[str],
+    searched_title: Optional[str],
+    records: Sequence[TrackRecord],
+    jw_threshold: float = JW_THRESHOLD,
+    token_set_threshold: float = TOKEN_SET_THRESHOLD,
+) -> Optional[TrackRecord]:
+    """
+    Picks the best-scoring reasonable match among search candidates.
+
+    Args:
+        searched_artist: The artist being searched for.
+        searched_title: The title being searched for.
+        records: Candidate tracks, in Spotify's ranking order.
+        jw_threshold: Minimum JaroWinkler similarity (0-1).
+        token_set_threshold: Minimum token set ratio (0-100).
+
+    Returns:
+        The candidate picked by match_many(), or None if none passes.
+    """
+    if not records:
+        return None
+    indices, _ = match_many(
+        [searched_artist or ""],
+        [searched_title or ""],
+        [record.artist for record in records],
+        [record.name for record in records],
+        jw_threshold=jw_threshold,
+        token_set_threshold=token_set_threshold,
+    )
+    return records[indices[0]] if indices[0] >= 0 else None
+
+
+def _best_rows_python(
+    searched_artists: List[str],
+    searched_titles: List[str],
+    candidate_artists: List[str],
+    candidate_titles: List[str],
+    jw_threshold: float,
+    token_set_threshold: float,
+) -> Tuple[List[int], List[float]]:
+    """
+    match_many() for one chunk, scoring every pair in Python.
+    """
+    best_indices: List[int] = []
+    best_scores: List[float] = []
+    for searched_artist, searched in zip(searched_artists, searched_titles):
+        passing = sorted(
+            (-(jw + tsr / 100), j)
+            for j, (jw, tsr) in enumerate(
+                _title_scores(searched, found) for found in candidate_titles
+            )
+            if jw >= jw_threshold or tsr >= token_set_threshold
+        )
+        for neg_score, j in passing:
+            if _artist_matches(searched_artist, candidate_artists[j]):
+                best_indices.append(j)
+                best_scores.append(-neg_score)
+                break
         else:
-            tsr_score = 0.0
-    return (jw_score >= 0.90) or (tsr_score >= 95)
+            best_indices.append(-1)
+            best_scores.append(0.0)
+    return best_indices, best_scores
+
+
+def _best_rows(
+    searched_artists: List[str],
+    searched_titles: List[str],
+    candidate_artists: List[str],
+    candidate_titles: List[str],
+    jw_threshold: float,
+    token_set_threshold: float,
+    workers: int,
+) -> Tuple[List[int], List[float]]:
+    """
+    match_many() for one chunk. Scores, thresholds and the best candidate are
+    computed on numpy arrays; only the artist check of the best passing
+    candidates runs in Python.
+    """
+    if cdist is None or np is None or JaroWinkler is None or token_set_ratio is None:
+        return _best_rows_python(
+            searched_artists,
+            searched_titles,
+            candidate_artists,
+            candidate_titles,
+            jw_threshold,
+            token_set_threshold,
+        )
+    jw = cdist(
+        searched_titles,
+        candidate_titles,
+        scorer=JaroWinkler.normalized_similarity,
+        dtype=np.float64,
+        workers=workers,
+    )
+    tsr = cdist(
+        searched_titles,
+        candidate_titles,
+        scorer=token_set_ratio,
+        dtype=np.float64,
+        workers=workers,
+    )
+    # Token set ratio alone ties "Song" with "Song (Remix)"; adding the
+    # JaroWinkler similarity favours the closer title
+    combined = np.where(
+        (jw >= jw_threshold) | (tsr >= token_set_threshold), jw + tsr / 100, -np.inf
+    )
+    best = combined.argmax(axis=1)
+    best_indices: List[int] = []
+    best_scores: List[float] = []
+    for searched_artist, row, j in zip(searched_artists, combined, best.tolist()):
+        # Walk down the passing candidates until one has the right artist
+        while row[j] > -np.inf and not _artist_matches(
+            searched_artist, candidate_artists[j]
+        ):
+            row[j] = -np.inf
+            j = int(row.argmax())
+        if row[j] > -np.inf:
+            best_indices.append(j)
+            best_scores.append(float(row[j]))
+        else:
+            best_indices.append(-1)
+            best_scores.append(0.0)
+    return best_indices, best_scores
+
+
+def match_many(
+    searched_artists: Sequence[Optional[str]],
+    searched_titles: Sequence[Optional[str]],
+    candidate_artists: Sequence[Optional[str]],
+    candidate_titles: Sequence[Optional[str]],
+    jw_threshold: float = JW_THRESHOLD,
+    token_set_threshold: float = TOKEN_SET_THRESHOLD,
+    workers: int = 1,
+) -> Tuple[List[int], List[float]]:
+    """
+    Finds the best reasonable candidate for every searched artist/title.
+
+    Strings are normalized once, and the JaroWinkler and token set ratio
+    matrices are computed with rapidfuzz's cdist (``workers`` threads; -1
+    uses all cores) in chunks of MATCH_CHUNK searched rows. Thresholds and
+    the best candidate are then picked with numpy array operations. Without
+    rapidfuzz or numpy every pair is scored in Python instead. The artist
+    check is only run for pairs whose title passes a threshold, best first.
+
+    Args:
+        searched_artists: Artists being searched for.
+        searched_titles: Titles being searched for, aligned with searched_artists.
+        candidate_artists: Artists of the candidate tracks.
+        candidate_titles: Titles of the candidate tracks, aligned with
+            candidate_artists.
+        jw_threshold: Minimum JaroWinkler similarity (0-1).
+        token_set_threshold: Minimum token set ratio (0-100).
+        workers: Threads used by cdist.
+
+    Returns:
+        Tuple of (best candidate index per searched row, -1 if none passes;
+        its combined score, JaroWinkler + token set ratio / 100, 0.0 if none).
+    """
+    if not candidate_titles:
+        return [-1] * len(searched_titles), [0.0] * len(searched_titles)
+    s_artists = [_normalize(a) for a in searched_artists]
+    s_titles = [_normalize(t) for t in searched_titles]
+    c_artists = [_normalize(a) for a in candidate_artists]
+    c_titles = [_normalize(t) for t in candidate_titles]
+    best_indices: List[int] = []
+    best_scores: List[float] = []
+    for start in range(0, len(s_titles), MATCH_CHUNK):
+        indices, scores = _best_rows(
+            s_artists[start : start + MATCH_CHUNK],
+            s_titles[start : start + MATCH_CHUNK],
+            c_artists,
+            c_titles,
+            jw_threshold,
+            token_set_threshold,
+            workers,
+        )
+        best_indices.extend(indices)
+        best_scores.extend(scores)
+    return best_indices, best_scores
+
+
+def is_reasonable_record(
+    searched_artist: Optional[str],
+    searched_title: Optional[str],
+    record: TrackRecord,
+) -> bool:
+    """
+    Re-scores a cached TrackRecord against the searched artist/title without
+    calling Spotify.
+
+    Args:
+        searched_artist: The artist being searched for.
+        searched_title: The title being searched for.
+        record: Cached track with metadata.
+
+    Returns:
+        True if the match is reasonable, False otherwise (including records
+        cached without metadata).
+    """
+    if not record.name:
+        return False
+    return is_reasonable_match(
+        searched_artist, searched_title, record.artist, record.name
+    )
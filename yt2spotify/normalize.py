@@ -0,0 +1,168 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Pattern, Tuple
+
+# Distinct raw titles remembered per function; big playlists repeat titles
+# (reuploads, duplicates) and the same titles come back on every sync
+MEMO_SIZE = 65536
+
+# Unicode dashes and bullets; ASCII titles cannot contain any of them
+_UNICODE_DASHES = "–—−•·‧‐‑‒―"
+
+_CLEAN_DASHES = re.compile(f"[{_UNICODE_DASHES}]")
+_BRACKETED = re.compile(r"\[.*?\]")
+_PARENTHESIZED = re.compile(r"\(.*?\)")
+_CLEAN_NOISE = re.compile(
+    r"(?i)\b(prod\.|ft\.|feat\.|official|audio|video|unreleased|music|visualizer|by|with|remix|version|explicit|clean|lyrics|lyric|clip|HD|HQ|\d{4})\b"
+)
+_HYPHEN_UNDERSCORE = re.compile(r"[-_]")
+_WHITESPACE = re.compile(r"\s+")
+
+_FEAT_BRACKETS = re.compile(r"\[(feat\.|ft\.|featuring)[^\]]*\]", re.IGNORECASE)
+_FEAT_PARENS = re.compile(r"\((feat\.|ft\.|featuring)[^\)]*\)", re.IGNORECASE)
+_SEPARATORS = re.compile(f"[{_UNICODE_DASHES}\\|/]+")
+_ASCII_SEPARATORS = re.compile(r"[\|/]+")
+_DASH_RUN = re.compile(r"\s*-+\s*")
+_TRAILING_INFO = re.compile(
+    r"(?i)\b(live|remaster(ed)?( \d{2,4})?|lyrics?|audio|video|version|explicit|clean|visualizer|clip|HD|HQ)\b.*$"
+)
+_FEAT_SPLIT = re.compile(r"(?i)\b(feat\.|ft\.|featuring)\b")
+_TRAILING_DASHES = re.compile(r"[-\s]+$")
+_TRAILING_FEAT = re.compile(r"(?i)(\s*(ft\.|feat\.|featuring)\s*.*)$")
+_TRAILING_BRACKETS = re.compile(r"(\s*[\[(][^\])\]]*[\])\]]\s*)+$")
+_UNMATCHED_OPENERS = re.compile(r"[\[(]+$")
+
+
+def fold(title: str) -> str:
+    """
+    NFKC-normalizes and casefolds a title. ASCII titles skip the Unicode
+    normalization, which cannot change them.
+    """
+    if title.isascii():
+        return title.lower()
+    return unicodedata.normalize("NFKC", title).casefold()
+
+
+def _clean_folded(title: str) -> str:
+    if not title.isascii():
+        title = _CLEAN_DASHES.sub(" ", title)
+    title = _BRACKETED.sub("", title)
+    title = _PARENTHESIZED.sub("", title)
+    title = _CLEAN_NOISE.sub("", title)
+    title = _HYPHEN_UNDERSCORE.sub(" ", title)
+    title = _WHITESPACE.sub(" ", title)
+    return title.strip()
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def clean_title(title: str) -> str:
+    """
+    Cleans and normalizes a track title for matching/searching.
+    Args:
+        title: The original title string.
+    Returns:
+        A cleaned, normalized title string.
+    """
+    return _clean_folded(fold(title))
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def parse_artist_track(title: str) -> Tuple[Optional[str], str]:
+    """
+    Attempts to parse an artist and track from a title string.
+    Args:
+        title: The original title string.
+    Returns:
+        Tuple of (artist, track). Artist may be None if not found.
+    """
+    title = fold(title)
+    # Remove feat/ft in brackets
+    title = _FEAT_BRACKETS.sub("", title)
+    title = _FEAT_PARENS.sub("", title)
+    # Replace all dash-like characters (and | or /) with a dash
+    separators = _ASCII_SEPARATORS if title.isascii() else _SEPARATORS
+    title = separators.sub(" - ", title)
+    title = _DASH_RUN.sub(" - ", title)
+    title = _WHITESPACE.sub(" ", title)
+    title = _TRAILING_INFO.sub("", title).strip()
+    if " - " in title:
+        artist, track = title.split(" - ", 1)
+        # Remove feat/ft from artist and track
+        artist = _FEAT_SPLIT.split(artist)[0].strip()
+        track = _FEAT_SPLIT.split(track)[0].strip()
+        # Remove trailing dashes and spaces
+        track = _TRAILING_DASHES.sub("", track).strip()
+        # Remove trailing 'ft.', 'feat.', etc. from the end of the track
+        track = _TRAILING_FEAT.sub("", track).strip()
+        # Remove trailing parenthesis/brackets and their contents from the end of the track
+        track = _TRAILING_BRACKETS.sub("", track).strip()
+        # Remove any unmatched trailing parenthesis or brackets left after previous removals
+        track = _UNMATCHED_OPENERS.sub("", track).strip()
+        return artist, track
+    # Already folded, so only the cleaning steps are left
+    return None, _clean_folded(title)
+
+
+def clear_memo() -> None:
+    """
+    Empties the clean_title and parse_artist_track memo caches.
+    """
+    clean_title.cache_clear()
+    parse_artist_track.cache_clear()
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """
+    Builds an alternation that shares common prefixes (a trie), so matching
+    cost depends on the text rather than on the number of words.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [
+            re.escape(char) + build(node[char]) for char in sorted(node) if char
+        ]
+        if not branches:
+            return ""
+        ends_here = "" in node
+        if len(branches) == 1 and not ends_here:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if ends_here else group
+
+    return build(trie)
+
+
+@lru_cache(maxsize=32)
+def _compile_stop_words(words: Tuple[str, ...]) -> Optional[Pattern[str]]:
+    if not words:
+        return None
+    # Lookarounds instead of \b so entries ending in punctuation ("ft.") match
+    return re.compile(rf"(?<!\w){_trie_regex(words)}(?!\w)", re.IGNORECASE)
+
+
+def compile_stop_words(words: Iterable[str]) -> Optional[Pattern[str]]:
+    """
+    Compiles stop words into one case-insensitive, whole-word regex.
+    Args:
+        words: Stop words or phrases (e.g. the stop_words config option).
+    Returns:
+        The compiled pattern (cached per word list), or None for no words.
+    """
+    folded = {fold(word).strip() for word in words}
+    return _compile_stop_words(tuple(sorted(word for word in folded if word)))
+
+
+def strip_stop_words(text: str, pattern: Optional[Pattern[str]]) -> str:
+    """
+    Removes whole-word stop words from text and collapses the whitespace.
+    """
+    if pattern is None:
+        return text
+    return _WHITESPACE.sub(" ", pattern.sub("", text)).strip()
@@ -0,0 +1,202 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+)
+from yt2spotify.core import query_key, record_search_result, search_track
+from yt2spotify.logging_config import logger
+from yt2spotify.playlist import (
+    PAGE_WORKERS,
+    AddStats,
+    add_tracks_adaptive,
+    fetch_playlist_track_ids,
+)
+from yt2spotify.utils import (
+    build_search_query,
+    compile_stop_words,
+    is_unavailable_title,
+    parse_artist_track,
+)
+
+# Marks the end of a stage's input queue
+_DONE = object()
+
+
+@dataclass
+class PipelineResult:
+    """
+    Everything a pipelined sync produced, in YouTube playlist order.
+    """
+
+    titles: List[str] = field(default_factory=list)
+    parsed_titles: List[Tuple[Optional[str], str]] = field(default_factory=list)
+    skipped: List[Dict[str, Any]] = field(default_factory=list)
+    queries: List[Tuple[str, str, str, str]] = field(default_factory=list)
+    # Index into titles of the video each query was built from
+    query_rows: List[int] = field(default_factory=list)
+    search_results: List[Tuple[str, str, Optional[str]]] = field(default_factory=list)
+    playlist_tracks: Set[str] = field(default_factory=set)
+    add_stats: AddStats = field(default_factory=AddStats)
+    duplicate_queries: int = 0
+
+
+def run_pipeline(
+    sp: Any,
+    playlist_id: str,
+    titles: Iterable[str],
+    cache: Any,
+    config: Optional[Mapping[str, Any]] = None,
+    dry_run: bool = False,
+    load_membership: Optional[Callable[[], Set[str]]] = None,
+) -> PipelineResult:
+    """
+    Streams YouTube titles through parse -> search -> add with bounded queues.
+
+    Titles are parsed as they arrive from ``titles`` (typically a lazy
+    YouTube iterator) and handed to ``search_concurrency`` search workers.
+    Duplicate queries are searched once and their result is shared.
+    Found tracks that are not yet in the playlist are queued for the
+    adaptive add stage, which starts as soon as playlist membership has been
+    fetched (concurrently with everything else).
+    Args:
+        sp: Spotipy client.
+        playlist_id: Target Spotify playlist ID.
+        titles: YouTube video titles, possibly a lazy iterator.
+        cache: TrackCache instance.
+        config: Configuration dictionary (search_concurrency,
+            pipeline_queue_size, playlist_page_workers, recheck_misses,
+            stop_words, the search_track() options and the add stage options).
+        dry_run: If True, nothing is added to the playlist.
+        load_membership: Returns the playlist's track IDs (e.g. from the stored
+            membership); defaults to fetch_playlist_track_ids.
+    Returns:
+        PipelineResult with parsed queries and search results in input order.
+    """
+    config = config or {}
+    workers = max(1, int(config.get("search_concurrency", 8)))
+    queue_size = max(1, int(config.get("pipeline_queue_size", 256)))
+    recheck_misses = bool(config.get("recheck_misses", False))
+    stop_words = compile_stop_words(config.get("stop_words", []))
+    search_q: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+    add_q: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+    result = PipelineResult()
+    found: Dict[int, Optional[str]] = {}
+    # Duplicate queries are searched once; aliases point at the first one
+    first_by_key: Dict[Tuple[str, str, str], int] = {}
+    aliases: Dict[int, int] = {}
+
+    def search_worker() -> None:
+        while True:
+            item = search_q.get()
+            if item is _DONE:
+                return
+            idx, artist, track, query = item
+            track_id: Optional[str] = None
+            try:
+                track_id = cache.get(artist, track)
+                if not track_id and (
+                    recheck_misses or not cache.is_fresh_miss(artist, track)
+                ):
+                    record = search_track(sp, query, artist, track, config)
+                    track_id = record.track_id if record else None
+                    record_search_result(cache, artist, track, record)
+            except Exception as e:
+                logger.warning(f"Error searching for {track} - {artist}: {e}")
+            found[idx] = track_id
+            if track_id and not dry_run:
+                add_q.put(track_id)
+
+    def drain_add_queue() -> Iterator[str]:
+        while True:
+            item = add_q.get()
+            if item is _DONE:
+                return
+            yield item
+
+    def add_stage() -> AddStats:
+        try:
+            membership = membership_future.result()
+        except Exception:
+            # Keep the upstream stages moving so the error can surface
+            for _ in drain_add_queue():
+                pass
+            raise
+        # Several titles (reuploads, lyric videos) can resolve to one track
+        seen = set(membership)
+
+        def new_tracks() -> Iterator[str]:
+            for tid in drain_add_queue():
+                if tid not in seen:
+                    seen.add(tid)
+                    yield tid
+
+        return add_tracks_adaptive(sp, playlist_id, new_tracks(), config)
+
+    with ThreadPoolExecutor(max_workers=workers + 2) as pool:
+        if load_membership is not None:
+            membership_future = pool.submit(load_membership)
+        else:
+            membership_future = pool.submit(
+                fetch_playlist_track_ids,
+                sp,
+                playlist_id,
+                int(config.get("playlist_page_workers", PAGE_WORKERS)),
+            )
+        worker_futures = [pool.submit(search_worker) for _ in range(workers)]
+        add_future = pool.submit(add_stage)
+        try:
+            for title in titles:
+                result.titles.append(title)
+                artist, track = parse_artist_track(title)
+                result.parsed_titles.append((artist, track))
+                if is_unavailable_title(title, artist, track):
+                    result.skipped.append(
+                        {
+                            "title": title,
+                            "artist": artist,
+                            "track": track,
+                            "status": "private_or_deleted",
+                        }
+                    )
+                    continue
+                query = build_search_query(title, artist, track, stop_words)
+                idx = len(result.queries)
+                result.queries.append((artist or "", track or "", query, title))
+                result.query_rows.append(len(result.titles) - 1)
+                if not query:
+                    logger.info(
+                        f'Skipping: "{track}" - "{artist}" - in playlist - skipping (empty query)'
+                    )
+                    found[idx] = None
+                    continue
+                key = query_key(artist or "", track or "", query)
+                if key in first_by_key:
+                    aliases[idx] = first_by_key[key]
+                    continue
+                first_by_key[key] = idx
+                search_q.put((idx, artist or "", track or "", query))
+        finally:
+            for _ in worker_futures:
+                search_q.put(_DONE)
+            for future in worker_futures:
+                future.result()
+            add_q.put(_DONE)
+        result.playlist_tracks = membership_future.result()
+        result.add_stats = add_future.result()
+
+    result.duplicate_queries = len(aliases)
+    result.search_results = [
+        (artist, track, found.get(aliases.get(idx, idx)))
+        for idx, (artist, track, _, _) in enumerate(result.queries)
+    ]
+    return result
@@ -0,0 +1,316 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set
+from yt2spotify.logging_config import logger
+from yt2spotify.rate_limit import spotify_limiter
+from yt2spotify.sync_state import SyncState
+
+# Spotify accepts at most 100 URIs per playlist_add_items call
+SPOTIFY_MAX_BATCH = 100
+# Playlist pages requested concurrently once the first page gives the total
+PAGE_WORKERS = 4
+# Only what the membership index and the undo snapshot use; full track objects
+# (albums, images, markets) are several times larger
+PLAYLIST_ITEM_FIELDS = (
+    "items(track(id,uri,name,artists(name),external_ids)),next,total,limit"
+)
+
+
+@dataclass
+class AddStats:
+    """
+    Outcome of an add stage run.
+    """
+
+    added: int = 0
+    failed: int = 0
+    batches: int = 0
+    rate_limited: int = 0
+    final_batch_size: int = 0
+    # Track IDs/URIs that went in, and the playlist snapshot_id after the last add
+    added_ids: List[str] = field(default_factory=list)
+    snapshot_id: Optional[str] = None
+
+
+def get_retry_after(e: Exception) -> Optional[float]:
+    """
+    Extracts the Retry-After value (seconds) from a Spotify exception, if any.
+    """
+    headers = getattr(e, "headers", None)
+    if headers is None or not hasattr(headers, "get"):
+        return None
+    value = headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rate_limited(e: Exception) -> bool:
+    """
+    True if the exception is an HTTP 429 from the Spotify API.
+    """
+    return getattr(e, "http_status", None) == 429
+
+
+class AdaptiveBatcher:
+    """
+    Chooses batch size and spacing for playlist adds from observed 429s.
+
+    Starts at ``max_size`` with no extra spacing. A 429 halves the batch size
+    and grows the spacing (at least to the Retry-After value); every
+    ``grow_after`` clean batches double the size again and halve the spacing.
+    """
+
+    def __init__(
+        self,
+        max_size: int = SPOTIFY_MAX_BATCH,
+        min_size: int = 10,
+        base_delay: float = 2.0,
+        backoff_factor: float = 2.0,
+        grow_after: int = 2,
+    ) -> None:
+        self.max_size = max(1, min(max_size, SPOTIFY_MAX_BATCH))
+        self.min_size = max(1, min(min_size, self.max_size))
+        self.base_delay = base_delay
+        self.backoff_factor = backoff_factor
+        self.grow_after = grow_after
+        self.size = self.max_size
+        self.spacing = 0.0
+        self._clean_batches = 0
+
+    def on_success(self) -> None:
+        self._clean_batches += 1
+        self.spacing = self.spacing / 2 if self.spacing > 0.05 else 0.0
+        if self._clean_batches >= self.grow_after and self.size < self.max_size:
+            self.size = min(self.max_size, self.size * 2)
+            self._clean_batches = 0
+
+    def on_rate_limited(self, retry_after: Optional[float]) -> None:
+        self._clean_batches = 0
+        self.size = max(self.min_size, self.size // 2)
+        self.spacing = max(
+            self.spacing * self.backoff_factor, self.base_delay, retry_after or 0.0
+        )
+
+
+def fetch_playlist_items(
+    sp: Any,
+    playlist_id: str,
+    workers: int = PAGE_WORKERS,
+    fields: str = PLAYLIST_ITEM_FIELDS,
+) -> List[Dict[str, Any]]:
+    """
+    Fetches every item of a Spotify playlist, in playlist order.
+
+    The first page gives the playlist's ``total``; the remaining pages are
+    then requested concurrently by offset (each one through the shared rate
+    limiter) and reassembled in order. Responses without ``total``, or whose
+    ``total`` leaves no pages although ``next`` is set, are paged serially
+    through ``next``.
+    Args:
+        sp: Spotipy client.
+        playlist_id: Spotify playlist ID.
+        workers: Most page requests in flight at once; 1 pages serially.
+        fields: Spotify fields filter for each page.
+    Returns:
+        List of playlist item dicts.
+    """
+    spotify_limiter.acquire()
+    first = sp.playlist_tracks(playlist_id, fields=fields)
+    items: List[Dict[str, Any]] = list(first.get("items", []))
+    if not first.get("next"):
+        return items
+    total = first.get("total")
+    limit = first.get("limit") or len(items)
+    # A stale total can leave no offsets although next is set
+    offsets = (
+        range(len(items), total, limit) if isinstance(total, int) and limit else []
+    )
+    if workers <= 1 or not offsets:
+        results = first
+        while results.get("next"):
+            spotify_limiter.acquire()
+            results = sp.next(results)
+            items.extend(results.get("items", []))
+        return items
+
+    def fetch_page(offset: int) -> List[Dict[str, Any]]:
+        spotify_limiter.acquire()
+        page = sp.playlist_tracks(
+            playlist_id, fields=fields, limit=limit, offset=offset
+        )
+        return list(page.get("items", []))
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(offsets))) as pool:
+        for page_items in pool.map(fetch_page, offsets):
+            items.extend(page_items)
+    return items
+
+
+def playlist_track_ids(items: Iterable[Mapping[str, Any]]) -> Set[str]:
+    """
+    Collects the track IDs of playlist items (local files and removed tracks
+    are ignored).
+    """
+    track_ids: Set[str] = set()
+    for item in items:
+        track = item.get("track")
+        if track and track.get("id"):
+            track_ids.add(track["id"])
+    return track_ids
+
+
+def fetch_playlist_track_ids(
+    sp: Any, playlist_id: str, workers: int = PAGE_WORKERS
+) -> Set[str]:
+    """
+    Collects the IDs of all tracks currently in a Spotify playlist.
+    Args:
+        sp: Spotipy client.
+        playlist_id: Spotify playlist ID.
+        workers: Concurrent page requests (see fetch_playlist_items).
+    Returns:
+        Set of track IDs (local files and removed tracks are ignored).
+    """
+    return playlist_track_ids(fetch_playlist_items(sp, playlist_id, workers))
+
+
+def get_snapshot_id(sp: Any, playlist_id: str) -> Optional[str]:
+    """
+    Reads a playlist's current snapshot_id with a single, field-filtered call.
+    Returns:
+        The snapshot_id, or None if it could not be read.
+    """
+    spotify_limiter.acquire()
+    try:
+        playlist = sp.playlist(playlist_id, fields="snapshot_id")
+    except Exception as e:
+        logger.debug(f"Could not read snapshot_id of playlist {playlist_id}: {e}")
+        return None
+    if not isinstance(playlist, dict):
+        return None
+    snapshot_id = playlist.get("snapshot_id")
+    return str(snapshot_id) if snapshot_id else None
+
+
+def load_playlist_track_ids(
+    sp: Any,
+    playlist_id: str,
+    state: SyncState,
+    snapshot_id: str,
+    workers: int = PAGE_WORKERS,
+) -> Set[str]:
+    """
+    Returns the playlist's track IDs from the membership store if they were
+    stored at snapshot_id, otherwise fetches and stores them.
+    Args:
+        sp: Spotipy client.
+        playlist_id: Spotify playlist ID.
+        state: SyncState holding the membership store.
+        snapshot_id: The playlist's current snapshot_id (see get_snapshot_id).
+        workers: Concurrent page requests (see fetch_playlist_items).
+    Returns:
+        Set of track IDs.
+    """
+    track_ids = state.membership(playlist_id, snapshot_id)
+    if track_ids is not None:
+        logger.info(f"Playlist {playlist_id} unchanged, using stored membership")
+        return track_ids
+    track_ids = fetch_playlist_track_ids(sp, playlist_id, workers)
+    state.save_membership(playlist_id, snapshot_id, track_ids)
+    return track_ids
+
+
+def add_tracks_adaptive(
+    sp: Any,
+    playlist_id: str,
+    track_ids: Iterable[str],
+    config: Optional[Mapping[str, Any]] = None,
+) -> AddStats:
+    """
+    Adds tracks to a playlist in adaptively sized batches with 429 handling.
+    Args:
+        sp: Spotipy client.
+        playlist_id: Target Spotify playlist ID.
+        track_ids: Track IDs or URIs to add, in order. May be a lazy iterator
+            (e.g. fed from a queue); it is consumed one batch at a time.
+        config: Configuration dictionary (batch_size, min_batch_size,
+            batch_delay, max_retries, backoff_factor, min_retry_after).
+    Returns:
+        AddStats with counts of added/failed tracks, batches used and the
+        snapshot_id returned by the last add.
+    """
+    config = config or {}
+    max_retries = int(config.get("max_retries", 5))
+    backoff_factor = float(config.get("backoff_factor", 2.0))
+    min_retry_after = float(config.get("min_retry_after", 10.0))
+    batcher = AdaptiveBatcher(
+        max_size=int(config.get("batch_size", SPOTIFY_MAX_BATCH)),
+        min_size=int(config.get("min_batch_size", 10)),
+        base_delay=float(config.get("batch_delay", 2.0)),
+        backoff_factor=backoff_factor,
+    )
+    stats = AddStats()
+    pending = iter(track_ids)
+    buffer: List[str] = []
+    exhausted = False
+    retries = 0
+    while True:
+        while not exhausted and len(buffer) < batcher.size:
+            try:
+                buffer.append(next(pending))
+            except StopIteration:
+                exhausted = True
+        if not buffer:
+            break
+        batch = buffer[: batcher.size]
+        if batcher.spacing > 0:
+            time.sleep(batcher.spacing)
+        try:
+            spotify_limiter.acquire()
+            response = sp.playlist_add_items(playlist_id, batch)
+        except Exception as e:
+            if not is_rate_limited(e):
+                logger.error(f"Spotify API error: {e}")
+                stats.failed += len(batch)
+                del buffer[: len(batch)]
+                retries = 0
+                continue
+            stats.rate_limited += 1
+            retry_after = get_retry_after(e)
+            wait = max(
+                (
+                    retry_after
+                    if retry_after is not None
+                    else batcher.base_delay * (backoff_factor**retries)
+                ),
+                min_retry_after,
+            )
+            retries += 1
+            batcher.on_rate_limited(retry_after)
+            if retries >= max_retries:
+                logger.error(
+                    "Max retries reached for Spotify rate limit. Skipping batch."
+                )
+                stats.failed += len(batch)
+                del buffer[: len(batch)]
+                retries = 0
+                continue
+            logger.warning(
+                f"Spotify rate limit hit. Retrying after {wait:.1f}s with batch size "
+                f"{batcher.size} (retry {retries}/{max_retries})..."
+            )
+            spotify_limiter.pause(wait)
+            continue
+        stats.batches += 1
+        stats.added += len(batch)
+        stats.added_ids.extend(batch)
+        if isinstance(response, dict) and response.get("snapshot_id"):
+            stats.snapshot_id = str(response["snapshot_id"])
+        del buffer[: len(batch)]
+        retries = 0
+        batcher.on_success()
+    stats.final_batch_size = batcher.size
+    return stats
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+from typing import Any, Mapping
+
+DEFAULT_RATE_PER_SECOND = 5.0
+DEFAULT_BURST = 20
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    Callers reserve tokens up front and sleep once for any deficit, so
+    concurrent callers are served in arrival order without busy-waiting.
+    A pause empties the bucket and stops the refill until it ends, so the
+    callers queued behind it leave at the steady rate instead of as a burst.
+    """
+
+    def __init__(
+        self, rate: float = DEFAULT_RATE_PER_SECOND, capacity: float = DEFAULT_BURST
+    ) -> None:
+        self._lock = threading.Lock()
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        # Refill starts here; lies in the future while paused
+        self._last = time.monotonic()
+
+    def configure(self, rate: float, capacity: float) -> None:
+        """
+        Change the refill rate and burst capacity, keeping the current balance.
+        """
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+            self.capacity = capacity
+            self._tokens = min(self._tokens, float(capacity))
+
+    def reset(self) -> None:
+        """
+        Refill the bucket and clear any pause.
+        """
+        with self._lock:
+            self._tokens = float(self.capacity)
+            self._last = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if now <= self._last:
+            return
+        self._tokens = min(
+            float(self.capacity), self._tokens + (now - self._last) * self.rate
+        )
+        self._last = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Take ``tokens`` from the bucket without blocking.
+        Returns:
+            Seconds the caller has to wait before using the reservation.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= tokens
+            deficit = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(0.0, self._last + deficit - now)
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Block until ``tokens`` are available.
+        Returns:
+            Seconds spent waiting.
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """
+        Like acquire(), but waits with asyncio.sleep so the event loop keeps
+        running. Shares the same budget as the blocking callers.
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back every caller for ``seconds``, e.g. after a 429 Retry-After.
+        The bucket is left empty, so callers are released at the steady rate
+        once the pause ends.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._last = max(self._last, now + seconds)
+            self._tokens = min(self._tokens, 0.0)
+
+
+# Shared by every Spotify request made by the package
+spotify_limiter = TokenBucket()
+
+
+def configure_spotify_limiter(config: Mapping[str, Any]) -> TokenBucket:
+    """
+    Apply ``rate_limit_per_second`` and ``rate_limit_burst`` from config to the
+    shared Spotify limiter.
+    Args:
+        config: Configuration dictionary (see default_config.toml).
+    Returns:
+        The shared TokenBucket instance.
+    """
+    spotify_limiter.configure(
+        float(config.get("rate_limit_per_second", DEFAULT_RATE_PER_SECOND)),
+        float(config.get("rate_limit_burst", DEFAULT_BURST)),
+    )
+    return spotify_limiter
@@ -0,0 +1,95 @@
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+from yt2spotify.cache import TrackCache, TrackRecord
+from yt2spotify.logging_config import logger
+from yt2spotify.playlist import get_retry_after, is_rate_limited
+from yt2spotify.rate_limit import spotify_limiter
+
+# Spotify accepts at most 50 IDs per several-tracks request
+REVALIDATE_BATCH = 50
+# Market used to detect unplayable and relinked tracks
+REVALIDATE_MARKET = "from_token"
+
+
+def _fetch_tracks(
+    sp: Any,
+    batch: List[str],
+    market: Optional[str],
+    max_retries: int,
+    min_retry_after: float,
+) -> Optional[List[Optional[Mapping[str, Any]]]]:
+    """
+    Looks up one batch with the several-tracks endpoint, retrying 429s.
+    Returns:
+        Track objects (None for unknown IDs) in batch order, or None if the
+        batch could not be checked.
+    """
+    for attempt in range(max_retries + 1):
+        spotify_limiter.acquire()
+        try:
+            response = sp.tracks(batch, market=market) if market else sp.tracks(batch)
+        except Exception as e:
+            if not is_rate_limited(e) or attempt == max_retries:
+                logger.error(f"Spotify API error while revalidating tracks: {e}")
+                return None
+            wait = max(get_retry_after(e) or 0.0, min_retry_after)
+            logger.warning(f"Spotify rate limit hit. Retrying after {wait:.1f}s...")
+            spotify_limiter.pause(wait)
+            continue
+        tracks = list((response or {}).get("tracks") or [])
+        tracks += [None] * (len(batch) - len(tracks))
+        return tracks
+    return None
+
+
+def revalidate_track_ids(
+    sp: Any,
+    cache: TrackCache,
+    track_ids: Optional[Iterable[str]] = None,
+    config: Optional[Mapping[str, Any]] = None,
+) -> Dict[str, Optional[str]]:
+    """
+    Checks cached track IDs against Spotify in batches of REVALIDATE_BATCH.
+
+    Delisted or unplayable tracks are dropped from the cache, so their titles
+    are searched again. Relinked tracks are replaced by the playable ID.
+    Every surviving entry gets fresh metadata and counts as revalidated.
+    Args:
+        sp: Spotipy client.
+        cache: TrackCache to update.
+        track_ids: Track IDs to check (default: every cached track).
+            IDs that are not cached are checked as well.
+        config: Configuration dictionary (revalidate_market, max_retries,
+            min_retry_after).
+    Returns:
+        Dict of checked track_id -> playable track_id, or None if the track
+        is gone. IDs that could not be checked are left out.
+    """
+    config = config or {}
+    market = str(config.get("revalidate_market", REVALIDATE_MARKET)) or None
+    max_retries = int(config.get("max_retries", 5))
+    min_retry_after = float(config.get("min_retry_after", 10.0))
+    if track_ids is None:
+        ids = list(cache.keys_by_track_id())
+    else:
+        ids = list(dict.fromkeys(tid for tid in track_ids if tid))
+    result: Dict[str, Optional[str]] = {}
+    for i in range(0, len(ids), REVALIDATE_BATCH):
+        batch = ids[i : i + REVALIDATE_BATCH]
+        tracks = _fetch_tracks(sp, batch, market, max_retries, min_retry_after)
+        if tracks is None:
+            continue
+        for track_id, track in zip(batch, tracks):
+            if not track or not track.get("id") or track.get("is_playable") is False:
+                cache.drop_track(track_id)
+                result[track_id] = None
+                continue
+            record = TrackRecord.from_spotify(track)
+            cache.replace_track(track_id, record)
+            result[track_id] = record.track_id
+    dropped = sum(1 for new_id in result.values() if new_id is None)
+    relinked = sum(1 for old, new in result.items() if new and new != old)
+    logger.info(
+        f"Revalidated {len(result)} track IDs: {dropped} dropped, "
+        f"{relinked} relinked."
+    )
+    return result
@@ -0,0 +1,273 @@
+import asyncio
+import importlib.util
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+from spotipy.exceptions import SpotifyException
+from spotipy.oauth2 import SpotifyOAuth
+from yt2spotify.logging_config import logger
+from yt2spotify.rate_limit import spotify_limiter
+from yt2spotify.spotify_session import SCOPE, MemoryTokenCache
+from yt2spotify.utils import get_spotify_credentials
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - depends on the environment
+    httpx = None
+
+API_URL = "https://api.spotify.com/v1"
+# Connections kept open to the API; hundreds of requests can share them
+MAX_CONNECTIONS = 100
+# Spotify accepts at most 50 IDs per several-tracks request
+TRACKS_BATCH = 50
+MAX_RETRIES = 3
+
+
+def _track_uri(track: str) -> str:
+    """
+    Turns a track ID, URI or URL into a spotify:track: URI.
+    """
+    if track.startswith("spotify:"):
+        return track
+    if "open.spotify.com/track/" in track:
+        track = track.rsplit("/", 1)[-1].split("?", 1)[0]
+    return f"spotify:track:{track}"
+
+
+def _track_id(track: str) -> str:
+    return _track_uri(track).rsplit(":", 1)[-1]
+
+
+class AsyncSpotify:
+    """
+    Minimal asyncio Spotify Web API client for the endpoints the sync uses
+    (search, playlist items and several-tracks lookup).
+
+    Requests go through one pooled httpx.AsyncClient (HTTP/2 when the h2
+    package is installed) and the shared spotify_limiter, so many requests
+    can be in flight from one event loop. Tokens come from the same
+    SpotifyOAuth cache file as the spotipy client. Errors are raised as
+    spotipy's SpotifyException, so the existing 429 helpers apply.
+    """
+
+    def __init__(
+        self,
+        auth_manager: Any,
+        http_client: Optional[Any] = None,
+        max_connections: int = MAX_CONNECTIONS,
+        max_retries: int = MAX_RETRIES,
+    ) -> None:
+        self.auth_manager = auth_manager
+        self.max_retries = max_retries
+        if http_client is None:
+            if httpx is None:
+                raise ImportError(
+                    "AsyncSpotify needs httpx; install it with 'pip install httpx'"
+                )
+            http_client = httpx.AsyncClient(
+                http2=importlib.util.find_spec("h2") is not None,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                ),
+                timeout=10.0,
+            )
+        self._http = http_client
+        self._token_info: Optional[Dict[str, Any]] = None
+        self._token_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "AsyncSpotify":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Closes the pooled HTTP connections.
+        """
+        await self._http.aclose()
+
+    def _load_token(self) -> Dict[str, Any]:
+        token_info = self.auth_manager.validate_token(
+            self.auth_manager.cache_handler.get_cached_token()
+        )
+        if not token_info:
+            raise SpotifyException(
+                401, -1, "No cached Spotify token; authorize with a sync run first"
+            )
+        return dict(token_info)
+
+    def _refresh_token(self, token_info: Dict[str, Any]) -> Dict[str, Any]:
+        refresh_token = token_info.get("refresh_token")
+        if not refresh_token:
+            raise SpotifyException(
+                401, -1, "Spotify rejected the token and there is no refresh token"
+            )
+        # Also saves the new token, so the spotipy client picks it up too
+        return dict(self.auth_manager.refresh_access_token(refresh_token))
+
+    async def _access_token(self, rejected: Optional[str] = None) -> str:
+        """
+        Returns the access token to send. Pass a token the API rejected (401)
+        to refresh it; concurrent requests rejected with the same token share
+        one refresh.
+        """
+        async with self._token_lock:
+            # File reads and refreshes block, so keep them off the loop
+            if self._token_info is None or self.auth_manager.is_token_expired(
+                self._token_info
+            ):
+                self._token_info = await asyncio.to_thread(self._load_token)
+            if rejected is not None and self._token_info["access_token"] == rejected:
+                self._token_info = await asyncio.to_thread(
+                    self._refresh_token, self._token_info
+                )
+            return str(self._token_info["access_token"])
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Mapping[str, Any]] = None,
+        json: Optional[Mapping[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        retries = 0
+        refreshed = False
+        while True:
+            await spotify_limiter.acquire_async()
+            token = await self._access_token()
+            response = await self._http.request(
+                method,
+                f"{API_URL}/{path}",
+                params=params,
+                json=json,
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            status = response.status_code
+            if status == 401 and not refreshed:
+                refreshed = True
+                await self._access_token(rejected=token)
+                continue
+            if status == 429 and retries < self.max_retries:
+                retries += 1
+                try:
+                    wait = float(response.headers.get("Retry-After", 1))
+                except (TypeError, ValueError):
+                    wait = 1.0
+                logger.warning(
+                    f"Spotify rate limit hit. Retrying after {wait:.1f}s "
+                    f"(retry {retries}/{self.max_retries})..."
+                )
+                spotify_limiter.pause(wait)
+                continue
+            if status >= 400:
+                raise SpotifyException(
+                    status,
+                    -1,
+                    f"{method} {path}: {response.text}",
+                    headers=dict(response.headers),
+                )
+            if not response.content:
+                return {}
+            result: Dict[str, Any] = response.json()
+            return result
+
+    async def search(
+        self, q: str, type: str = "track", limit: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Searches the catalog (same result shape as spotipy's search).
+        """
+        return await self._request(
+            "GET", "search", params={"q": q, "type": type, "limit": limit}
+        )
+
+    async def playlist_items(
+        self,
+        playlist_id: str,
+        fields: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Returns one page of playlist items.
+        """
+        params: Dict[str, Any] = {"limit": limit, "offset": offset}
+        if fields:
+            params["fields"] = fields
+        return await self._request("GET", f"playlists/{playlist_id}/tracks", params)
+
+    async def playlist_add_items(
+        self, playlist_id: str, items: Sequence[str]
+    ) -> Dict[str, Any]:
+        """
+        Appends up to 100 tracks; returns the new snapshot_id.
+        """
+        return await self._request(
+            "POST",
+            f"playlists/{playlist_id}/tracks",
+            json={"uris": [_track_uri(item) for item in items]},
+        )
+
+    async def playlist_remove_all_occurrences_of_items(
+        self, playlist_id: str, items: Sequence[str]
+    ) -> Dict[str, Any]:
+        """
+        Removes every occurrence of up to 100 tracks; returns the new snapshot_id.
+        """
+        return await self._request(
+            "DELETE",
+            f"playlists/{playlist_id}/tracks",
+            json={"tracks": [{"uri": _track_uri(item)} for item in items]},
+        )
+
+    async def playlist_replace_items(
+        self, playlist_id: str, items: Sequence[str]
+    ) -> Dict[str, Any]:
+        """
+        Replaces the playlist with up to 100 tracks; returns the new snapshot_id.
+        """
+        return await self._request(
+            "PUT",
+            f"playlists/{playlist_id}/tracks",
+            json={"uris": [_track_uri(item) for item in items]},
+        )
+
+    async def tracks(
+        self, tracks: Sequence[str], market: Optional[str] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Looks up tracks with the several-tracks endpoint, TRACKS_BATCH IDs per
+        request, all batches concurrently.
+        Returns:
+            Track objects in input order; None for IDs Spotify does not know.
+        """
+        ids = [_track_id(track) for track in tracks]
+        batches = [ids[i : i + TRACKS_BATCH] for i in range(0, len(ids), TRACKS_BATCH)]
+
+        async def fetch(batch: List[str]) -> List[Optional[Dict[str, Any]]]:
+            params: Dict[str, Any] = {"ids": ",".join(batch)}
+            if market:
+                params["market"] = market
+            result = await self._request("GET", "tracks", params)
+            return list(result.get("tracks") or [])
+
+        pages = await asyncio.gather(*(fetch(batch) for batch in batches))
+        return [track for page in pages for track in page]
+
+
+def get_async_spotify_client(
+    max_connections: int = MAX_CONNECTIONS,
+) -> AsyncSpotify:
+    """
+    Returns an AsyncSpotify client authorized through the same token cache as
+    get_spotify_client(). Needs the optional httpx dependency.
+    """
+    client_id, client_secret, redirect_uri = get_spotify_credentials()
+    auth_manager = SpotifyOAuth(
+        client_id=client_id,
+        client_secret=client_secret,
+        redirect_uri=redirect_uri,
+        scope=SCOPE,
+        cache_handler=MemoryTokenCache(),
+    )
+    return AsyncSpotify(auth_manager, max_connections=max_connections)
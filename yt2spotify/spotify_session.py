@@ -0,0 +1,155 @@
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+import requests
+import spotipy
+from requests.adapters import HTTPAdapter
+from spotipy.cache_handler import CacheFileHandler
+from spotipy.oauth2 import SpotifyOAuth
+from urllib3.util.retry import Retry
+
+SCOPE = "playlist-modify-public playlist-modify-private"
+# Pooled connections per host; raised by configure_spotify_pool()
+POOL_SIZE = 10
+# spotipy only installs its retry policy on sessions it builds itself, so
+# pooled sessions mount the same one: 3 retries with backoff on 429 and 5xx
+RETRIES = 3
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_METHODS = frozenset(["GET", "POST", "PUT", "DELETE"])
+RETRY_BACKOFF = 0.3
+
+T = TypeVar("T")
+
+_lock = threading.Lock()
+_clients: Dict[Tuple[str, ...], Any] = {}
+_sessions: Dict[int, Tuple[requests.Session, int]] = {}
+_pool_size = POOL_SIZE
+
+
+class MemoryTokenCache(CacheFileHandler):  # type: ignore[misc]
+    """
+    SpotifyOAuth token cache that reads the cache file once and then serves
+    the token from memory. Refreshed tokens are still written to the file,
+    so other processes and the async client see them.
+    """
+
+    def __init__(self, cache_path: Optional[str] = None) -> None:
+        super().__init__(cache_path=cache_path)
+        self._token: Optional[Dict[str, Any]] = None
+        self._token_lock = threading.Lock()
+
+    def get_cached_token(self) -> Optional[Dict[str, Any]]:
+        with self._token_lock:
+            if self._token is None:
+                self._token = super().get_cached_token()
+            return self._token
+
+    def save_token_to_cache(self, token_info: Dict[str, Any]) -> None:
+        with self._token_lock:
+            self._token = token_info
+            super().save_token_to_cache(token_info)
+
+
+def _retry() -> Retry:
+    return Retry(
+        total=RETRIES,
+        connect=None,
+        read=False,
+        status=RETRIES,
+        allowed_methods=RETRY_METHODS,
+        status_forcelist=RETRY_STATUSES,
+        backoff_factor=RETRY_BACKOFF,
+    )
+
+
+def _mount(session: requests.Session, pool_size: int) -> None:
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=_retry()
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
+def pooled_session() -> requests.Session:
+    """
+    Returns a keep-alive requests.Session whose connection pool is sized for
+    the configured concurrency. Retries 429 and 5xx responses like spotipy's
+    own sessions do.
+    """
+    session = requests.Session()
+    with _lock:
+        _mount(session, _pool_size)
+        _sessions[id(session)] = (session, _pool_size)
+    return session
+
+
+def configure_spotify_pool(config: Dict[str, Any]) -> None:
+    """
+    Sizes the connection pools for the concurrency in config (search_concurrency,
+    playlist_page_workers), growing the pools of sessions already handed out.
+    """
+    global _pool_size
+    wanted = max(
+        POOL_SIZE,
+        int(config.get("search_concurrency", 8)) + 2,
+        int(config.get("playlist_page_workers", 4)) + 2,
+    )
+    with _lock:
+        _pool_size = max(_pool_size, wanted)
+        for key, (session, size) in list(_sessions.items()):
+            if size < _pool_size:
+                _mount(session, _pool_size)
+                _sessions[key] = (session, _pool_size)
+
+
+def shared_client(key: Tuple[str, ...], build: Callable[[], T]) -> T:
+    """
+    Returns the client built for key, building it on first use. Every stage
+    and job in the process then shares one client, session and token.
+    Args:
+        key: Identifies the client (e.g. credentials and scope).
+        build: Creates the client when none exists for key yet.
+    """
+    with _lock:
+        if key in _clients:
+            client: T = _clients[key]
+            return client
+    client = build()
+    with _lock:
+        # Another thread may have built one meanwhile; keep the first
+        return _clients.setdefault(key, client)  # type: ignore[no-any-return]
+
+
+def spotify_client(
+    client_id: str, client_secret: str, redirect_uri: str
+) -> spotipy.Spotify:
+    """
+    Returns the process-wide spotipy client for these credentials. The client
+    and its OAuth manager share one pooled session and an in-memory token.
+    """
+
+    def build() -> spotipy.Spotify:
+        session = pooled_session()
+        return spotipy.Spotify(
+            auth_manager=SpotifyOAuth(
+                client_id=client_id,
+                client_secret=client_secret,
+                redirect_uri=redirect_uri,
+                scope=SCOPE,
+                cache_handler=MemoryTokenCache(),
+                requests_session=session,
+            ),
+            requests_session=session,
+        )
+
+    return shared_client((client_id, client_secret, redirect_uri, SCOPE), build)
+
+
+def clear_clients() -> None:
+    """
+    Forgets the shared clients and sessions (e.g. after a credentials change).
+    """
+    global _pool_size
+    with _lock:
+        _clients.clear()
+        _sessions.clear()
+        _pool_size = POOL_SIZE
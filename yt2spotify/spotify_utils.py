@@ -1,24 +1,18 @@
 import spotipy
-from spotipy.oauth2 import SpotifyOAuth
 from typing import Any
 from yt2spotify.utils import get_spotify_credentials
+from yt2spotify.rate_limit import spotify_limiter
+from yt2spotify.spotify_session import spotify_client
 
 
 def get_spotify_client() -> spotipy.Spotify:
     """
     Returns an authenticated Spotipy client for Spotify API access.
+    The client, its pooled HTTP session and its token are created once per
+    process and shared by every caller (see spotify_session).
     """
     client_id, client_secret, redirect_uri = get_spotify_credentials()
-    scope = "playlist-modify-public playlist-modify-private"
-    sp = spotipy.Spotify(
-        auth_manager=SpotifyOAuth(
-            client_id=client_id,
-            client_secret=client_secret,
-            redirect_uri=redirect_uri,
-            scope=scope,
-        )
-    )
-    return sp
+    return spotify_client(client_id, client_secret, redirect_uri)
 
 
 def spotify_search(sp: spotipy.Spotify, query: str, limit: int = 1) -> dict[str, Any]:
@@ -31,6 +25,7 @@ def spotify_search(sp: spotipy.Spotify, query: str, limit: int = 1) -> dict[str,
     Returns:
         Spotify API search result as a dictionary.
     """
+    spotify_limiter.acquire()
     result = sp.search(q=query, type="track", limit=limit)
     if not isinstance(result, dict):
         return {}
@@ -0,0 +1,214 @@
+import sqlite3
+import threading
+import time
+from types import TracebackType
+from typing import Iterable, Iterator, Optional, Set, Tuple, Type
+from yt2spotify.cache import PRAGMAS
+
+# Kept out of the track cache's file, whose size cache_max_bytes bounds
+STATE_DB_PATH = "sync_state.sqlite"
+
+CREATE_SYNC_STATE_SQL = """
+CREATE TABLE IF NOT EXISTS sync_state (
+    yt_playlist TEXT NOT NULL,
+    spotify_playlist TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    processed_at REAL NOT NULL,
+    PRIMARY KEY (yt_playlist, spotify_playlist, video_id)
+);
+"""
+
+# Last known track IDs of a Spotify playlist, valid while its snapshot_id is
+CREATE_MEMBERSHIP_SQL = (
+    """
+CREATE TABLE IF NOT EXISTS playlist_snapshot (
+    playlist_id TEXT PRIMARY KEY,
+    snapshot_id TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+""",
+    """
+CREATE TABLE IF NOT EXISTS playlist_member (
+    playlist_id TEXT NOT NULL,
+    track_id TEXT NOT NULL,
+    PRIMARY KEY (playlist_id, track_id)
+);
+""",
+)
+
+
+class SyncState:
+    """
+    Remembers which YouTube videos have already been synced into which
+    Spotify playlist, so later runs only process new videos, and the track
+    IDs of Spotify playlists as of their last seen snapshot_id.
+    Stored in its own SQLite file by default.
+    """
+
+    def __init__(self, db_path: str = STATE_DB_PATH) -> None:
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = sqlite3.connect(
+            self.db_path, check_same_thread=False
+        )
+        for pragma in PRAGMAS:
+            self._conn.execute(pragma)
+        self._conn.execute(CREATE_SYNC_STATE_SQL)
+        for sql in CREATE_MEMBERSHIP_SQL:
+            self._conn.execute(sql)
+        self._conn.commit()
+
+    def __enter__(self) -> "SyncState":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            raise RuntimeError("SyncState is closed")
+        return self._conn
+
+    def close(self) -> None:
+        """
+        Close the connection. Safe to call twice.
+        """
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def known_ids(self, yt_playlist: str, spotify_playlist: str) -> Set[str]:
+        """
+        Returns the video IDs already processed for this playlist pair.
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT video_id FROM sync_state "
+                "WHERE yt_playlist=? AND spotify_playlist=?",
+                (yt_playlist, spotify_playlist),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def mark_processed(
+        self,
+        yt_playlist: str,
+        spotify_playlist: str,
+        video_ids: Iterable[str],
+        now: Optional[float] = None,
+    ) -> None:
+        """
+        Records video IDs as processed for this playlist pair.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO sync_state "
+                "(yt_playlist, spotify_playlist, video_id, processed_at) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (yt_playlist, spotify_playlist, video_id, now)
+                    for video_id in video_ids
+                ],
+            )
+            self.conn.commit()
+
+    def forget(self, yt_playlist: str, spotify_playlist: str) -> None:
+        """
+        Drops the state of a playlist pair, so the next run processes everything.
+        """
+        with self._lock:
+            self.conn.execute(
+                "DELETE FROM sync_state WHERE yt_playlist=? AND spotify_playlist=?",
+                (yt_playlist, spotify_playlist),
+            )
+            self.conn.commit()
+
+    def membership(self, playlist_id: str, snapshot_id: str) -> Optional[Set[str]]:
+        """
+        Returns the stored track IDs of a playlist if they were recorded at
+        this snapshot_id, otherwise None.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT snapshot_id FROM playlist_snapshot WHERE playlist_id=?",
+                (playlist_id,),
+            ).fetchone()
+            if row is None or row[0] != snapshot_id:
+                return None
+            rows = self.conn.execute(
+                "SELECT track_id FROM playlist_member WHERE playlist_id=?",
+                (playlist_id,),
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def save_membership(
+        self,
+        playlist_id: str,
+        snapshot_id: str,
+        track_ids: Iterable[str],
+        replace: bool = True,
+        now: Optional[float] = None,
+    ) -> None:
+        """
+        Stores the track IDs of a playlist at snapshot_id.
+        Args:
+            playlist_id: Spotify playlist ID.
+            snapshot_id: The snapshot_id the track IDs belong to.
+            track_ids: Track IDs in the playlist.
+            replace: If False, track_ids are added to the stored set (after
+                our own adds) instead of replacing it.
+            now: Timestamp to record (defaults to the current time).
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            if replace:
+                self.conn.execute(
+                    "DELETE FROM playlist_member WHERE playlist_id=?", (playlist_id,)
+                )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO playlist_member (playlist_id, track_id) "
+                "VALUES (?, ?)",
+                [(playlist_id, track_id) for track_id in track_ids],
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO playlist_snapshot "
+                "(playlist_id, snapshot_id, updated_at) VALUES (?, ?, ?)",
+                (playlist_id, snapshot_id, now),
+            )
+            self.conn.commit()
+
+
+def take_new_entries(
+    entries: Iterable[Tuple[Optional[str], str]],
+    known_ids: Set[str],
+    stop_after: int = 0,
+) -> Iterator[Tuple[Optional[str], str]]:
+    """
+    Filters (video_id, title) entries down to videos not processed yet.
+    Args:
+        entries: (video_id, title) pairs in playlist order, possibly lazy.
+        known_ids: Video IDs that were already processed.
+        stop_after: Stop reading entries after this many known videos in a
+            row, leaving the rest of a lazy source unfetched. Only safe for
+            playlists that add new videos at the top (e.g. channel uploads);
+            0 reads the whole playlist.
+    Yields:
+        The (video_id, title) pairs of unprocessed videos. Entries without an
+        ID are always treated as new.
+    """
+    known_run = 0
+    for video_id, title in entries:
+        if video_id and video_id in known_ids:
+            known_run += 1
+            if stop_after and known_run >= stop_after:
+                return
+            continue
+        known_run = 0
+        yield video_id, title
@@ -1,9 +1,27 @@
 import json
 import os
-from typing import Set, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Pattern, Set, Tuple, Optional
 from dotenv import load_dotenv
-import unicodedata
-import re
+from yt2spotify.logging_config import logger
+from yt2spotify.normalize import (
+    clean_title,
+    compile_stop_words,
+    parse_artist_track,
+    strip_stop_words,
+)
+
+__all__ = [
+    "get_spotify_credentials",
+    "clean_title",
+    "parse_artist_track",
+    "parse_many",
+    "is_unavailable_title",
+    "build_search_query",
+    "compile_stop_words",
+    "validate_json_entries",
+    "validate_no_duplicates",
+]
 
 
 def get_spotify_credentials() -> Tuple[str, str, str]:
@@ -36,68 +54,94 @@ def get_spotify_credentials() -> Tuple[str, str, str]:
     return client_id, client_secret, redirect_uri
 
 
-def clean_title(title: str) -> str:
+# Below this many titles, parse_many stays in-process: starting the pool costs
+# more than it saves
+PARSE_POOL_MIN = 5000
+
+
+def _parse_chunk(titles: List[str]) -> List[Tuple[Optional[str], str]]:
+    return [parse_artist_track(title) for title in titles]
+
+
+def parse_many(
+    titles: Iterable[str],
+    workers: Optional[int] = None,
+    min_pool_size: int = PARSE_POOL_MIN,
+) -> List[Tuple[Optional[str], str]]:
     """
-    Cleans and normalizes a track title for matching/searching.
+    Parses many titles with parse_artist_track, spreading them over a process
+    pool for large inputs.
     Args:
-        title: The original title string.
+        titles: The original title strings.
+        workers: Worker processes (default: CPU count). 1 parses in-process.
+        min_pool_size: Inputs with fewer distinct titles are parsed in-process.
     Returns:
-        A cleaned, normalized title string.
+        List of (artist, track) tuples in input order.
     """
-    title = unicodedata.normalize("NFKC", title).casefold()
-    # Replace all dash-like unicode characters with a space
-    title = re.sub(
-        r"[\u2013\u2014\u2212\u2022\u00b7\u2027\u2010\u2011\u2012\u2015]", " ", title
-    )
-    title = re.sub(r"\[.*?\]", "", title)
-    title = re.sub(r"\(.*?\)", "", title)
-    title = re.sub(
-        r"(?i)\b(prod\.|ft\.|feat\.|official|audio|video|unreleased|music|visualizer|by|with|remix|version|explicit|clean|lyrics|lyric|clip|HD|HQ|\d{4})\b",
-        "",
-        title,
+    titles = list(titles)
+    # Duplicates are parsed once and never sent to a worker twice
+    unique = list(dict.fromkeys(titles))
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(unique) < min_pool_size:
+        return _parse_chunk(titles)
+    size = -(-len(unique) // (workers * 4))
+    chunks = [unique[i : i + size] for i in range(0, len(unique), size)]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = [
+                pair for chunk in pool.map(_parse_chunk, chunks) for pair in chunk
+            ]
+    except (OSError, RuntimeError) as e:
+        # e.g. no process support in the sandbox, or a broken pool
+        logger.warning(f"Parsing in-process, process pool unavailable: {e}")
+        return _parse_chunk(titles)
+    by_title = dict(zip(unique, parsed))
+    return [by_title[title] for title in titles]
+
+
+def is_unavailable_title(
+    title: str, artist: Optional[str], track: Optional[str]
+) -> bool:
+    """
+    True if a YouTube entry is private/deleted or has nothing to search for.
+    Args:
+        title: The original title string.
+        artist: Parsed artist (may be None).
+        track: Parsed track.
+    """
+    return (
+        not (artist or track)
+        or not title
+        or title.strip().lower().startswith("[private")
+        or title.strip().lower().startswith("[deleted")
     )
-    title = re.sub(r"[-_]", " ", title)
-    title = re.sub(r"\s+", " ", title)
-    return title.strip()
 
 
-def parse_artist_track(title: str) -> Tuple[Optional[str], str]:
+def build_search_query(
+    title: str,
+    artist: Optional[str],
+    track: Optional[str],
+    stop_words: Optional[Pattern[str]] = None,
+) -> str:
     """
-    Attempts to parse an artist and track from a title string.
+    Builds the Spotify search query for a parsed YouTube title.
     Args:
         title: The original title string.
+        artist: Parsed artist (may be None).
+        track: Parsed track.
+        stop_words: Pattern from compile_stop_words(). Stop words are removed
+            from the track (or cleaned title), never from the artist, and
+            only if something is left to search for.
     Returns:
-        Tuple of (artist, track). Artist may be None if not found.
+        A field-filtered query if the artist is known, else the cleaned title.
     """
-    title = unicodedata.normalize("NFKC", title).casefold()
-    # Remove feat/ft in brackets
-    title = re.sub(r"\[(feat\.|ft\.|featuring)[^\]]*\]", "", title, flags=re.IGNORECASE)
-    title = re.sub(r"\((feat\.|ft\.|featuring)[^\)]*\)", "", title, flags=re.IGNORECASE)
-    # Replace all dash-like unicode characters with a dash
-    title = re.sub(
-        r"[\u2013\u2014\u2212\u2022\u00b7\u2027\u2010\u2011\u2012\u2015\|/]+",
-        " - ",
-        title,
-    )
-    title = re.sub(r"\s*-+\s*", " - ", title)
-    title = re.sub(r"\s+", " ", title)
-    trailing = r"(?i)\b(live|remaster(ed)?( \d{2,4})?|lyrics?|audio|video|version|explicit|clean|visualizer|clip|HD|HQ)\b.*$"
-    title = re.sub(trailing, "", title).strip()
-    if " - " in title:
-        artist, track = title.split(" - ", 1)
-        # Remove feat/ft from artist and track
-        artist = re.split(r"(?i)\b(feat\.|ft\.|featuring)\b", artist)[0].strip()
-        track = re.split(r"(?i)\b(feat\.|ft\.|featuring)\b", track)[0].strip()
-        # Remove trailing dashes and spaces
-        track = re.sub(r"[-\s]+$", "", track).strip()
-        # Remove trailing 'ft.', 'feat.', etc. from the end of the track
-        track = re.sub(r"(?i)(\s*(ft\.|feat\.|featuring)\s*.*)$", "", track).strip()
-        # Remove trailing parenthesis/brackets and their contents from the end of the track
-        track = re.sub(r"(\s*[\[(][^\])\]]*[\])\]]\s*)+$", "", track).strip()
-        # Remove any unmatched trailing parenthesis or brackets left after previous removals
-        track = re.sub(r"[\[(]+$", "", track).strip()
-        return artist, track
-    return None, clean_title(title)
+    if artist:
+        track = strip_stop_words(track or "", stop_words) or track
+        query = f"artist:{artist} track:{track}"
+    else:
+        cleaned = clean_title(title)
+        query = strip_stop_words(cleaned, stop_words) or cleaned
+    return query.strip()
 
 
 def validate_json_entries(json_path: str, required_keys: Set[str]) -> None:
@@ -1,7 +1,50 @@
-from typing import List
+from typing import Any, Iterator, List, Optional, Tuple
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from yt2spotify.yt_utils import get_yt_playlist_titles_yt_dlp
+from yt2spotify.yt_utils import (
+    get_yt_playlist_titles_yt_dlp,
+    iter_yt_playlist_entries_yt_dlp,
+)
+
+
+def extract_playlist_id(playlist_id: str) -> str:
+    """
+    Returns the playlist ID from a YouTube playlist URL, or the input unchanged.
+    """
+    if "list=" in playlist_id:
+        import urllib.parse
+
+        qs = urllib.parse.parse_qs(urllib.parse.urlparse(playlist_id).query)
+        playlist_id = qs.get("list", [playlist_id])[0]
+    return playlist_id
+
+
+def _iter_playlist_item_pages(
+    youtube: Any, playlist_id: str
+) -> Iterator[List[Tuple[Optional[str], str]]]:
+    """
+    Yields the (video_id, title) pairs of each playlistItems page in order.
+    """
+    nextPageToken = None
+    while True:
+        request = youtube.playlistItems().list(
+            part="snippet",
+            playlistId=playlist_id,
+            maxResults=50,
+            pageToken=nextPageToken,
+        )
+        response = request.execute()
+        entries = []
+        for item in response.get("items", []):
+            snippet = item.get("snippet", {})
+            title = snippet.get("title")
+            if title:
+                video_id = (snippet.get("resourceId") or {}).get("videoId")
+                entries.append((video_id, title))
+        yield entries
+        nextPageToken = response.get("nextPageToken")
+        if not nextPageToken:
+            break
 
 
 def get_yt_playlist_titles_api(api_key: str, playlist_id: str) -> List[str]:
@@ -20,29 +63,10 @@ def get_yt_playlist_titles_api(api_key: str, playlist_id: str) -> List[str]:
     try:
         youtube = build("youtube", "v3", developerKey=api_key)
         # Extract playlist ID if a URL is given
-        if "list=" in playlist_id:
-            import urllib.parse
-
-            qs = urllib.parse.parse_qs(urllib.parse.urlparse(playlist_id).query)
-            playlist_id = qs.get("list", [playlist_id])[0]
-        titles = []
-        nextPageToken = None
-        while True:
-            request = youtube.playlistItems().list(
-                part="snippet",
-                playlistId=playlist_id,
-                maxResults=50,
-                pageToken=nextPageToken,
-            )
-            response = request.execute()
-            for item in response.get("items", []):
-                snippet = item.get("snippet", {})
-                title = snippet.get("title")
-                if title:
-                    titles.append(title)
-            nextPageToken = response.get("nextPageToken")
-            if not nextPageToken:
-                break
+        playlist_id = extract_playlist_id(playlist_id)
+        titles: List[str] = []
+        for page in _iter_playlist_item_pages(youtube, playlist_id):
+            titles.extend(title for _, title in page)
         return titles
     except HttpError as e:
         if e.resp.status == 403:
@@ -52,3 +76,49 @@ def get_yt_playlist_titles_api(api_key: str, playlist_id: str) -> List[str]:
     except Exception:
         # Any other error, fallback
         return get_yt_playlist_titles_yt_dlp(playlist_id)
+
+
+def iter_yt_playlist_entries_api(
+    api_key: str, playlist_id: str
+) -> Iterator[Tuple[Optional[str], str]]:
+    """
+    Lazily yields (video_id, title) pairs page by page using the Data API v3.
+    Falls back to yt_dlp streaming if the key is missing or the first page fails;
+    errors after entries have been yielded are raised to the caller.
+    Args:
+        api_key: YouTube Data API v3 key.
+        playlist_id: YouTube playlist ID or URL.
+    Yields:
+        (video_id, title) tuples.
+    """
+    if not api_key:
+        yield from iter_yt_playlist_entries_yt_dlp(playlist_id)
+        return
+    pages: Iterator[List[Tuple[Optional[str], str]]]
+    try:
+        youtube = build("youtube", "v3", developerKey=api_key)
+        pages = _iter_playlist_item_pages(youtube, extract_playlist_id(playlist_id))
+        first_page = next(pages, [])
+    except HttpError as e:
+        if e.resp.status != 403:
+            raise
+        yield from iter_yt_playlist_entries_yt_dlp(playlist_id)
+        return
+    except Exception:
+        yield from iter_yt_playlist_entries_yt_dlp(playlist_id)
+        return
+    yield from first_page
+    for page in pages:
+        yield from page
+
+
+def iter_yt_playlist_titles_api(api_key: str, playlist_id: str) -> Iterator[str]:
+    """
+    Like iter_yt_playlist_entries_api, but yields only the titles.
+    Args:
+        api_key: YouTube Data API v3 key.
+        playlist_id: YouTube playlist ID or URL.
+    Returns:
+        Iterator of video titles as strings.
+    """
+    return (title for _, title in iter_yt_playlist_entries_api(api_key, playlist_id))
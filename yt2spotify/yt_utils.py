@@ -1,5 +1,5 @@
 import yt_dlp
-from typing import List
+from typing import Iterator, List, Optional, Tuple
 
 
 def get_yt_playlist_titles_yt_dlp(playlist_url: str) -> List[str]:
@@ -35,3 +35,44 @@ def get_yt_playlist_titles_api(playlist_url: str, api_key: str) -> List[str]:
         NotImplementedError: Always, as this is a stub.
     """
     raise NotImplementedError("YouTube Data API v3 support not yet implemented")
+
+
+def iter_yt_playlist_entries_yt_dlp(
+    playlist_url: str,
+) -> Iterator[Tuple[Optional[str], str]]:
+    """
+    Lazily yields (video_id, title) pairs from a YouTube playlist URL using
+    yt-dlp. Entries are yielded as yt-dlp pages through the playlist, so
+    callers can start working before the whole playlist has been fetched.
+    Args:
+        playlist_url: The URL of the YouTube playlist.
+    Yields:
+        (video_id, title) tuples; video_id is None if yt-dlp reports none.
+    """
+    ydl_opts = {
+        "quiet": True,
+        "extract_flat": True,
+        "skip_download": True,
+        "force_generic_extractor": False,
+        "lazy_playlist": True,
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(playlist_url, download=False, process=False)
+        if info and "entries" not in info:
+            # Not a lazily extractable playlist (e.g. a redirect); resolve fully
+            info = ydl.extract_info(playlist_url, download=False)
+        for entry in (info or {}).get("entries") or []:
+            title = entry.get("title") if entry else None
+            if title:
+                yield entry.get("id"), title
+
+
+def iter_yt_playlist_titles_yt_dlp(playlist_url: str) -> Iterator[str]:
+    """
+    Like iter_yt_playlist_entries_yt_dlp, but yields only the titles.
+    Args:
+        playlist_url: The URL of the YouTube playlist.
+    Returns:
+        Iterator of video titles as strings.
+    """
+    return (title for _, title in iter_yt_playlist_entries_yt_dlp(playlist_url))